@@ -28,7 +28,9 @@ setup(
     setup_requires=["setuptools_scm"],
     install_requires=["numpy>=1.16.5",
                       "pandas"],
-    extras_require={"test": ["pytest"]},
+    extras_require={"test": ["pytest"],
+                    "parquet": ["pyarrow"]},
+    entry_points={"console_scripts": ["synop-decode = synop.cli:main"]},
     classifiers=["Programming Language :: Python",
                  "Development Status :: 4 - Beta",
                  "Intended Audience :: Science/Research",
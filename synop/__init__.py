@@ -1,8 +1,20 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-try:
-    from synop.version import version as __version__
-except ImportError:
-    from pkg_resources import get_distribution
-    __version__ = get_distribution(__name__).version
+
+def __getattr__(name):
+    #the version is looked up on first access, the package metadata is slow to import
+    if name != "__version__":
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    try:
+        from synop.version import version
+    except ImportError:
+        try:
+            from importlib.metadata import version as _version
+            version = _version(__name__)
+        except ImportError:
+            #Python < 3.8 or package not installed
+            version = "unknown"
+    globals()["__version__"] = version
+
+    return version
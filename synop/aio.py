@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Asyncio pipeline for decoding live feeds of SYNOP reports.
+
+Raw reports from an async iterator are collected into micro-batches which
+are decoded in an executor so the event loop is never blocked by decoding.
+All queues are bounded so a slow consumer slows down the reading of the feed
+(backpressure) instead of filling the memory.
+
+"""
+
+import asyncio
+from functools import partial
+
+from .batch import SynopBatch, decode_chunk
+from .reader import ReportSplitter
+
+#marks the end of the reports in the queues
+_END = object()
+
+
+async def iter_stream(reader, encoding="ascii"):
+    """Iterate over the reports of a stream.
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        Stream of lines, e.g. from ``asyncio.open_connection``
+    encoding : str
+        Encoding of the stream. Invalid characters are replaced.
+
+    Yields
+    ------
+    str
+        Raw report (see ``reader.iter_reports``)
+
+    """
+    splitter = ReportSplitter()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        for report in splitter.feed(line.decode(encoding, errors="replace")):
+            yield report
+
+    for report in splitter.flush():
+        yield report
+
+
+async def _feed(reports, queue):
+    """Put reports of async iterator into the queue."""
+    try:
+        async for report in reports:
+            await queue.put(report)
+    finally:
+        await queue.put(_END)
+
+
+async def _batches(queue, batch_size, latency):
+    """Collect micro-batches from the queue.
+
+    A batch is complete when it has batch_size reports or latency seconds
+    after its first report arrived.
+
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        report = await queue.get()
+        if report is _END:
+            return
+        batch = [report]
+        deadline = loop.time() + latency
+        while len(batch) < batch_size:
+            try:
+                report = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    report = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if report is _END:
+                yield batch
+                return
+            batch.append(report)
+        yield batch
+
+
+async def _submit(queue, pending, batch_size, latency, executor, decode):
+    """Decode micro-batches in the executor and put the futures into pending."""
+    loop = asyncio.get_running_loop()
+    try:
+        async for batch in _batches(queue, batch_size, latency):
+            await pending.put(loop.run_in_executor(executor, decode, batch))
+    finally:
+        await pending.put(_END)
+
+
+async def decode_stream(reports, batch_size=1000, latency=0.002, max_queue=10000, max_pending=4, executor=None,
+                        **kwargs):
+    """Decode reports of an async iterator in micro-batches.
+
+    Parameters
+    ----------
+    reports : async iterable of str
+        Raw SYNOP reports, e.g. from ``iter_stream``
+    batch_size : int
+        Maximum number of reports decoded at once
+    latency : float
+        Maximum time in seconds a report waits for more reports of its batch
+    max_queue : int
+        Maximum number of raw reports waiting to be batched. If the queue is
+        full the reports iterator is not read.
+    max_pending : int
+        Maximum number of batches being decoded or waiting for the consumer
+    executor : concurrent.futures.Executor
+        Executor for decoding, default is the thread pool of the event loop
+    kwargs
+        Passed to ``batch.decode_chunk``, e.g. compact, vars or status
+
+    Yields
+    ------
+    SynopBatch
+        Decoded micro-batch in the order of the reports
+
+    """
+    queue = asyncio.Queue(maxsize=max_queue)
+    pending = asyncio.Queue(maxsize=max_pending)
+    decode = partial(decode_chunk, **kwargs)
+    tasks = [asyncio.ensure_future(_feed(reports, queue)),
+             asyncio.ensure_future(_submit(queue, pending, batch_size, latency, executor, decode))]
+    try:
+        while True:
+            future = await pending.get()
+            if future is _END:
+                break
+            yield SynopBatch(*await future)
+        #raise errors of the reports iterator
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Apache Arrow tables and Parquet datasets of decoded SYNOP reports.
+
+The Arrow arrays are built directly from the columns of a ``SynopBatch``
+without going through Python objects or pandas. Variables with a code table
+are dictionary encoded with the descriptions as dictionary.
+
+Requires pyarrow.
+
+"""
+
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .batch import COLUMNS, COLUMN_NAMES, CODE_TABLES, CATEGORIES, iter_batches
+from .vectorized import decode_okta, decode_datetime
+
+#partition keys derived from the time of the report and their datetime64 unit
+TIME_PARTITIONS = {"year": "Y", "month": "M", "date": "D"}
+
+
+def _schema():
+    """Arrow type of each column."""
+    types = {}
+    for name, slot, start, stop, decoder, dtype in COLUMNS:
+        if name == "datetime":
+            types[name] = pa.timestamp("s")
+        elif decoder is None:
+            types[name] = pa.string()
+        elif isinstance(decoder, dict):
+            types[name] = pa.dictionary(pa.int8(), pa.string())
+        elif decoder is decode_okta:
+            types[name] = pa.int8()
+        else:
+            types[name] = pa.float64()
+    types["c_nlayers"] = pa.int8()
+
+    return types
+
+
+TYPES = _schema()
+
+
+def _array(batch, name, type):
+    """Convert column of the batch to an Arrow array of type."""
+    col = batch[name]
+    if pa.types.is_dictionary(type):
+        if name not in batch.categories:
+            return pa.array(col, type=pa.string(), from_pandas=True).dictionary_encode().cast(type)
+        dictionary = pa.array([CODE_TABLES[name][c] for c in CATEGORIES[name]], type=pa.string())
+        return pa.DictionaryArray.from_arrays(pa.array(col, mask=col < 0, type=pa.int8()), dictionary)
+    elif pa.types.is_timestamp(type):
+        return pa.array(decode_datetime(col), type=type)
+    elif pa.types.is_string(type):
+        return pa.array(col.astype(object), mask=col == "", type=type)
+    elif pa.types.is_integer(type):
+        missing = np.isnan(col)
+        return pa.array(np.where(missing, 0, col).astype(np.int8), mask=missing, type=type)
+    else:
+        return pa.array(col, mask=np.isnan(col), type=type)
+
+
+def batch_to_table(batch, invalid=False):
+    """Convert batch to an Arrow table.
+
+    Parameters
+    ----------
+    batch : SynopBatch
+        Decoded reports, preferably decoded in compact mode
+    invalid : bool
+        If True keep the rows of reports which could not be decoded
+
+    Returns
+    -------
+    pyarrow.Table
+        Columns in the order of ``COLUMN_NAMES`` with the types of ``TYPES``
+        followed by additional string columns of the batch. Missing values
+        are null.
+
+    """
+    names = [name for name in COLUMN_NAMES if name in batch]
+    #additional columns, e.g. the metadata of bulletins, are strings
+    names.extend(name for name in batch.keys() if name not in TYPES)
+    types = [TYPES.get(name, pa.string()) for name in names]
+    table = pa.table([_array(batch, name, type) for name, type in zip(names, types)],
+                     schema=pa.schema(list(zip(names, types))))
+    if not invalid:
+        table = table.filter(pa.array(batch.valid))
+
+    return table
+
+
+def _partition_keys(batch, partition_by):
+    """Hive style partition path of each report."""
+    keys = None
+    for name in partition_by:
+        if name in TIME_PARTITIONS:
+            value = np.datetime_as_string(decode_datetime(batch["datetime"]), unit=TIME_PARTITIONS[name])
+        elif name in batch.categories:
+            value = batch.codes(name).astype(str)
+        else:
+            value = batch[name].astype(str)
+        value = np.char.add("{}=".format(name), value)
+        keys = value if keys is None else np.char.add(np.char.add(keys, os.sep), value)
+
+    return keys
+
+
+class ParquetDatasetWriter(object):
+    """Write decoded batches to a Parquet dataset.
+
+    Each written batch is appended as row group to one file per partition.
+    The partitions are directories in the hive format, e.g.
+    ``root/date=2018-09-05/MMMM=AAXX/part-0.parquet``. Columns used for the
+    partitioning are not stored in the files.
+
+    Parameters
+    ----------
+    root : str or path
+        Directory of the dataset
+    partition_by : sequence of str
+        Variables used for the partitioning. Additionally "year", "month" and
+        "date" of the report can be used. Variables with a code table are
+        partitioned by their code.
+    max_open : int
+        Maximum number of open files. If more partitions are written the
+        oldest file is closed and a new file is started for this partition.
+    compression : str
+        Parquet compression
+
+    """
+
+    def __init__(self, root, partition_by=("date", "MMMM"), max_open=64, compression="snappy"):
+        self.root = os.fspath(root)
+        self.partition_by = tuple(partition_by)
+        self.max_open = max_open
+        self.compression = compression
+        self.rows = 0
+        #open writers and number of files written of each partition
+        self._writers = {}
+        self._parts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _writer(self, key, schema):
+        """Return open writer of the partition."""
+        writer = self._writers.pop(key, None)
+        if writer is None:
+            if len(self._writers) >= self.max_open:
+                oldest = next(iter(self._writers))
+                self._writers.pop(oldest).close()
+            part = self._parts.get(key, 0)
+            self._parts[key] = part + 1
+            directory = os.path.join(self.root, key)
+            os.makedirs(directory, exist_ok=True)
+            writer = pq.ParquetWriter(os.path.join(directory, "part-{}.parquet".format(part)), schema,
+                                      compression=self.compression)
+        #keep the most recently used writer last
+        self._writers[key] = writer
+
+        return writer
+
+    def write(self, batch):
+        """Append batch to the dataset.
+
+        Reports which could not be decoded are not written.
+
+        Parameters
+        ----------
+        batch : SynopBatch
+
+        """
+        table = batch_to_table(batch)
+        if not self.partition_by:
+            self._writer("", table.schema).write_table(table)
+            self.rows += len(table)
+            return
+
+        keys = _partition_keys(batch, self.partition_by)[batch.valid]
+        table = table.drop_columns([name for name in self.partition_by if name in table.column_names])
+        unique, inverse = np.unique(keys, return_inverse=True)
+        for i, key in enumerate(unique):
+            part = table.take(pa.array(np.flatnonzero(inverse.ravel() == i)))
+            self._writer(key, part.schema).write_table(part)
+        self.rows += len(table)
+
+    def close(self):
+        """Close all open files."""
+        while self._writers:
+            self._writers.popitem()[1].close()
+
+
+def write_parquet(reports, root, partition_by=("date", "MMMM"), chunksize=100000, max_workers=1, **kwargs):
+    """Decode SYNOP reports into a Parquet dataset.
+
+    The reports are decoded and written chunk by chunk so archives of any size
+    can be converted with bounded memory.
+
+    Parameters
+    ----------
+    reports : iterable of str
+        Raw SYNOP reports
+    root : str or path
+        Directory of the dataset
+    partition_by : sequence of str
+        Variables used for the partitioning (see ``ParquetDatasetWriter``)
+    chunksize : int
+        Number of reports decoded and written at once (size of the row groups)
+    max_workers : int
+        Number of processes used for decoding
+    kwargs
+        Passed to ``batch.iter_batches``, e.g. vars or where
+
+    Returns
+    -------
+    int
+        Number of reports written
+
+    """
+    with ParquetDatasetWriter(root, partition_by) as writer:
+        for batch in iter_batches(reports, chunksize, max_workers, compact=True, **kwargs):
+            writer.write(batch)
+
+    return writer.rows
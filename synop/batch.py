@@ -0,0 +1,615 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Batch decoding of SYNOP reports into columns.
+
+Instead of building one ``synop`` object per report the reports are split
+into their groups with the tokenizer and the groups are collected per slot.
+Each variable is then decoded for the whole batch at once and stored as a
+single NumPy array.
+
+Variables decoded with a code table hold the description of the code in each
+report. In compact mode they hold the index of the code in ``CATEGORIES``
+instead and the descriptions are only stored once per batch.
+
+"""
+
+import logging
+from time import perf_counter
+from itertools import islice
+
+import numpy as np
+
+from . import stats as _stats
+from .tokenizer import tokenize, SLOT_INDEX, EMPTY, CLOUD_LAYER_SLOTS, InvalidReport
+from .vectorized import (decode_int, decode_okta, decode_sTTT, decode_PPPP, decode_vis, decode_wind_dir,
+decode_RRR, decode_7RRRR, decode_cheight, decode_code, category_codes)
+from .code_descriptions import (STATION_TYPE_CODE, WIND_UNIT_CODE, PRECIP_GROUP_CODE,
+STATION_OPERATION_TYPE_CODE, CLOUD_HEIGHT_0_CODE, A_CODE, T_CODE, CURRENT_WEATHER_CODE, WEATHER_COURSE_CODE,
+LOW_CLOUDS_CODE, MEDIUM_CLOUDS_CODE, HIGH_CLOUDS_CODE, CLOUD_TYPE_CODE)
+
+_logger = logging.getLogger(__name__)
+
+
+#format of the column table is (variable, slot, start, stop, decoder, dtype)
+#the decoder is applied to the array of group[start:stop] of all reports in the batch.
+#if decoder is None the raw string is stored, if it is a dict it is used as code table
+#(missing codes are NaN) otherwise it is a vectorized decoder.
+COLUMNS = (("datetime", "s0_datetime", 0, 12, None, "U12"),
+           ("MMMM", "s0_MMMM", 0, 4, STATION_TYPE_CODE, object),
+           ("wind_unit", "s0_YYGGi", 4, 5, WIND_UNIT_CODE, object),
+           ("station_id", "s0_IIiii", 0, 5, None, "U5"),
+           #section 1
+           ("precip_group", "s1_iihVV", 0, 1, PRECIP_GROUP_CODE, object),
+           ("station_operation", "s1_iihVV", 1, 2, STATION_OPERATION_TYPE_CODE, object),
+           ("cloud_height", "s1_iihVV", 2, 3, CLOUD_HEIGHT_0_CODE, object),
+           ("vis", "s1_iihVV", 3, 5, decode_vis, float),
+           ("cloud_cover_tot", "s1_Nddff", 0, 1, decode_okta, float),
+           ("wind_dir", "s1_Nddff", 1, 3, decode_wind_dir, float),
+           ("wind_speed", "s1_Nddff", 3, 5, decode_int, float),
+           ("wind_speed_high", "s1_00fff", 2, 5, decode_int, float),
+           ("t_air", "s1_1sTTT", 1, 5, decode_sTTT, float),
+           ("dewp", "s1_2sTTT", 1, 5, decode_sTTT, float),
+           ("p_baro", "s1_3PPPP", 1, 5, decode_PPPP, float),
+           ("p_slv", "s1_4PPPP", 1, 5, decode_PPPP, float),
+           ("p_tendency", "s1_5appp", 1, 2, A_CODE, object),
+           ("p_diff", "s1_5appp", 2, 5, decode_PPPP, float),
+           ("precip", "s1_6RRRt", 1, 4, decode_RRR, float),
+           ("precip_ref_time", "s1_6RRRt", 4, 5, T_CODE, object),
+           ("current_weather", "s1_7wwWW", 1, 3, CURRENT_WEATHER_CODE, object),
+           ("w_course1", "s1_7wwWW", 3, 4, WEATHER_COURSE_CODE, object),
+           ("w_course2", "s1_7wwWW", 4, 5, WEATHER_COURSE_CODE, object),
+           ("cloud_cover_lowest", "s1_8NCCC", 1, 2, decode_okta, float),
+           ("cloud_type_low", "s1_8NCCC", 2, 3, LOW_CLOUDS_CODE, object),
+           ("cloud_type_medium", "s1_8NCCC", 3, 4, MEDIUM_CLOUDS_CODE, object),
+           ("cloud_type_high", "s1_8NCCC", 4, 5, HIGH_CLOUDS_CODE, object),
+           ("observation_time", "s1_9GGgg", 1, 5, None, "U4"),
+           #section 2
+           ("t_water", "s2_0sTTT", 1, 5, decode_sTTT, float),
+           #section 3
+           ("t_max", "s3_1sTTT", 1, 5, decode_sTTT, float),
+           ("t_min", "s3_2sTTT", 1, 5, decode_sTTT, float),
+           ("snow_height", "s3_4Esss", 2, 5, decode_int, float),
+           ("rad_d_hours", "s3_55SSS", 2, 5, decode_int, float),
+           ("rad_d_net_pos", "s3_55SSS_0", 1, 5, decode_int, float),
+           ("rad_d_net_neg", "s3_55SSS_1", 1, 5, decode_int, float),
+           ("rad_d_global", "s3_55SSS_2", 1, 5, decode_int, float),
+           ("rad_d_diff", "s3_55SSS_3", 1, 5, decode_int, float),
+           ("rad_d_long_down", "s3_55SSS_4", 1, 5, decode_int, float),
+           ("rad_d_long_up", "s3_55SSS_5", 1, 5, decode_int, float),
+           ("rad_d_short", "s3_55SSS_6", 1, 5, decode_int, float),
+           ("rad_h_hours", "s3_553SS", 3, 5, decode_int, float),
+           ("rad_h_net_pos", "s3_553SS_0", 1, 5, decode_int, float),
+           ("rad_h_net_neg", "s3_553SS_1", 1, 5, decode_int, float),
+           ("rad_h_global", "s3_553SS_2", 1, 5, decode_int, float),
+           ("rad_h_diff", "s3_553SS_3", 1, 5, decode_int, float),
+           ("rad_h_long_down", "s3_553SS_4", 1, 5, decode_int, float),
+           ("rad_h_long_up", "s3_553SS_5", 1, 5, decode_int, float),
+           ("rad_h_short", "s3_553SS_6", 1, 5, decode_int, float),
+           ("precip_s3", "s3_6RRRt", 1, 4, decode_RRR, float),
+           ("precip_ref_time_s3", "s3_6RRRt", 4, 5, T_CODE, object),
+           ("precip_24h", "s3_7RRRR", 1, 5, decode_7RRRR, float),
+           )
+
+for _i, _slot in enumerate(CLOUD_LAYER_SLOTS, 1):
+    COLUMNS += (("c{}_cover".format(_i), _slot, 1, 2, decode_okta, float),
+                ("c{}_type".format(_i), _slot, 2, 3, CLOUD_TYPE_CODE, object),
+                ("c{}_height".format(_i), _slot, 3, 5, decode_cheight, float))
+
+COLUMN_NAMES = tuple(c[0] for c in COLUMNS) + ("c_nlayers",)
+
+#decoding status of the reports
+STATUS_OK = 0
+STATUS_PARTIAL = 1
+STATUS_REJECTED = 2
+STATUS_NAMES = ("ok", "partial", "rejected")
+
+#code tables of the categorical variables and their codes with a description
+CODE_TABLES = {c[0]: c[4] for c in COLUMNS if isinstance(c[4], dict)}
+CATEGORIES = {name: tuple(k for k, v in table.items() if isinstance(v, str)) for name, table in CODE_TABLES.items()}
+
+#chunks up to this size are decoded code by code (see ``_decode_codes``)
+SMALL_CHUNK = 256
+#maximum number of decoded codes kept per column, the codes are dropped if it is exceeded
+CODE_CACHE_SIZE = 10000
+#{(variable, compact): ({code: value}, dtype)}, shared by the threads decoding chunks
+_CODE_VALUES = {}
+
+
+def _decode_column(name, groups, start, stop, decoder, dtype, compact=False):
+    """Decode the groups of one slot for all reports of a chunk.
+
+    Parameters
+    ----------
+    name : str
+        Variable name
+    groups : numpy.ndarray of uint8
+        Characters of the groups with shape (n, 5)
+
+    """
+    codes = np.ascontiguousarray(groups[:, start:stop]).view("S{}".format(stop - start)).ravel()
+    if decoder is None:
+        return codes.astype(dtype)
+    elif isinstance(decoder, dict):
+        if compact:
+            return category_codes(codes, CATEGORIES[name])
+        return decode_code(codes, decoder)
+    else:
+        return decoder(codes).astype(dtype)
+
+
+def _decode_codes(name, groups, size, start, stop, decoder, dtype, compact=False):
+    """Decode the groups of one slot for a small chunk code by code.
+
+    The codes are decoded with ``_decode_column`` once and their values are
+    kept, so small chunks (e.g. the micro-batches of ``aio.decode_stream``) do not
+    pay the fixed cost of the array operations for every column.
+
+    Parameters
+    ----------
+    name : str
+        Variable name
+    groups : sequence of str or bytes
+        Groups of the slot of each report
+    size : int
+        Length of the groups of the slot
+
+    """
+    cache = _CODE_VALUES.get((name, compact))
+    if cache is None:
+        empty = _decode_column(name, np.zeros((0, size), dtype=np.uint8), start, stop, decoder, dtype, compact)
+        cache = _CODE_VALUES[(name, compact)] = ({}, empty.dtype)
+    values, out_dtype = cache
+
+    try:
+        return np.array([values[group[start:stop]] for group in groups], dtype=out_dtype)
+    except KeyError:
+        pass
+    #decode the new codes at once
+    new = {group[start:stop]: group for group in groups if group[start:stop] not in values}
+    chars = np.array(list(new.values()), dtype="S{}".format(size)).view(np.uint8).reshape(len(new), size)
+    decoded = dict(zip(new, _decode_column(name, chars, start, stop, decoder, dtype, compact)))
+    #chunks are decoded in several threads (e.g. by aio.decode_stream), codes are never removed from a
+    #dict which may be read by another thread, a full dict is replaced instead
+    if len(values) + len(decoded) > CODE_CACHE_SIZE:
+        _CODE_VALUES[(name, compact)] = (decoded, out_dtype)
+    else:
+        values.update(decoded)
+
+    return np.array([decoded[code] if code in decoded else values[code]
+                     for code in (group[start:stop] for group in groups)], dtype=out_dtype)
+
+
+def iter_chunks(reports, chunksize):
+    """Split iterable of reports into lists of chunksize reports."""
+    reports = iter(reports)
+    while True:
+        chunk = list(islice(reports, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _select_columns(vars):
+    """Columns needed for the variables, all if vars is None."""
+    if vars is None:
+        return COLUMNS
+    unknown = set(vars).difference(COLUMN_NAMES)
+    if unknown:
+        raise ValueError("Unknown variables {}".format(sorted(unknown)))
+    wanted = set(vars)
+    if "c_nlayers" in wanted:
+        wanted.update("c{}_cover".format(i) for i in range(1, len(CLOUD_LAYER_SLOTS) + 1))
+
+    return tuple(c for c in COLUMNS if c[0] in wanted)
+
+
+def _text(group):
+    """Decode group of a bytes report."""
+    return group.decode("ascii", errors="replace") if isinstance(group, bytes) else group
+
+
+def decode_chunk(reports, compact=False, vars=None, status=False, tokenizer=tokenize):
+    """Decode a list of reports into columns.
+
+    Parameters
+    ----------
+    reports : list of str or bytes
+        Raw SYNOP reports
+    compact : bool
+        If True variables with a code table are stored as int8 index into
+        ``CATEGORIES`` (-1 if missing) instead of the description.
+    vars : list of str
+        Variables to decode, all variables in ``COLUMN_NAMES`` if None
+    status : bool
+        If True tag each report as ok, partial (groups not used) or rejected
+    tokenizer : callable
+        Called with each report and the errors list (or None) and returning
+        the groups of the report (see ``tokenizer.tokenize``)
+
+    Returns
+    -------
+    columns : dict of numpy.ndarray
+        One array per variable in vars or ``COLUMN_NAMES``
+    valid : numpy.ndarray of bool
+        False for reports which could not be decoded
+    categories : dict of tuple
+        Categories of the compact variables, empty if not compact
+    issues : dict or None
+        If status is True "status" (int8 array, see ``STATUS_NAMES``), "reason"
+        and "group" (reason and first offending group of each report, "" if
+        ok) and "rejected" (list of (index, report, reason, group) of the
+        rejected reports)
+
+    """
+    rows = []
+    valid = np.ones(len(reports), dtype=bool)
+    if status:
+        issues = {"status": np.zeros(len(reports), dtype=np.int8),
+                  "reason": np.full(len(reports), "", dtype=object),
+                  "group": np.full(len(reports), "", dtype=object),
+                  "rejected": []}
+        errors = []
+    else:
+        issues = errors = None
+    stats = _stats.active
+    if stats is not None:
+        t_start = perf_counter()
+        #the rejected groups are only reported if they are collected
+        if errors is None:
+            errors = []
+
+    for i, report in enumerate(reports):
+        try:
+            rows.append(tokenizer(report, errors))
+        except InvalidReport as e:
+            _logger.debug("Could not decode report %r", report)
+            rows.append(EMPTY)
+            valid[i] = False
+            if stats is not None:
+                stats.add_failure(e.reason)
+            if status:
+                group = _text(e.group)
+                issues["status"][i] = STATUS_REJECTED
+                issues["reason"][i] = e.reason
+                issues["group"][i] = group
+                issues["rejected"].append((i, report, e.reason, group))
+        if errors:
+            if stats is not None:
+                for reason, group in errors:
+                    stats.add_failure(reason)
+            if status:
+                issues["status"][i] = STATUS_PARTIAL
+                issues["reason"][i] = errors[0][0]
+                issues["group"][i] = _text(errors[0][1])
+            errors.clear()
+    if stats is not None:
+        stats.add_tokenizer(len(reports), perf_counter() - t_start)
+
+    #transpose rows of groups into one tuple of groups per slot
+    slots = list(zip(*rows)) if rows else [()] * len(EMPTY)
+
+    columns = {}
+    chars = {}
+    #time of the columns of each section
+    seconds = {}
+    #small chunks are decoded code by code if the groups are not needed for the statistics
+    small = len(reports) <= SMALL_CHUNK and stats is None
+    for name, slot, start, stop, decoder, dtype in _select_columns(vars):
+        size = 12 if slot == "s0_datetime" else 5
+        if small:
+            columns[name] = _decode_codes(name, slots[SLOT_INDEX[slot]], size, start, stop, decoder, dtype, compact)
+            continue
+        if stats is not None:
+            t = perf_counter()
+        if slot not in chars:
+            groups = np.array(slots[SLOT_INDEX[slot]], dtype="S{}".format(size))
+            chars[slot] = groups.view(np.uint8).reshape(len(groups), size)
+        columns[name] = _decode_column(name, chars[slot], start, stop, decoder, dtype, compact)
+        if stats is not None:
+            t = perf_counter() - t
+            stats.add_handler(_section(slot), name, _decoder_name(decoder, compact), t, calls=len(reports))
+            seconds[_section(slot)] = seconds.get(_section(slot), 0.0) + t
+
+    if vars is None or "c_nlayers" in vars:
+        covers = [columns["c{}_cover".format(i)] for i in range(1, len(CLOUD_LAYER_SLOTS) + 1)]
+        columns["c_nlayers"] = np.sum(~np.isnan(covers), axis=0).astype(float)
+    if vars is not None:
+        columns = {name: columns[name] for name in vars}
+
+    categories = {name: CATEGORIES[name] for name in columns if name in CATEGORIES} if compact else {}
+    if stats is not None:
+        for sname, t in seconds.items():
+            stats.add_section(sname, t)
+        _count_columns(stats, columns, valid, categories, chars, vars)
+        stats.add_reports(len(reports), perf_counter() - t_start, rejected=int(np.count_nonzero(~valid)))
+
+    return columns, valid, categories, issues
+
+
+def _section(slot):
+    """Section name of a slot, e.g. "section_3" of "s3_8NChh"."""
+    return "section_" + slot[1]
+
+
+def _decoder_name(decoder, compact):
+    """Name of the vectorized decoder of a column for ``stats.DecoderStats``."""
+    if decoder is None:
+        return "raw"
+    elif isinstance(decoder, dict):
+        return "category_codes" if compact else "decode_code"
+
+    return decoder.__name__
+
+
+def _count_columns(stats, columns, valid, categories, chars, vars):
+    """Count the missing values of the columns of a decoded chunk.
+
+    A value is counted as missing if the group of the variable is not in the
+    report and as NaN if the group is present but the value is missing.
+
+    """
+    batch = SynopBatch(columns, valid, categories)
+    for name, slot, start, stop, decoder, dtype in _select_columns(vars):
+        #cloud covers decoded for c_nlayers only
+        if name not in columns:
+            continue
+        absent = ~batch.mask(name) & valid
+        reported = chars[slot][:, 0] != 0
+        stats.add_values(_section(slot), name, missing=int(np.count_nonzero(absent & ~reported)),
+                         nan=int(np.count_nonzero(absent & reported)))
+
+
+class SynopBatch(object):
+    """Decoded SYNOP reports stored as one array per variable.
+
+    Missing values are NaN in float and object columns, "" in string columns
+    and -1 in categorical columns.
+
+    Attributes
+    ----------
+    columns : dict of numpy.ndarray
+        Decoded variables
+    valid : numpy.ndarray of bool
+        Validity mask, False for reports which could not be decoded
+    categories : dict of tuple
+        Codes of the categorical (compact) variables. The column holds the
+        index of the code in this tuple.
+    status : numpy.ndarray of int8 or None
+        Status of each report (index into ``STATUS_NAMES``) if decoded with status
+    reason, group : numpy.ndarray of str or None
+        Reason and first offending group of each report which is not ok
+    rejected : list
+        (index, report, reason, group) of the rejected reports
+
+    """
+
+    def __init__(self, columns, valid, categories=None, issues=None):
+        self.columns = columns
+        self.valid = valid
+        self.categories = categories or {}
+        issues = issues or {}
+        self.status = issues.get("status")
+        self.reason = issues.get("reason")
+        self.group = issues.get("group")
+        self.rejected = issues.get("rejected", [])
+
+    def __len__(self):
+        return len(self.valid)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __repr__(self):
+        return "<SynopBatch: {} reports, {} variables>".format(len(self), len(self.columns))
+
+    def keys(self):
+        """Names of the decoded variables."""
+        return self.columns.keys()
+
+    def mask(self, name):
+        """Return mask which is True where variable is present.
+
+        Parameters
+        ----------
+        name : str
+            Variable name
+
+        Returns
+        -------
+        numpy.ndarray of bool
+
+        """
+        col = self.columns[name]
+        if name in self.categories:
+            present = col >= 0
+        elif col.dtype.kind == "U":
+            present = col != ""
+        elif col.dtype.kind == "O":
+            present = np.array([v is not None and v == v for v in col], dtype=bool)
+        else:
+            present = ~np.isnan(col)
+
+        return present & self.valid
+
+    def codes(self, name):
+        """Return the raw codes of a categorical variable.
+
+        Parameters
+        ----------
+        name : str
+            Variable name
+
+        Returns
+        -------
+        numpy.ndarray of object
+            Codes, NaN if missing
+
+        """
+        lookup = np.array(self.categories[name] + (np.nan,), dtype=object)
+
+        return lookup[self.columns[name]]
+
+    def describe(self, name):
+        """Return the descriptions of a variable decoded with a code table.
+
+        Parameters
+        ----------
+        name : str
+            Variable name
+
+        Returns
+        -------
+        numpy.ndarray of object
+            Descriptions as in the non compact mode, NaN if missing
+
+        """
+        if name not in self.categories:
+            return self.columns[name]
+        table = CODE_TABLES[name]
+        lookup = np.array([table[c] for c in self.categories[name]] + [np.nan], dtype=object)
+
+        return lookup[self.columns[name]]
+
+    def convert_units(self, kelvin=False, pascal=False, meters=False):
+        """Return batch with converted units (see ``units.convert_units``)."""
+        from .units import convert_units
+        return convert_units(self, kelvin, pascal, meters)
+
+    def to_dataframe(self, float_dtype="float64", invalid=False):
+        """Convert batch to a pandas DataFrame (see ``frame.batch_to_dataframe``)."""
+        from .frame import batch_to_dataframe
+        return batch_to_dataframe(self, float_dtype, invalid)
+
+    @classmethod
+    def concat(cls, batches):
+        """Concatenate batches.
+
+        Parameters
+        ----------
+        batches : list of SynopBatch
+
+        Returns
+        -------
+        SynopBatch
+
+        """
+        batches = list(batches)
+        if len(batches) == 1:
+            return batches[0]
+        if not batches:
+            return cls(*decode_chunk([]))
+
+        columns = {k: np.concatenate([b.columns[k] for b in batches]) for k in batches[0].columns}
+        valid = np.concatenate([b.valid for b in batches])
+        issues = None
+        if all(b.status is not None for b in batches):
+            offsets = np.cumsum([0] + [len(b) for b in batches])
+            issues = {k: np.concatenate([getattr(b, k) for b in batches]) for k in ("status", "reason", "group")}
+            issues["rejected"] = [(offset + i, report, reason, group)
+                                  for offset, b in zip(offsets, batches) for i, report, reason, group in b.rejected]
+
+        return cls(columns, valid, batches[0].categories, issues)
+
+
+def iter_batches(reports, chunksize=100000, max_workers=1, compact=False, vars=None, where=None, status=False,
+                 quarantine=None):
+    """Decode SYNOP reports chunk by chunk.
+
+    Only one chunk (or two per worker) is held in memory at a time.
+
+    Parameters
+    ----------
+    reports : iterable of str
+        Raw SYNOP reports
+    chunksize : int
+        Number of reports decoded at once
+    max_workers : int
+        Number of processes used for decoding the chunks (see ``parallel.iter_decode``).
+        None uses one process per CPU.
+    compact : bool
+        If True variables with a code table are stored as categories
+        (see ``decode_chunk``)
+    vars : list of str
+        Variables to decode, all variables in ``COLUMN_NAMES`` if None
+    where : callable
+        Filter called with each raw report (e.g. ``filters.ReportFilter``).
+        Only reports for which it returns True are decoded.
+    status : bool
+        If True tag each report as ok, partial or rejected (see ``decode_chunk``)
+    quarantine : object with append method
+        Side channel for the rejected reports, e.g. a list. (index, report,
+        reason, group) is appended for each rejected report with the index
+        of the report in the decoded reports. Implies status.
+
+    Yields
+    ------
+    SynopBatch
+        Decoded chunk in the order of the reports
+
+    """
+    if where is not None:
+        reports = filter(where, reports)
+    status = status or quarantine is not None
+    if max_workers != 1:
+        from .parallel import iter_decode
+        batches = iter_decode(reports, chunksize, max_workers, ordered=True, compact=compact, vars=vars,
+                              status=status)
+    else:
+        batches = ((offset, SynopBatch(*decode_chunk(chunk, compact, vars, status)))
+                   for offset, chunk in _offsets(iter_chunks(reports, chunksize)))
+
+    for offset, batch in batches:
+        if quarantine is not None:
+            for i, report, reason, group in batch.rejected:
+                quarantine.append((offset + i, report, reason, group))
+        yield batch
+
+
+def _offsets(chunks):
+    """Iterate over (index of first report, chunk)."""
+    offset = 0
+    for chunk in chunks:
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def decode_many(reports, chunksize=100000, max_workers=1, compact=False, vars=None, where=None, status=False,
+                quarantine=None):
+    """Decode SYNOP reports into a column store.
+
+    Parameters
+    ----------
+    reports : iterable of str
+        Raw SYNOP reports
+    chunksize : int
+        Number of reports decoded at once. Limits the memory used by the
+        intermediate groups.
+    max_workers : int
+        Number of processes used for decoding the chunks (see ``parallel.iter_decode``).
+        None uses one process per CPU.
+    compact : bool
+        If True variables with a code table are stored as int8 index into
+        ``SynopBatch.categories`` instead of the description of every report.
+        Use ``SynopBatch.describe`` to get the descriptions.
+    vars : list of str
+        Variables to decode, all variables in ``COLUMN_NAMES`` if None
+    where : callable
+        Filter called with each raw report (e.g. ``filters.ReportFilter``).
+        Only reports for which it returns True are decoded.
+    status : bool
+        If True tag each report as ok, partial or rejected (``SynopBatch.status``)
+    quarantine : object with append method
+        Side channel for the rejected reports (see ``iter_batches``)
+
+    Returns
+    -------
+    SynopBatch
+
+    """
+    batches = iter_batches(reports, chunksize, max_workers, compact, vars, where, status, quarantine)
+
+    return SynopBatch.concat(batches)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""GTS bulletins of SYNOP reports.
+
+A bulletin starts with the abbreviated heading ``TTAAii CCCC YYGGgg [BBB]``
+followed by ``AAXX YYGGi`` which is shared by all station blocks of the
+bulletin. Each station block starts with the station id IIiii and is
+terminated by "=":
+
+.. code-block:: none
+
+    ZCZC 123
+    SMDL01 EDZW 051400 RRA
+    AAXX 05141
+    10224 42680 50704 10230 20139 30174 40180 58010=
+    10384 11460 82820 11012=
+    NNNN
+
+Section 0 is parsed once per bulletin and the station blocks are tokenized
+against it (see ``tokenizer.tokenize_block``). The heading is added to the
+decoded reports as metadata columns.
+
+"""
+
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .batch import SynopBatch, decode_chunk, iter_chunks
+from .dedup import NEW, CORRECTION
+from .lazy import LazyPattern
+from .reader import _open
+from .tokenizer import tokenize_block
+
+_logger = logging.getLogger(__name__)
+
+#abbreviated heading: data type and area (TTAAii), originating centre (CCCC),
+#time of the bulletin (YYGGgg) and the indicator of delayed, corrected or
+#amended bulletins (BBB, e.g. RRA, CCA, AAA)
+heading_re = LazyPattern(r"(?P<TTAAii>[A-Z]{4}\d\d)\s+(?P<CCCC>[A-Z]{4})\s+(?P<YYGGgg>\d{6})(\s+(?P<BBB>[A-Z]{3}))?")
+#section 0 shared by the station blocks
+section_0_re = LazyPattern(r"\s*(?P<MMMM>AAXX)\s+(?P<YYGGi>\d{5})\s")
+#end of a bulletin
+END_MARKERS = ("NNNN", "\x03")
+
+#metadata columns added to the decoded reports and their dtype
+BULLETIN_COLUMNS = (("bulletin_heading", "U6"), ("bulletin_centre", "U4"), ("bulletin_time", "U6"),
+                    ("bulletin_bbb", "U3"))
+
+
+def _report_time(yyggi, reference):
+    """Timestamp of the reports from day and hour of YYGGi.
+
+    The year and month are those of the reference time or of the month
+    before if the day is after the day of the reference time.
+
+    """
+    day = int(yyggi[:2])
+    year, month = reference.year, reference.month
+    if day > reference.day:
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+    return "{:04d}{:02d}{}{}00".format(year, month, yyggi[:2], yyggi[2:4])
+
+
+class Bulletin(object):
+    """SYNOP bulletin with a shared section 0.
+
+    Attributes
+    ----------
+    heading : str
+        Data type and area designator TTAAii, e.g. "SMDL01"
+    centre : str
+        Originating centre CCCC, e.g. "EDZW"
+    time : str
+        Time of the bulletin YYGGgg
+    bbb : str
+        Indicator of delayed (RRx), corrected (CCx) or amended (AAx)
+        bulletins, "" if not given
+    station_type : str
+        MMMM of the station blocks
+    yyggi : str
+        YYGGi of the station blocks
+    datetime : str
+        12 digit timestamp of the reports
+    blocks : list of str
+        Station blocks (IIiii followed by sections 1-9) without "=".
+        Blocks with NIL are left out.
+
+    """
+
+    def __init__(self, heading, centre, time, bbb, station_type, yyggi, datetime, blocks):
+        self.heading = heading
+        self.centre = centre
+        self.time = time
+        self.bbb = bbb
+        self.station_type = station_type
+        self.yyggi = yyggi
+        self.datetime = datetime
+        self.blocks = blocks
+
+    def __repr__(self):
+        return "<Bulletin: {} {} {}{} ({} stations)>".format(self.heading, self.centre, self.time,
+                                                             " " + self.bbb if self.bbb else "", len(self.blocks))
+
+    def __len__(self):
+        return len(self.blocks)
+
+    @property
+    def section_0(self):
+        """Timestamp, MMMM and YYGGi shared by the station blocks."""
+        return (self.datetime, self.station_type, self.yyggi)
+
+    @classmethod
+    def parse(cls, text, reference=None):
+        """Parse a bulletin.
+
+        Parameters
+        ----------
+        text : str
+            Bulletin, lines before the heading (e.g. "ZCZC 123") and after
+            "NNNN" are ignored
+        reference : datetime
+            Time used to complete the year and month of the reports, default
+            is the current time (UTC)
+
+        Returns
+        -------
+        Bulletin
+
+        Raises
+        ------
+        ValueError
+            If the heading or section 0 is missing or the bulletin is not a
+            bulletin of land stations (AAXX)
+
+        """
+        lines = text.splitlines()
+        heading = None
+        for i, line in enumerate(lines):
+            heading = heading_re.fullmatch(line.strip())
+            if heading is not None:
+                break
+        if heading is None:
+            raise ValueError("No heading in bulletin: {!r}".format(text[:40]))
+
+        body = "\n".join(lines[i + 1:])
+        section_0 = section_0_re.match(body + "\n")
+        if section_0 is None:
+            raise ValueError("Bulletin {} is not a bulletin of land stations (AAXX)".format(heading.group(0)))
+        body = body[section_0.end():]
+        for marker in END_MARKERS:
+            body = body.split(marker, 1)[0]
+
+        blocks = []
+        for block in body.split("="):
+            block = block.strip()
+            if block and block.split(None, 1)[1:] != ["NIL"]:
+                blocks.append(block)
+
+        yyggi = section_0.group("YYGGi")
+        if reference is None:
+            reference = datetime.now(timezone.utc)
+
+        return cls(heading.group("TTAAii"), heading.group("CCCC"), heading.group("YYGGgg"),
+                   heading.group("BBB") or "", section_0.group("MMMM"), yyggi, _report_time(yyggi, reference), blocks)
+
+    def tokenize(self, errors=None):
+        """Iterate over the groups of the station blocks.
+
+        Parameters
+        ----------
+        errors : list
+            See ``tokenizer.tokenize``
+
+        Yields
+        ------
+        list of str
+            Raw groups of each station block ordered as in ``tokenizer.SLOTS``
+
+        Raises
+        ------
+        InvalidReport
+            If the station id of a block is not valid
+
+        """
+        section_0 = self.section_0
+        for block in self.blocks:
+            yield tokenize_block(block, section_0, errors)
+
+    def decode(self, **kwargs):
+        """Decode the station blocks (see ``decode_bulletins``)."""
+        return decode_bulletins([self], **kwargs)
+
+
+def iter_bulletins(source, encoding="ascii", reference=None):
+    """Iterate over the SYNOP bulletins in a file.
+
+    A bulletin starts with a heading line and ends with "NNNN" or the next
+    heading. Bulletins which are not bulletins of land stations (AAXX) are
+    skipped.
+
+    Parameters
+    ----------
+    source : str, path or file object
+        See ``reader.iter_reports``
+    encoding : str
+        Encoding of the file. Invalid characters are replaced.
+    reference : datetime
+        See ``Bulletin.parse``
+
+    Yields
+    ------
+    Bulletin
+
+    """
+    if reference is None:
+        reference = datetime.now(timezone.utc)
+
+    lines = []
+    with _open(source, encoding) as f:
+        for line in f:
+            stripped = line.strip()
+            if heading_re.fullmatch(stripped) or stripped in END_MARKERS:
+                if lines:
+                    yield from _parse(lines, reference)
+                lines = [] if stripped in END_MARKERS else [line]
+            elif lines:
+                lines.append(line)
+
+    if lines:
+        yield from _parse(lines, reference)
+
+
+def _parse(lines, reference):
+    """Parse bulletin from its lines, nothing if it is not a SYNOP bulletin."""
+    try:
+        yield Bulletin.parse("".join(lines), reference)
+    except ValueError as e:
+        _logger.debug("Skipping bulletin: %s", e)
+
+
+def _tokenize_block(item, errors):
+    """Tokenize (block, section_0, metadata) item."""
+    return tokenize_block(item[0], item[1], errors)
+
+
+def decode_bulletins(bulletins, chunksize=100000, compact=False, vars=None, status=False, dedup=None):
+    """Decode the station blocks of bulletins into a column store.
+
+    Parameters
+    ----------
+    bulletins : iterable of Bulletin
+    chunksize : int
+        Number of station blocks decoded at once
+    compact, vars, status
+        See ``batch.decode_many``. The reports of the rejected reports
+        (``SynopBatch.rejected``) are (block, section_0, metadata) tuples.
+    dedup : dedup.Deduplicator
+        If given station blocks which are duplicates or stale corrections
+        (by the BBB of the heading) of known reports are skipped
+
+    Returns
+    -------
+    SynopBatch
+        One row per station block with the additional columns of
+        ``BULLETIN_COLUMNS``
+
+    """
+    items = ((block, b.section_0, (b.heading, b.centre, b.time, b.bbb)) for b in bulletins for block in b.blocks)
+    if dedup is not None:
+        items = (item for item in items
+                 if dedup.add(item[0], item[2][3], (item[0].split(None, 1)[0], item[1][0])) in (NEW, CORRECTION))
+    batches = []
+    for chunk in iter_chunks(items, chunksize):
+        batch = SynopBatch(*decode_chunk(chunk, compact, vars, status, tokenizer=_tokenize_block))
+        metadata = list(zip(*(item[2] for item in chunk)))
+        for (name, dtype), values in zip(BULLETIN_COLUMNS, metadata):
+            batch.columns[name] = np.array(values, dtype=dtype)
+        batches.append(batch)
+
+    batch = SynopBatch.concat(batches)
+    if not batches:
+        for name, dtype in BULLETIN_COLUMNS:
+            batch.columns[name] = np.array([], dtype=dtype)
+
+    return batch
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""On-disk cache of decoded archive files.
+
+The decoded columns of a file are stored as one ``.npy`` file per column and
+a JSON manifest in a directory named after the hash of the file content, the
+version of the decoded columns (``DECODER_VERSION``) and the selected
+variables. The content hash of a file is kept by its path, size and
+modification time, so an unchanged file is not read to find its entry. Cached batches are loaded
+memory mapped, so unchanged archives are available without decoding them
+again and without reading the columns into memory.
+
+The columns are stored in compact mode (see ``batch.decode_many``), every
+column is a plain numpy array then. Options of ``decode_many`` which change
+the decoded batch (e.g. status or where) are not part of the key and are
+refused.
+
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+
+import numpy as np
+
+from .batch import SynopBatch, decode_many
+from .reader import iter_reports, decode_file
+
+_logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+#directory of the content hashes of the archive files by path, size and modification time
+HASHES = ".hashes"
+
+#version of the decoded columns, bump it when columns are added or removed or their values change
+DECODER_VERSION = 1
+
+#options of decode_many which do not change the decoded batch
+DECODE_OPTIONS = ("chunksize", "max_workers")
+
+
+def file_hash(path, blocksize=1 << 20):
+    """Return the SHA-256 hex digest of the content of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(blocksize), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _size(directory):
+    """Total size of the files in a directory."""
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+class DecodedCache(object):
+    """Cache of the decoded columns of archive files.
+
+    Parameters
+    ----------
+    root : str or path
+        Directory of the cache
+    max_size : int
+        Maximum total size of the cache in bytes. The least recently used
+        entries are removed when it is exceeded.
+    max_age : float
+        Maximum time in seconds since an entry was last used
+
+    """
+
+    def __init__(self, root, max_size=None, max_age=None):
+        self.root = os.fspath(root)
+        self.max_size = max_size
+        self.max_age = max_age
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, path, vars=None):
+        """Return the cache key of a file.
+
+        Parameters
+        ----------
+        path : str or path
+            Archive file
+        vars : list of str
+            Decoded variables, all if None
+
+        Returns
+        -------
+        str
+
+        """
+        digest = hashlib.sha256(self._file_hash(path).encode("ascii"))
+        digest.update(str(DECODER_VERSION).encode("ascii"))
+        digest.update(json.dumps(None if vars is None else list(vars)).encode("ascii"))
+
+        return digest.hexdigest()
+
+    def _file_hash(self, path):
+        """Content hash of a file, only computed again if its size or modification time changed."""
+        path = os.path.abspath(os.fsdecode(path))
+        st = os.stat(path)
+        stat = "{}\n{}\n{}".format(path, st.st_size, st.st_mtime_ns).encode("utf-8", "surrogateescape")
+        directory = os.path.join(self.root, HASHES)
+        name = os.path.join(directory, hashlib.sha256(stat).hexdigest())
+        try:
+            with open(name) as f:
+                digest = f.read()
+            #the modification time is the time of the last use (see evict)
+            os.utime(name)
+            return digest
+        except FileNotFoundError:
+            pass
+
+        digest = file_hash(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            f.write(digest)
+        os.replace(tmp, name)
+
+        return digest
+
+    def get(self, path, vars=None):
+        """Load the cached batch of a file.
+
+        Parameters
+        ----------
+        path : str or path
+            Archive file
+        vars : list of str
+            Decoded variables, all if None
+
+        Returns
+        -------
+        SynopBatch or None
+            Batch with memory mapped read-only columns or None if the file is
+            not cached
+
+        """
+        return self._load(self.key(path, vars))
+
+    def put(self, path, batch, vars=None):
+        """Store the batch of a file.
+
+        Parameters
+        ----------
+        path : str or path
+            Archive file
+        batch : SynopBatch
+            Batch decoded from the file in compact mode
+        vars : list of str
+            Decoded variables, all if None
+
+        """
+        self._store(self.key(path, vars), batch, os.fspath(path), vars)
+        self.evict()
+
+    def decode(self, path, vars=None, **kwargs):
+        """Return the batch of a file from the cache or decode and store it.
+
+        Parameters
+        ----------
+        path : str or path
+            Archive file, read with gzip if it ends with .gz
+        vars : list of str
+            Variables to decode, all if None
+        kwargs
+            Passed to ``batch.decode_many`` if the file is decoded, only
+            chunksize and max_workers
+
+        Returns
+        -------
+        SynopBatch
+
+        Raises
+        ------
+        TypeError
+            If kwargs contains other options, their result would not match
+            the cached batch
+
+        """
+        unknown = sorted(set(kwargs).difference(DECODE_OPTIONS))
+        if unknown:
+            raise TypeError("Cannot cache batches decoded with {}".format(", ".join(unknown)))
+
+        key = self.key(path, vars)
+        batch = self._load(key)
+        if batch is not None:
+            return batch
+
+        if os.fspath(path)[-3:] in (".gz", b".gz"):
+            batch = decode_many(iter_reports(path), compact=True, vars=vars, **kwargs)
+        else:
+            batch = decode_file(path, compact=True, vars=vars, **kwargs)
+        self._store(key, batch, os.fspath(path), vars)
+        self.evict()
+        cached = self._load(key)
+
+        return batch if cached is None else cached
+
+    def _load(self, key):
+        """Load batch of the entry, None if it does not exist."""
+        directory = os.path.join(self.root, key)
+        try:
+            with open(os.path.join(directory, MANIFEST)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        columns = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+                   for name in manifest["columns"]}
+        valid = np.load(os.path.join(directory, "valid.npy"), mmap_mode="r")
+        categories = {name: tuple(codes) for name, codes in manifest["categories"].items()}
+        #the modification time of the manifest is the time of the last use
+        os.utime(os.path.join(directory, MANIFEST))
+
+        return SynopBatch(columns, valid, categories)
+
+    def _store(self, key, batch, source, vars):
+        """Write the batch into a new entry."""
+        for name, col in batch.columns.items():
+            if col.dtype == object:
+                raise ValueError("Column {} is not compact, decode the file with compact=True".format(name))
+
+        #write into a temporary directory and rename it so readers never see partial entries
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+        try:
+            for name, col in batch.columns.items():
+                np.save(os.path.join(tmp, name + ".npy"), col)
+            np.save(os.path.join(tmp, "valid.npy"), batch.valid)
+            manifest = {"source": source,
+                        "version": DECODER_VERSION,
+                        "vars": None if vars is None else list(vars),
+                        "rows": len(batch),
+                        "columns": list(batch.columns),
+                        "categories": {name: list(codes) for name, codes in batch.categories.items()},
+                        "created": time.time()}
+            with open(os.path.join(tmp, MANIFEST), "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, os.path.join(self.root, key))
+        except OSError:
+            #an entry of another process with the same key already exists
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.exists(os.path.join(self.root, key, MANIFEST)):
+                raise
+
+    def entries(self):
+        """Return the entries of the cache.
+
+        Returns
+        -------
+        list of (key, size, last_used)
+            Ordered from least to most recently used
+
+        """
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                last_used = os.stat(os.path.join(entry.path, MANIFEST)).st_mtime
+            except FileNotFoundError:
+                continue
+            entries.append((entry.name, _size(entry.path), last_used))
+
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self):
+        """Remove entries older than max_age and the least recently used entries above max_size.
+
+        Content hashes of files not used for max_age are also removed.
+
+        Returns
+        -------
+        list of str
+            Keys of the removed entries
+
+        """
+        entries = self.entries()
+        total = sum(size for key, size, last_used in entries)
+        now = time.time()
+        removed = []
+        for key, size, last_used in entries:
+            expired = self.max_age is not None and now - last_used > self.max_age
+            if not expired and (self.max_size is None or total <= self.max_size):
+                continue
+            _logger.debug("Removing cache entry %s", key)
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+
+        if self.max_age is not None and os.path.isdir(os.path.join(self.root, HASHES)):
+            for entry in os.scandir(os.path.join(self.root, HASHES)):
+                try:
+                    if now - entry.stat().st_mtime > self.max_age:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    #removed by another process
+                    pass
+
+        return removed
+
+    def clear(self):
+        """Remove all entries and the content hashes of the files."""
+        for key, size, last_used in self.entries():
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+        shutil.rmtree(os.path.join(self.root, HASHES), ignore_errors=True)
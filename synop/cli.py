@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Command line batch decoder.
+
+Decodes archive files (or stdin) into CSV, NDJSON, Parquet or NumPy files::
+
+    synop-decode -j 4 -f parquet -o out/ --stations 10224,10384 "archive/*.txt"
+
+A summary with the number of decoded and rejected reports and the throughput
+is printed to stderr at the end.
+
+"""
+
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+from itertools import chain
+
+import numpy as np
+
+from .batch import COLUMN_NAMES, STATUS_REJECTED, iter_batches
+from .filters import ReportFilter
+from .reader import iter_reports, iter_mapped_reports
+
+FORMATS = ("csv", "ndjson", "parquet", "npy")
+#partition keys derived from the time of the report (see ``arrow.TIME_PARTITIONS``)
+TIME_PARTITIONS = ("year", "month", "date")
+#output format of the file extensions
+EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "ndjson", ".parquet": "parquet",
+              ".npy": "npy"}
+
+
+class _TextWriter(object):
+    """Write batches to a CSV or NDJSON file, "-" is stdout."""
+
+    def __init__(self, path, format):
+        self.format = format
+        self._header = True
+        self._file = sys.stdout if path == "-" else open(path, "w", newline="")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, batch):
+        from .frame import batch_to_dataframe
+        df = batch_to_dataframe(batch)
+        if self.format == "csv":
+            df.to_csv(self._file, header=self._header, index=False)
+        elif len(df):
+            lines = df.to_json(orient="records", lines=True, date_format="iso", date_unit="s")
+            #older pandas versions do not terminate the last line
+            self._file.write(lines if lines.endswith("\n") else lines + "\n")
+        self._header = False
+
+    def close(self):
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+
+class _NpyWriter(object):
+    """Write the valid reports as one .npy file per variable into a directory.
+
+    The columns of each batch are appended to a temporary file per variable
+    which is converted into the .npy file when the writer is closed, so the
+    batches are not kept in memory. Variables with a code table are stored as
+    codes into ``batch.CATEGORIES``.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._rows = 0
+        #{variable: (temporary file, dtype)}
+        self._parts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, batch):
+        valid = np.asarray(batch.valid)
+        if not self._parts:
+            os.makedirs(self.path, exist_ok=True)
+            for name, col in batch.columns.items():
+                self._parts[name] = (open(os.path.join(self.path, name + ".npy.part"), "wb"), col.dtype)
+        for name, col in batch.columns.items():
+            part, dtype = self._parts[name]
+            np.ascontiguousarray(col[valid], dtype=dtype).tofile(part)
+        self._rows += int(np.count_nonzero(valid))
+
+    def close(self):
+        parts, self._parts = self._parts, {}
+        for name, (part, dtype) in parts.items():
+            part.close()
+            header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (self._rows,)}
+            with open(part.name, "rb") as data, open(os.path.join(self.path, name + ".npy"), "wb") as f:
+                np.lib.format.write_array_header_1_0(f, header)
+                shutil.copyfileobj(data, f, 1 << 20)
+            os.remove(part.name)
+
+
+def _writer(path, format, partition_by):
+    """Open writer of the output format."""
+    if format == "parquet":
+        from .arrow import ParquetDatasetWriter
+        return ParquetDatasetWriter(path, partition_by)
+    elif format == "npy":
+        return _NpyWriter(path)
+    else:
+        return _TextWriter(path, format)
+
+
+def _inputs(patterns):
+    """Expand the glob patterns, "-" is stdin."""
+    for pattern in patterns or ["-"]:
+        if pattern == "-":
+            yield pattern
+            continue
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            raise FileNotFoundError("No files match {!r}".format(pattern))
+        yield from paths
+
+
+def _reports(path):
+    """Raw reports of a file or stdin."""
+    if path == "-":
+        return iter_reports(sys.stdin.buffer)
+    elif path.endswith(".gz") or os.path.getsize(path) == 0:
+        return iter_reports(path)
+
+    return iter_mapped_reports(path)
+
+
+def _split(value):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(prog="synop-decode", description="Decode SYNOP reports of archive files.")
+    parser.add_argument("inputs", nargs="*", metavar="INPUT",
+                        help='files or glob patterns, .gz files are decompressed. "-" or none reads stdin.')
+    parser.add_argument("-o", "--output", default="-",
+                        help='output file, directory for parquet and npy. Default "-" is stdout.')
+    parser.add_argument("-f", "--format", choices=FORMATS,
+                        help="output format, derived from the extension of the output by default (csv)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes, 0 uses one process per CPU")
+    parser.add_argument("--chunksize", type=int, default=100000, help="number of reports decoded at once")
+    parser.add_argument("--vars", type=_split, help="comma separated variables, all by default")
+    parser.add_argument("--stations", type=_split, help="comma separated station ids")
+    parser.add_argument("--types", type=_split, help="comma separated station types, e.g. AAXX")
+    parser.add_argument("--start", help="first time of the reports, e.g. 201809 or 201809051200")
+    parser.add_argument("--end", help="end time of the reports (exclusive)")
+    parser.add_argument("--partition-by", type=_split, default=[],
+                        help="comma separated partition keys of the parquet dataset, e.g. date,MMMM. "
+                             "Their variables are always decoded.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print the summary")
+
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = EXTENSIONS.get(os.path.splitext(args.output)[1].lower(), "csv")
+    if args.format in ("parquet", "npy") and args.output == "-":
+        parser.error("{} output needs an output directory".format(args.format))
+    if args.vars is not None:
+        unknown = sorted(set(args.vars) - set(COLUMN_NAMES))
+        if unknown:
+            parser.error("unknown variables: {}".format(", ".join(unknown)))
+    if args.partition_by:
+        unknown = sorted(set(args.partition_by) - set(COLUMN_NAMES) - set(TIME_PARTITIONS))
+        if unknown:
+            parser.error("unknown partition keys: {}".format(", ".join(unknown)))
+        if args.vars is not None:
+            #the partition keys are derived from the decoded variables
+            needed = ["datetime" if name in TIME_PARTITIONS else name for name in args.partition_by]
+            args.vars.extend(name for name in dict.fromkeys(needed) if name not in args.vars)
+
+    return args
+
+
+def main(argv=None):
+    """Run the batch decoder.
+
+    Parameters
+    ----------
+    argv : list of str
+        Command line arguments, default is ``sys.argv[1:]``
+
+    Returns
+    -------
+    int
+        Exit status
+
+    """
+    args = parse_args(argv)
+    where = None
+    if args.stations or args.types or args.start or args.end:
+        where = ReportFilter(stations=args.stations, start=args.start, end=args.end, types=args.types)
+
+    try:
+        paths = list(_inputs(args.inputs))
+    except FileNotFoundError as e:
+        print("synop-decode: error: {}".format(e), file=sys.stderr)
+        return 1
+
+    reports = chain.from_iterable(_reports(path) for path in paths)
+    total = rejected = 0
+    t_start = time.perf_counter()
+    with _writer(args.output, args.format, args.partition_by) as writer:
+        for batch in iter_batches(reports, args.chunksize, args.workers or None, compact=True, vars=args.vars,
+                                  where=where, status=True):
+            writer.write(batch)
+            total += len(batch)
+            rejected += int(np.count_nonzero(batch.status == STATUS_REJECTED))
+    elapsed = time.perf_counter() - t_start
+
+    if not args.quiet:
+        print("{} reports decoded, {} rejected in {:.2f} s ({:.0f} reports/s)".format(
+            total, rejected, elapsed, total / elapsed if elapsed > 0 else 0), file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
-import numpy as np
+from math import nan
 
 #wmo manual on codes:
 # https://community.wmo.int/activity-areas/wmo-codes/manual-codes#Codes
@@ -42,7 +42,7 @@ PRECIP_GROUP_CODE = {"0": "Niederschlag wird in den Abschnitten 1 und 3 gemeldet
                      "2": "Niederschlag wird nur in Abschnitt 3 gemeldet",
                      "3": "Niederschlag nicht gemeldet -- kein Niederschlag vorhanden",
                      "4": "Niederschlag nicht gemeldet -- Niederschlagsmessung nicht durchgeführt oder nicht vorgesehen",
-                     "": np.nan}
+                     "": nan}
 
 STATION_OPERATION_TYPE_CODE = {"1": "bemannte Station -- Wettergruppe wird gemeldet",
                                "2": "bemannte Station -- Wettergruppe nicht gemeldet -- kein signifikantes Wetter",
@@ -51,7 +51,7 @@ STATION_OPERATION_TYPE_CODE = {"1": "bemannte Station -- Wettergruppe wird gemel
                                "5": "automatische Station, Typ 1 -- Wettergruppe nicht gemeldet -- kein signifikantes Wetter",
                                "6": "automatische Station, Typ 2 -- Wettergruppe nicht gemeldet -- Wetter nicht feststellbar",
                                "7": "automatische Station, Typ 2 -- Wettergruppe wird gemeldet",
-                               "": np.nan}
+                               "": nan}
 
 CLOUD_HEIGHT_0_CODE = {"0": "0 bis 49 m (0 bis 166 ft)",
                        "1": "50 bis 99 m (167 - 333 ft)",
@@ -64,7 +64,7 @@ CLOUD_HEIGHT_0_CODE = {"0": "0 bis 49 m (0 bis 166 ft)",
                        "8": "2000 bis 2499 m (6667 - 8333 ft)",
                        "9": "2500 m oder höher (> 8334 ft) oder wolkenlos",
                        "/": "unbekannt",
-                       "": np.nan}
+                       "": nan}
 
 #Nddff
 cloud_cover_code = {"0": "0/8 (wolkenlos)",
@@ -89,7 +89,7 @@ A_CODE = {"0": "erst steigend, dann fallend -- resultierender Druck gleich oder
           "6": "erst fallend, dann gleichbleibend -- resultierender Druck tiefer als zuvor",
           "7": "konstant fallend -- resultierender Druck tiefer als zuvor",
           "8": "erst steigend oder gleichbleibend, dann fallend -- resultierender Druck tiefer als zuvor",
-          "": np.nan}
+          "": nan}
 
 #6RRRt
 T_CODE = {"0": "nicht aufgeführter oder vor dem Termin endender Zeitraum",
@@ -103,7 +103,7 @@ T_CODE = {"0": "nicht aufgeführter oder vor dem Termin endender Zeitraum",
           "8": "9 Stunden",
           "9": "15 Stunden",
           "/": "Sondermessung",
-          None: np.nan}
+          None: nan}
 
 #7wwWW
 CURRENT_WEATHER_CODE = {"00": "Bewölkungsentwicklung nicht beobachtet",
@@ -206,7 +206,7 @@ CURRENT_WEATHER_CODE = {"00": "Bewölkungsentwicklung nicht beobachtet",
                          "97": "starkes Gewitter mit Regen oder Schnee",
                          "98": "starkes Gewitter mit Sandsturm",
                          "99": "starkes Gewitter mit Graupel oder Hagel",
-                         "": np.nan
+                         "": nan
                          }
 
 #see [1] A-353
@@ -220,7 +220,7 @@ WEATHER_COURSE_CODE = {"0": "Wolkendecke stets weniger als oder genau die Hälft
                        "7": "Schnee oder Schneeregen",
                        "8": "Schauer",
                        "9": "Gewitter",
-                       "": np.nan
+                       "": nan
                       }
 
 
@@ -236,7 +236,7 @@ LOW_CLOUDS_CODE = {"0": "keine tiefen Wolken",
                    "8": "Cumulus und Stratocumulus (in verschiedenen Höhen)",
                    "9": "Cumulonimbus capillatus (mit Amboß)",
                    "/": "tiefe Wolken nicht erkennbar wegen Nebel, Dunkel- oder Verborgenheit",
-                   "": np.nan
+                   "": nan
                   }
 
 MEDIUM_CLOUDS_CODE = {"0": "keine mittelhohen Wolken",
@@ -250,7 +250,7 @@ MEDIUM_CLOUDS_CODE = {"0": "keine mittelhohen Wolken",
                       "8": "Altocumulus castellanus oder floccus (cumuliforme Büschel aufweisend)",
                       "9": "Altocumulus eines chaotisch aussehenden Himmels",
                       "/": "mittelhohe Wolken nicht erkennbar wegen Nebel, Dunkel- oder Verborgenheit",
-                      "": np.nan
+                      "": nan
                      }
 
 HIGH_CLOUDS_CODE = {"0": "keine hohen Wolken",
@@ -264,7 +264,7 @@ HIGH_CLOUDS_CODE = {"0": "keine hohen Wolken",
                     "8": "Cirrostratus (den Himmel nicht ganz bedeckend, aber auch nicht zunehmend)",
                     "9": "Cirrocumulus",
                     "/": "hohe Wolken nicht erkennbar wegen Nebel, Dunkel- oder Verborgenheit",
-                    "": np.nan
+                    "": nan
                     }
 
 #3EsTT
@@ -292,7 +292,7 @@ ESSS_GROUND_CONDITIONS_CODE = {"0": "vorwiegend (> 50 %) mit Eis bedeckt (Hagel-
                          "8": "unebene Schicht losen, trockenen Schnees, den gesamten Boden bedeckend",
                          "9": "vollständig geschlossene Schneedecke mit hohen Verwehungen (> 50 cm)",
                          "/": "Reste (< 10 %) von Schnee oder Eis (Hagel/Graupel/Griesel)",
-                         "": np.nan
+                         "": nan
                         }
 
 #8NChh
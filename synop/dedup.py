@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Removal of duplicate and corrected reports from streams.
+
+Reports are identified by station id and time of section 0 and compared by
+a BLAKE2b digest of their groups, so copies of a report received via several
+routes are recognised from the raw text before they are decoded. Different
+versions of a report are resolved by the correction indicator (BBB of the
+bulletin heading, CCA, CCB, ...): a higher correction replaces a lower one,
+a lower correction is stale.
+
+Only reports within a time window of the latest observation time are
+remembered, so the memory is bounded for endless streams.
+
+"""
+
+import heapq
+import hashlib
+from itertools import count
+from datetime import datetime, timedelta
+
+#results of Deduplicator.add
+NEW = "new"
+DUPLICATE = "duplicate"
+CORRECTION = "correction"
+STALE = "stale"
+
+
+def correction_rank(bbb):
+    """Rank of a correction indicator.
+
+    Parameters
+    ----------
+    bbb : str
+        BBB of the bulletin heading, e.g. "CCA", "" if not given
+
+    Returns
+    -------
+    int
+        0 for original (and delayed or amended) reports, 1 for CCA, 2 for
+        CCB and so on
+
+    """
+    if len(bbb) == 3 and bbb[:2] == "CC" and "A" <= bbb[2] <= "Z":
+        return ord(bbb[2]) - ord("A") + 1
+
+    return 0
+
+
+def _minutes(timestamp):
+    """Minutes since 1970 of a 12 digit timestamp, None if invalid."""
+    try:
+        t = datetime(int(timestamp[:4]), int(timestamp[4:6]), int(timestamp[6:8]), int(timestamp[8:10]),
+                     int(timestamp[10:12]))
+    except ValueError:
+        return None
+
+    return int((t - datetime(1970, 1, 1)).total_seconds()) // 60
+
+
+def _text(value):
+    """Decode bytes to str."""
+    return value.decode("ascii", errors="replace") if isinstance(value, bytes) else value
+
+
+def _digest(tokens):
+    """BLAKE2b digest of the groups of a report, the same in every process."""
+    return hashlib.blake2b("\x00".join(tokens).encode("utf-8"), digest_size=16).digest()
+
+
+class Deduplicator(object):
+    """Streaming deduplication of raw reports.
+
+    Can be used as filter of raw reports (``where``), then exact duplicates
+    and stale versions are skipped before decoding.
+
+    Parameters
+    ----------
+    window : timedelta
+        Reports older than the latest observation time minus window are
+        forgotten
+    keep : bool
+        If True the latest version of each report is kept and the evicted
+        reports are collected in ``evicted`` (see ``resolve``)
+
+    Attributes
+    ----------
+    counts : dict
+        Number of reports of each result of ``add``
+    evicted : list
+        (report, bbb) of the forgotten reports if keep is True
+
+    """
+
+    def __init__(self, window=timedelta(hours=24), keep=False):
+        self.window = int(window.total_seconds()) // 60
+        self.keep = keep
+        self.counts = {NEW: 0, DUPLICATE: 0, CORRECTION: 0, STALE: 0}
+        self.evicted = []
+        #(station, timestamp) -> [rank, digests of all versions, minutes, report, bbb]
+        self._entries = {}
+        #(minutes, sequence number, key) of the entries ordered by time
+        self._times = []
+        self._sequence = count()
+        self._latest = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __call__(self, report, bbb=""):
+        """Return True if the report is new or a correction."""
+        return self.add(report, bbb) in (NEW, CORRECTION)
+
+    def add(self, report, bbb="", key=None):
+        """Add a report.
+
+        Parameters
+        ----------
+        report : str or bytes
+            Raw report
+        bbb : str
+            Correction indicator of the bulletin, e.g. "CCA"
+        key : tuple
+            (station id, timestamp) of the report, taken from section 0 of
+            the report if None (e.g. for station blocks of bulletins)
+
+        Returns
+        -------
+        str
+            ``NEW``, ``DUPLICATE`` (same groups as a known version),
+            ``CORRECTION`` (replaces a known report) or ``STALE`` (lower
+            correction than a known report). Reports without a valid section
+            0 are always new.
+
+        """
+        #bytes and str copies of a report are the same report
+        tokens = _text(report).split()
+        if tokens and tokens[-1][-1:] == "=":
+            tokens[-1] = tokens[-1][:-1]
+        if key is None:
+            if len(tokens) < 4:
+                return self._pass(report, bbb)
+            key = (tokens[3], tokens[0])
+        else:
+            key = (_text(key[0]), _text(key[1]))
+        minutes = _minutes(key[1])
+        if minutes is None:
+            return self._pass(report, bbb)
+
+        digest = _digest(tokens)
+        rank = correction_rank(bbb)
+        entry = self._entries.get(key)
+        if entry is None:
+            if self._latest is not None and minutes < self._latest - self.window:
+                #already forgotten
+                return self._pass(report, bbb)
+            self._entries[key] = [rank, {digest}, minutes, report if self.keep else None, bbb]
+            heapq.heappush(self._times, (minutes, next(self._sequence), key))
+            if self._latest is None or minutes > self._latest:
+                self._latest = minutes
+                self.evict()
+            return self._count(NEW)
+        elif digest in entry[1]:
+            return self._count(DUPLICATE)
+
+        entry[1].add(digest)
+        if rank < entry[0]:
+            return self._count(STALE)
+
+        entry[0] = rank
+        if self.keep:
+            entry[3] = report
+            entry[4] = bbb
+
+        return self._count(CORRECTION)
+
+    def _count(self, result):
+        self.counts[result] += 1
+
+        return result
+
+    def _pass(self, report, bbb):
+        """Count report as new without remembering it."""
+        if self.keep:
+            self.evicted.append((report, bbb))
+
+        return self._count(NEW)
+
+    def evict(self):
+        """Forget the reports older than the window.
+
+        Returns
+        -------
+        int
+            Number of forgotten reports
+
+        """
+        return self._evict(None if self._latest is None else self._latest - self.window)
+
+    def flush(self):
+        """Forget all reports.
+
+        Returns
+        -------
+        int
+            Number of forgotten reports
+
+        """
+        return self._evict(None)
+
+    def _evict(self, limit):
+        """Forget the reports older than limit (all if None)."""
+        times = self._times
+        n = 0
+        while times and (limit is None or times[0][0] < limit):
+            minutes, i, key = heapq.heappop(times)
+            entry = self._entries.pop(key)
+            if self.keep:
+                self.evicted.append((entry[3], entry[4]))
+            n += 1
+
+        return n
+
+
+def resolve(reports, window=timedelta(hours=24)):
+    """Resolve duplicates and corrections of a stream of reports.
+
+    Each report is returned once in its latest version when it leaves the
+    time window (or at the end of the stream), so the reports are delayed by
+    the window.
+
+    Parameters
+    ----------
+    reports : iterable of str or (str, str)
+        Raw reports or (report, bbb) pairs with the correction indicator
+    window : timedelta
+        See ``Deduplicator``
+
+    Yields
+    ------
+    str
+        Latest version of each report
+
+    """
+    dedup = Deduplicator(window, keep=True)
+    for item in reports:
+        if isinstance(item, tuple):
+            dedup.add(*item)
+        else:
+            dedup.add(item)
+        if dedup.evicted:
+            for report, bbb in dedup.evicted:
+                yield report
+            dedup.evicted.clear()
+
+    dedup.flush()
+    for report, bbb in dedup.evicted:
+        yield report
+    dedup.evicted.clear()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Filtering of raw SYNOP reports by section 0.
+
+The filters only split off section 0 of a report so reports can be selected
+by station, time or type before the remaining sections are decoded.
+
+"""
+
+from datetime import datetime
+
+
+def _timestamp(value):
+    """Convert datetime or string to the 12 digit timestamp of a report."""
+    if value is None or isinstance(value, str):
+        return value
+    elif isinstance(value, datetime):
+        return value.strftime("%Y%m%d%H%M")
+    else:
+        raise TypeError("Time must be a datetime or str, got {}".format(type(value).__name__))
+
+
+class ReportFilter(object):
+    """Select reports by the fields of section 0.
+
+    All given conditions have to be met. Reports with an invalid section 0
+    are rejected.
+
+    Parameters
+    ----------
+    stations : iterable of str or int
+        Station ids (IIiii)
+    start : datetime or str
+        First time of the reports (inclusive). Strings are compared with the
+        timestamp of the report and may be shorter than 12 digits, e.g.
+        "201809" for September 2018.
+    end : datetime or str
+        Time of the end of the reports (exclusive)
+    types : iterable of str
+        Types of station (MMMM), e.g. ["AAXX"]
+    hours : iterable of int
+        Hours of observation (GG of YYGGi)
+
+    Examples
+    --------
+    >>> where = ReportFilter(stations=[10224, 10384], start="201809050000", end="201809060000")
+    >>> where("201809051400 AAXX 05141 10224 42680 50704")
+    True
+
+    """
+
+    def __init__(self, stations=None, start=None, end=None, types=None, hours=None):
+        self.stations = None if stations is None else frozenset(
+            "{:05d}".format(s) if isinstance(s, int) else s for s in stations)
+        self.start = _timestamp(start)
+        self.end = _timestamp(end)
+        self.types = None if types is None else frozenset(types)
+        self.hours = None if hours is None else frozenset("{:02d}".format(h) for h in hours)
+
+    def __repr__(self):
+        conditions = ("{}={!r}".format(k, v) for k, v in vars(self).items() if v is not None)
+        return "ReportFilter({})".format(", ".join(conditions))
+
+    def __call__(self, report):
+        """Return True if the report is selected.
+
+        Parameters
+        ----------
+        report : str or bytes
+            Raw SYNOP report
+
+        Returns
+        -------
+        bool
+
+        """
+        #only split off section 0
+        section_0 = report.split(None, 4)
+        if len(section_0) < 4:
+            return False
+        if isinstance(report, bytes):
+            section_0 = [g.decode("ascii", errors="replace") for g in section_0[:4]]
+        timestamp, station_type, yyggi, station = section_0[:4]
+
+        if self.stations is not None and station not in self.stations:
+            return False
+        if self.start is not None and timestamp[:len(self.start)] < self.start:
+            return False
+        if self.end is not None and timestamp[:len(self.end)] >= self.end:
+            return False
+        if self.types is not None and station_type not in self.types:
+            return False
+        if self.hours is not None and yyggi[2:4] not in self.hours:
+            return False
+
+        return True
+
+    def filter(self, reports):
+        """Iterate over the selected reports.
+
+        Parameters
+        ----------
+        reports : iterable of str
+            Raw SYNOP reports
+
+        Returns
+        -------
+        iterator of str
+
+        """
+        return filter(self, reports)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pandas DataFrames of decoded SYNOP reports.
+
+The columns are filled directly from the arrays of a ``SynopBatch`` with a
+fixed schema so every DataFrame has the same columns and dtypes, no matter
+which groups are present in the reports.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from .batch import COLUMNS, CODE_TABLES, CATEGORIES, decode_many
+from .vectorized import decode_okta
+
+
+def schema(float_dtype="float64"):
+    """Column names and dtypes of the DataFrames.
+
+    Parameters
+    ----------
+    float_dtype : str
+        dtype of the measurements, "float64" or "float32"
+
+    Returns
+    -------
+    dict
+        {column: dtype} ordered as the columns
+
+    """
+    dtypes = {}
+    for name, slot, start, stop, decoder, dtype in COLUMNS:
+        if name == "datetime":
+            dtypes[name] = "datetime64[ns]"
+        elif decoder is None:
+            dtypes[name] = "string"
+        elif isinstance(decoder, dict):
+            dtypes[name] = pd.CategoricalDtype([CODE_TABLES[name][c] for c in CATEGORIES[name]])
+        elif decoder is decode_okta:
+            dtypes[name] = "Int8"
+        else:
+            dtypes[name] = float_dtype
+    dtypes["c_nlayers"] = "Int8"
+
+    return dtypes
+
+
+def _column(batch, name, dtype):
+    """Convert column of the batch to a pandas array of dtype."""
+    col = batch[name]
+    if isinstance(dtype, pd.CategoricalDtype):
+        if name in batch.categories:
+            return pd.Categorical.from_codes(col, dtype=dtype)
+        return pd.Categorical(col, dtype=dtype)
+    elif dtype == "datetime64[ns]":
+        return pd.to_datetime(col, format="%Y%m%d%H%M", errors="coerce")
+    elif dtype == "string":
+        return pd.array(np.where(col == "", None, col.astype(object)), dtype="string")
+    elif dtype == "Int8":
+        missing = np.isnan(col)
+        return pd.arrays.IntegerArray(np.where(missing, 0, col).astype(np.int8), missing)
+    else:
+        return col.astype(dtype)
+
+
+def batch_to_dataframe(batch, float_dtype="float64", invalid=False):
+    """Convert batch to a DataFrame.
+
+    Parameters
+    ----------
+    batch : SynopBatch
+        Decoded reports (compact or not)
+    float_dtype : str
+        dtype of the measurements, "float64" or "float32"
+    invalid : bool
+        If True keep the rows of reports which could not be decoded
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns as in ``schema`` restricted to the columns of the batch
+        followed by additional string columns of the batch
+
+    """
+    dtypes = schema(float_dtype)
+    #additional columns, e.g. the metadata of bulletins, are strings
+    dtypes.update((name, "string") for name in batch.keys() if name not in dtypes)
+    keep = None if invalid else batch.valid
+    columns = {}
+    for name in dtypes:
+        if name not in batch:
+            continue
+        col = _column(batch, name, dtypes[name])
+        columns[name] = col if keep is None else col[keep]
+
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(batch) if keep is None else int(keep.sum())))
+
+
+def to_dataframe(reports, float_dtype="float64", invalid=False, **kwargs):
+    """Decode SYNOP reports into a DataFrame.
+
+    Parameters
+    ----------
+    reports : iterable of str
+        Raw SYNOP reports
+    float_dtype : str
+        dtype of the measurements, "float64" or "float32"
+    invalid : bool
+        If True keep the rows of reports which could not be decoded
+    kwargs
+        Passed to ``decode_many``, e.g. chunksize, max_workers, vars or where
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per report. Measurements are float, cloud cover in okta
+        nullable Int8, code table variables categoricals of the descriptions
+        and the time of the report datetime64.
+
+    """
+    batch = decode_many(reports, compact=True, **kwargs)
+
+    return batch_to_dataframe(batch, float_dtype, invalid)
@@ -9,7 +9,8 @@ Handlers for decoding the SYNOP groups.
 
 import re
 import logging
-import numpy as np
+from math import nan
+from .lazy import LazyPattern
 from .code_descriptions import (STATION_TYPE_CODE, WIND_UNIT_CODE, PRECIP_GROUP_CODE, STATION_OPERATION_TYPE_CODE,
 CLOUD_TYPE_CODE, CLOUD_HEIGHT_0_CODE, A_CODE, T_CODE, CURRENT_WEATHER_CODE, WEATHER_COURSE_CODE,
 LOW_CLOUDS_CODE, MEDIUM_CLOUDS_CODE, HIGH_CLOUDS_CODE, ESSS_GROUND_CONDITIONS_CODE,
@@ -18,6 +19,75 @@ CLOUD_HEIGHT_CLASSES, CLOUD_TYPE_CODE)
 
 _logger = logging.getLogger(__name__)
 
+#split cloud layer of 8NChh group
+layer_re = LazyPattern(r"""(((?P<cover>\d)(?P<type>(\d|/))(?P<height>\d\d)))?""", re.VERBOSE)
+
+
+def _codes(ndigits, suffix=""):
+    """All codes with ndigits digits followed by suffix."""
+    return ["{:0{}d}{}".format(i, ndigits, suffix) for i in range(10 ** ndigits)]
+
+
+class LookupTable(dict):
+    """Decoded values of all codes of a group, built on first use.
+
+    Codes not in the table (e.g. missing or invalid codes) are decoded by
+    the decoding function.
+
+    Parameters
+    ----------
+    decode : callable
+        Decoding function for a single code
+    codes : callable
+        Function returning all codes of the table
+
+    """
+
+    def __init__(self, decode, codes):
+        super().__init__()
+        self.decode = decode
+        self._codes = codes
+        self._arrays = {}
+
+    def __missing__(self, code):
+        #missing groups do not need the table
+        if code and self._codes is not None:
+            codes, self._codes = self._codes, None
+            self.update((c, self.decode(c)) for c in codes())
+            if code in self:
+                return self[code]
+
+        return self.decode(code)
+
+    def array(self, ndigits, suffix="", item=None):
+        """Decoded values of the codes with ndigits digits as array.
+
+        Parameters
+        ----------
+        ndigits : int
+            Number of digits of the codes
+        suffix : str
+            Characters following the digits
+        item : int
+            Index of the value if the decoded values are tuples
+
+        Returns
+        -------
+        numpy.ndarray of float
+            Decoded value of each code at the index of its numeric value
+
+        """
+        key = (ndigits, suffix, item)
+        if key not in self._arrays:
+            values = [self[c] for c in _codes(ndigits, suffix)]
+            if item is not None:
+                values = [v[item] for v in values]
+            #numpy is only needed by the vectorized decoders
+            import numpy as np
+            self._arrays[key] = np.array(values, dtype=float)
+
+        return self._arrays[key]
+
 
 def default_handler(code):
     """Handle non decodable codes.
@@ -45,23 +115,10 @@ def handle_wind_unit(code):
     return WIND_UNIT_CODE.get(code)
 
 
-def handle_sTTT(code):
-    """Decode temperature.
-
-    Parameters
-    ----------
-    code : str
-        Temperature with first charater defining the sign or
-        type of unit (°C or relative humidity in % for dewpoint)
-
-    Returns
-    -------
-    float
-        Temperature in degree Celsius
-
-    """
+def _decode_sTTT(code):
+    """Decode temperature without lookup table."""
     if code == "" or code == "////" or "/" in code:
-        return np.nan
+        return nan
     else:
         sign = int(code[0])
         value = int(code[1:])
@@ -79,24 +136,10 @@ def handle_sTTT(code):
         return value
 
 
-def handle_PPPP(code):
-    """Decode pressure.
-
-    Parameters
-    ----------
-    code : str
-        Pressure code without thousands in  1/10 Hectopascal.
-        If last character of code is "/" pressure is given as
-        full Hectopascal.
-
-    Returns
-    -------
-    float
-        Pressure in Hectopascal
-
-    """
+def _decode_PPPP(code):
+    """Decode pressure without lookup table."""
     if code == "" or code is None:
-        return np.nan
+        return nan
     else:
         if code[-1] == "/":
             value = int(code[0:-1])
@@ -110,20 +153,8 @@ def handle_PPPP(code):
 
 
 #@static_method
-def handle_vis(code):
-    """Decode visibility of synop report.
-
-    Parameters
-    ----------
-    code : str
-        VV part of iihVV group
-
-    Returns
-    -------
-    float
-        Visibility in km
-
-    """
+def _decode_vis(code):
+    """Decode visibility without lookup table."""
     vislut = {90: 0.05,
               91: 0.05,
               92: 0.2,
@@ -138,7 +169,7 @@ def handle_vis(code):
     if not code == "//" and code != "":
         code = int(code)
     else:
-        return np.nan
+        return nan
 
     if code <= 50:
         dist = 0.1 * code
@@ -152,6 +183,204 @@ def handle_vis(code):
     return dist
 
 
+def handle_okta(code):
+    """Decode cloud cover.
+
+    Parameters
+    ----------
+    code : str
+        Cloud cover in okta. "/" if not observed.
+
+    Returns
+    -------
+    int or float
+        Cloud cover in okta (9 means sky not observable) or NaN
+
+    """
+    if code == "/" or code == "":
+        #not observed
+        return nan
+    #elif cloud_cover == "9":
+        ##sky not observable/visible
+        #cloud_cover = -99
+    else:
+        return int(code)
+
+
+def _decode_wind_dir(code):
+    """Decode wind direction without lookup table."""
+    if code != "":
+        wind_dir = int(code)
+        if wind_dir == 0:
+            #no wind
+            wind_dir = nan
+        elif wind_dir == 99:
+            #circular wind
+            wind_dir = -99
+        else:
+            #01: 5-14
+            #02: 15-24
+            #03: 25-34
+            #decoding the class to single value in the middle of the class
+            wind_dir = (10 * wind_dir) - 1
+    else:
+        wind_dir = nan
+
+    return wind_dir
+
+
+def _decode_RRR(code):
+    """Decode precipitation amount without lookup table."""
+    if code != "":
+        precip = int(code)
+        if precip > 989:
+            precip = (precip - 990) * 0.1
+            if precip == 0:
+                #only traces of precipitation not measurable < 0.05
+                precip = 0.05
+    else:
+        precip = nan
+
+    return precip
+
+
+def _decode_cheight(code):
+    """Decode cloud height without lookup table."""
+    code = int(code)
+
+    type = "continous"
+
+    if code <= 50:
+        h = code * 30
+    elif code >= 56 and code <= 80:
+        h = 1800 + (code - 56) * 300
+    elif code >= 81 and code <= 89:
+        h = 10500 + (code - 81) * 1500
+    elif code >= 90:
+        type = "classes"
+        h = CLOUD_HEIGHT_CLASSES[code]
+    else:
+        h = nan
+
+    return h, type
+
+
+#lookup tables of the groups with a small number of codes. The handlers only
+#look up the code, the batch decoders index the arrays of the tables.
+STTT_TABLE = LookupTable(_decode_sTTT, lambda: _codes(4))
+PPPP_TABLE = LookupTable(_decode_PPPP, lambda: _codes(4) + _codes(3, "/") + _codes(3))
+VIS_TABLE = LookupTable(_decode_vis, lambda: _codes(2))
+WIND_DIR_TABLE = LookupTable(_decode_wind_dir, lambda: _codes(2))
+RRR_TABLE = LookupTable(_decode_RRR, lambda: _codes(3))
+CHEIGHT_TABLE = LookupTable(_decode_cheight, lambda: _codes(2))
+
+
+def handle_sTTT(code):
+    """Decode temperature.
+
+    Parameters
+    ----------
+    code : str
+        Temperature with first charater defining the sign or
+        type of unit (°C or relative humidity in % for dewpoint)
+
+    Returns
+    -------
+    float
+        Temperature in degree Celsius
+
+    """
+    return STTT_TABLE[code]
+
+
+def handle_PPPP(code):
+    """Decode pressure.
+
+    Parameters
+    ----------
+    code : str
+        Pressure code without thousands in  1/10 Hectopascal.
+        If last character of code is "/" pressure is given as
+        full Hectopascal.
+
+    Returns
+    -------
+    float
+        Pressure in Hectopascal
+
+    """
+    return PPPP_TABLE[code]
+
+
+def handle_vis(code):
+    """Decode visibility of synop report.
+
+    Parameters
+    ----------
+    code : str
+        VV part of iihVV group
+
+    Returns
+    -------
+    float
+        Visibility in km
+
+    """
+    return VIS_TABLE[code]
+
+
+def handle_wind_dir(code):
+    """Decode wind direction.
+
+    Parameters
+    ----------
+    code : str
+        dd part of Nddff group in dekadegree
+
+    Returns
+    -------
+    int or float
+        Wind direction in degree, -99 for circular wind or NaN for calm
+
+    """
+    return WIND_DIR_TABLE[code]
+
+
+def handle_RRR(code):
+    """Decode precipitation amount.
+
+    Parameters
+    ----------
+    code : str
+        RRR part of 6RRRt group
+
+    Returns
+    -------
+    float
+        Precipitation in mm
+
+    """
+    return RRR_TABLE[code]
+
+
+def cheight(code):
+    """Decode cloud height.
+
+    Parameters
+    ----------
+    code : str
+        hh part of 8NChh group
+
+    Returns
+    -------
+    int
+        Cloud height in m
+    str
+        "continous" or "classes" if height is given as class
+    """
+    return CHEIGHT_TABLE[code]
+
+
 def handle_iihVV(d):
     """Handle iihVV group in section 1.
 
@@ -187,39 +416,15 @@ def handle_Nddff(d):
         re groupdict
 
     """
-    cloud_cover = d["N"]
-    if cloud_cover == "/" or cloud_cover == "":
-        #not observed
-        cloud_cover = np.nan
-    #elif cloud_cover == "9":
-        ##sky not observable/visible
-        #cloud_cover = -99
-    else:
-        cloud_cover = int(cloud_cover)
-
-    if d["dd"] != "":
-        wind_dir = int(d["dd"])
-        if wind_dir == 0:
-            #no wind
-            wind_dir = np.nan
-        elif wind_dir == 99:
-            #circular wind
-            wind_dir = -99
-        else:
-            #01: 5-14
-            #02: 15-24
-            #03: 25-34
-            #decoding the class to single value in the middle of the class
-            wind_dir = (10 * wind_dir) - 1
-    else:
-        wind_dir = np.nan
+    cloud_cover = handle_okta(d["N"])
+    wind_dir = handle_wind_dir(d["dd"])
 
     #wind speed is greater than 99 units and this group is directly followed
     #by the 00fff group
     if d["ff"] != "":
         wind_speed = int(d["ff"])
     else:
-        wind_speed = np.nan
+        wind_speed = nan
 
     Nddff = {"cloud_cover_tot": cloud_cover,
              "wind_dir": wind_dir,
@@ -243,7 +448,7 @@ def handle_00fff(d):
     """
     ws = d["wind_speed"]
     if ws == "":
-        return {"wind_speed_high": np.nan}
+        return {"wind_speed_high": nan}
     else:
         return {"wind_speed_high": int(ws)}
 
@@ -286,17 +491,9 @@ def handle_6RRRt(d):
     if d["t"] != "":
         precip_ref_time = T_CODE[d["t"]]
     else:
-        precip_ref_time = np.nan
+        precip_ref_time = nan
 
-    if d["RRR"] != "":
-        precip = int(d["RRR"])
-        if precip > 989:
-            precip = (precip - 990) * 0.1
-            if precip == 0:
-                #only traces of precipitation not measurable < 0.05
-                precip = 0.05
-    else:
-        precip = np.nan
+    precip = handle_RRR(d["RRR"])
 
     RRRt = {"precip": precip,
             "precip_ref_time": precip_ref_time}
@@ -408,7 +605,7 @@ def handle_4Esss(d):
         re groupdict
 
     """
-    sh = np.nan
+    sh = nan
     if not d["sss"] == "":
         sh = int(d["sss"])
 
@@ -490,14 +687,14 @@ def handle_7RRRR(d):
 
     """
     if d == "":
-        return np.nan
+        return nan
     else:
         d = int(d)
 
         if d >= 9998:
             precip = 999
         elif d == 9999:
-            precip = np.nan
+            precip = nan
         else:
             precip = d
 
@@ -522,38 +719,6 @@ def handle_8NChh(d):
         re groupdict
 
     """
-    def cheight(code):
-        """Decode cloud height.
-
-        Parameters
-        ----------
-        code : str
-
-        Returns
-        -------
-        int
-            Cloud height in m
-        """
-        code = int(code)
-
-        type = "continous"
-
-        if code <= 50:
-            h = code * 30
-        elif code >= 56 and code <= 80:
-            h = 1800 + (code - 56) * 300
-        elif code >= 81 and code <= 89:
-            h = 10500 + (code - 81) * 1500
-        elif code >= 90:
-            type = "classes"
-            h = CLOUD_HEIGHT_CLASSES[code]
-        else:
-            h = np.nan
-
-        return h, type
-
-    layer_re = re.compile(r"""(((?P<cover>\d)(?P<type>(\d|/))(?P<height>\d\d)))?""", re.VERBOSE)
-
     #count cloud layers
     c_nlayers = 0
 
@@ -567,13 +732,13 @@ def handle_8NChh(d):
                 d[l + "_cover"] = cover
                 #layer["cover"] = int(layer["cover"])
             else:
-                d[l + "_cover"] = np.nan
+                d[l + "_cover"] = nan
                 #layer["cover"] = "NA"
 
             if layer["type"] != "":
                 d[l + "_type"] = CLOUD_TYPE_CODE[layer["type"]]
             else:
-                d[l + "_type"] = np.nan
+                d[l + "_type"] = nan
             #layer["type"] = CLOUD_TYPE_CODE[layer["type"]]
 
             if layer["height"] != "":
@@ -581,8 +746,8 @@ def handle_8NChh(d):
                 d[l + "_height"] = h
                 d[l + "_measurement"] = t
             else:
-                d[l + "_height"] = np.nan
-                d[l + "_measurement"] = np.nan
+                d[l + "_height"] = nan
+                d[l + "_measurement"] = nan
 
                 #layer["height"] = h
                 #layer["measurement"] = t
@@ -590,7 +755,7 @@ def handle_8NChh(d):
                 #drop item with l key
             del d[l]
         else:
-            d[l] = np.nan
+            d[l] = nan
 
         d["c_nlayers"] = c_nlayers
 
@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Station and time index of archive files.
+
+The index maps station id (IIiii) and time of each report to its byte offsets
+in the archive file and to its row in the batch decoded from the file (see
+``reader.decode_file`` and ``cache.DecodedCache``). Queries for a station and
+a time range only read and decode the matching reports.
+
+Only section 0 of each report is looked at when a file is indexed. New or
+changed files are indexed when they are added, unchanged files are skipped.
+Reading reports of a file which changed since it was indexed raises
+``FileChangedError``, the file has to be added again.
+
+"""
+
+import os
+import mmap
+
+import numpy as np
+
+from .batch import SynopBatch, decode_many
+from .filters import _timestamp
+from .reader import report_bytes_re
+
+#the key of a report is the station id followed by the timestamp so the
+#reports of a station are a contiguous range ordered by time
+_KEY_DTYPE = "S17"
+#greater than any timestamp
+_KEY_END = b"~"
+
+
+class FileChangedError(ValueError):
+    """Indexed file changed since it was indexed."""
+
+
+def _scan(path):
+    """Return keys, rows and byte offsets of the reports of a file."""
+    keys = []
+    rows = []
+    offsets = []
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return np.array(keys, dtype=_KEY_DTYPE), np.array(rows, dtype=np.int64), np.empty((0, 2), np.int64)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for row, match in enumerate(report_bytes_re.finditer(buffer)):
+                #only split off section 0
+                begin, stop = match.span(1)
+                section_0 = buffer[begin:min(stop, begin + 64)].split(None, 4)
+                if len(section_0) < 4:
+                    continue
+                timestamp, station = section_0[0], section_0[3]
+                if not (len(station) == 5 and station.isdigit()):
+                    continue
+                keys.append(station + timestamp)
+                rows.append(row)
+                offsets.append((begin, stop))
+
+    return (np.array(keys, dtype=_KEY_DTYPE), np.array(rows, dtype=np.int64),
+            np.array(offsets, dtype=np.int64).reshape(-1, 2))
+
+
+class ArchiveIndex(object):
+    """Index of the reports of archive files by station and time.
+
+    Attributes
+    ----------
+    paths : list of str
+        Indexed files, the file of each report is an index into paths
+    keys : numpy.ndarray of S17
+        Station id followed by the timestamp of each report, sorted
+    files : numpy.ndarray of int32
+        File of each report
+    rows : numpy.ndarray of int64
+        Position of each report in its file
+    offsets : numpy.ndarray of int64
+        Start and end byte offset of each report with shape (n, 2)
+
+    """
+
+    def __init__(self):
+        self.paths = []
+        self.keys = np.array([], dtype=_KEY_DTYPE)
+        self.files = np.array([], dtype=np.int32)
+        self.rows = np.array([], dtype=np.int64)
+        self.offsets = np.empty((0, 2), dtype=np.int64)
+        #size and modification time of the files when they were indexed
+        self._stats = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, path):
+        """Index a file.
+
+        The file is skipped if it was indexed and did not change since. A
+        changed file is indexed again.
+
+        Parameters
+        ----------
+        path : str or path
+            Uncompressed archive file
+
+        Returns
+        -------
+        int
+            Number of indexed reports of the file, 0 if it was skipped
+
+        """
+        path = os.fspath(path)
+        st = os.stat(path)
+        stat = (st.st_size, st.st_mtime_ns)
+        if path in self.paths:
+            file = self.paths.index(path)
+            if self._stats[file] == stat:
+                return 0
+            self._stats[file] = stat
+            self._select(self.files != file)
+        else:
+            file = len(self.paths)
+            self.paths.append(path)
+            self._stats.append(stat)
+
+        keys, rows, offsets = _scan(path)
+        keys = np.concatenate([self.keys, keys])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.files = np.concatenate([self.files, np.full(len(rows), file, dtype=np.int32)])[order]
+        self.rows = np.concatenate([self.rows, rows])[order]
+        self.offsets = np.concatenate([self.offsets, offsets])[order]
+
+        return len(rows)
+
+    def update(self, paths):
+        """Index new and changed files.
+
+        Parameters
+        ----------
+        paths : iterable of str or path
+
+        Returns
+        -------
+        int
+            Number of indexed reports
+
+        """
+        return sum(self.add(path) for path in paths)
+
+    def _check(self, file, st):
+        """Raise FileChangedError if the stat result of the file differs from the indexed file."""
+        if (st.st_size, st.st_mtime_ns) != tuple(self._stats[file]):
+            raise FileChangedError("File {} changed since it was indexed, add it again".format(self.paths[file]))
+
+    def _select(self, selection):
+        """Keep the selected reports."""
+        self.keys = self.keys[selection]
+        self.files = self.files[selection]
+        self.rows = self.rows[selection]
+        self.offsets = self.offsets[selection]
+
+    def query(self, station=None, start=None, end=None):
+        """Find the reports of a station and time range.
+
+        Parameters
+        ----------
+        station : str or int
+            Station id (IIiii), all stations if None
+        start : datetime or str
+            First time of the reports (inclusive), see ``filters.ReportFilter``
+        end : datetime or str
+            Time of the end of the reports (exclusive)
+
+        Returns
+        -------
+        numpy.ndarray of int
+            Positions of the matching reports in the arrays of the index,
+            ordered by file and position in the file
+
+        """
+        start = _timestamp(start)
+        end = _timestamp(end)
+        if station is not None:
+            station = ("{:05d}".format(station) if isinstance(station, int) else station).encode("ascii")
+            lower = station + (start or "").encode("ascii")
+            upper = station + (end.encode("ascii") if end else _KEY_END)
+            found = np.arange(*np.searchsorted(self.keys, [lower, upper]))
+        else:
+            timestamps = self.keys.view("S1").reshape(-1, 17)[:, 5:].copy().view("S12").ravel()
+            selection = np.ones(len(self.keys), dtype=bool)
+            if start is not None:
+                selection &= timestamps >= start.encode("ascii")
+            if end is not None:
+                selection &= timestamps < end.encode("ascii")
+            found = np.flatnonzero(selection)
+
+        return found[np.lexsort((self.rows[found], self.files[found]))]
+
+    def iter_reports(self, station=None, start=None, end=None):
+        """Iterate over the raw reports of a station and time range.
+
+        Only the matching reports are read from the memory mapped files.
+
+        Parameters
+        ----------
+        station, start, end
+            See ``query``
+
+        Yields
+        ------
+        bytes
+            Raw report as in the file
+
+        Raises
+        ------
+        FileChangedError
+            If a file changed since it was indexed
+
+        """
+        found = self.query(station, start, end)
+        for file in np.unique(self.files[found]):
+            offsets = self.offsets[found[self.files[found] == file]]
+            with open(self.paths[file], "rb") as f:
+                self._check(file, os.fstat(f.fileno()))
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with buffer:
+                for begin, stop in offsets.tolist():
+                    yield buffer[begin:stop]
+
+    def decode(self, station=None, start=None, end=None, cache=None, **kwargs):
+        """Decode the reports of a station and time range.
+
+        Parameters
+        ----------
+        station, start, end
+            See ``query``
+        cache : cache.DecodedCache
+            If given the rows are taken from the cached batches of the files
+            (decoded and stored first if needed) instead of decoding the
+            matching reports. The batches are always compact then.
+        kwargs
+            Passed to ``batch.decode_many``, e.g. compact or vars. With a
+            cache passed to ``DecodedCache.decode``, e.g. vars.
+
+        Returns
+        -------
+        SynopBatch
+
+        Raises
+        ------
+        FileChangedError
+            If a file changed since it was indexed
+        TypeError
+            If a row filter (where) or compact=False is used with a cache
+
+        """
+        if cache is None:
+            return decode_many(self.iter_reports(station, start, end), **kwargs)
+
+        #the rows of the index refer to all reports of a file
+        if kwargs.pop("where", None) is not None:
+            raise TypeError("A row filter (where) can not be used with a cache")
+        if not kwargs.pop("compact", True):
+            raise TypeError("Batches of the cache are compact, compact=False can not be used with a cache")
+        found = self.query(station, start, end)
+        batches = []
+        for file in np.unique(self.files[found]):
+            rows = self.rows[found[self.files[found] == file]]
+            self._check(file, os.stat(self.paths[file]))
+            batch = cache.decode(self.paths[file], **kwargs)
+            batches.append(SynopBatch({name: col[rows] for name, col in batch.columns.items()},
+                                      batch.valid[rows], batch.categories))
+
+        return SynopBatch.concat(batches)
+
+    def save(self, path):
+        """Save the index to a .npz file.
+
+        Parameters
+        ----------
+        path : str or path
+
+        """
+        stats = np.array(self._stats, dtype=np.int64).reshape(-1, 2)
+        np.savez(path, paths=np.array(self.paths, dtype=str), stats=stats, keys=self.keys, files=self.files,
+                 rows=self.rows, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with ``save``.
+
+        Parameters
+        ----------
+        path : str or path
+
+        Returns
+        -------
+        ArchiveIndex
+
+        """
+        index = cls()
+        with np.load(path) as data:
+            index.paths = data["paths"].tolist()
+            index._stats = [tuple(stat) for stat in data["stats"].tolist()]
+            index.keys = data["keys"]
+            index.files = data["files"]
+            index.rows = data["rows"]
+            index.offsets = data["offsets"]
+
+        return index
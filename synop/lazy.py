@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Objects built on first use to keep importing the package cheap."""
+
+import re
+
+
+class LazyPattern(object):
+    """Regular expression compiled on first use.
+
+    Behaves like the compiled ``re.Pattern``. The methods of the compiled
+    pattern are cached on the instance after the first access, so later calls
+    cost the same as calls of the compiled pattern.
+
+    Parameters
+    ----------
+    pattern : str or bytes
+        Regular expression
+    flags : int
+        Flags of ``re.compile``
+
+    """
+
+    def __init__(self, pattern, flags=0):
+        self._source = (pattern, flags)
+
+    def __getattr__(self, name):
+        value = getattr(self.compile(), name)
+        self.__dict__[name] = value
+
+        return value
+
+    def __repr__(self):
+        return "LazyPattern({!r})".format(self._source[0])
+
+    def compile(self):
+        """Return the compiled pattern."""
+        compiled = self.__dict__.get("_compiled")
+        if compiled is None:
+            compiled = self.__dict__["_compiled"] = re.compile(*self._source)
+
+        return compiled
+
+
+class LazyPatterns(dict):
+    """Dict of functions of regular expressions compiled on first use.
+
+    Parameters
+    ----------
+    patterns : dict
+        {key: pattern}
+    flags : int
+        Flags of ``re.compile``
+    method : str
+        Name of the method of the compiled pattern stored for each key,
+        e.g. "fullmatch"
+
+    """
+
+    def __init__(self, patterns, flags=0, method="match"):
+        super().__init__()
+        self.patterns = patterns
+        self.flags = flags
+        self.method = method
+
+    def __missing__(self, key):
+        value = self[key] = getattr(re.compile(self.patterns[key], self.flags), self.method)
+
+        return value
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Parallel batch decoding of SYNOP reports.
+
+Chunks of reports are decoded in a process pool. The workers send back the
+decoded columns of their chunk, not one object per report.
+
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .batch import SynopBatch, decode_chunk, iter_chunks
+
+
+def iter_decode(reports, chunksize=10000, max_workers=None, ordered=True, executor=None, compact=False,
+                vars=None, status=False):
+    """Decode reports in parallel and iterate over the decoded chunks.
+
+    At most two chunks per worker are submitted at a time so the reports
+    can be streamed from a large archive (e.g. with ``iter_reports``).
+
+    Parameters
+    ----------
+    reports : iterable of str
+        Raw SYNOP reports
+    chunksize : int
+        Number of reports decoded by a worker at once
+    max_workers : int
+        Number of worker processes, default is the number of CPUs
+    ordered : bool
+        If True the chunks are returned in the order of the reports
+        otherwise as soon as they are decoded
+    executor : concurrent.futures.Executor
+        Executor to use instead of a new process pool
+    compact : bool
+        If True variables with a code table are stored as categories
+        (see ``decode_chunk``)
+    vars : list of str
+        Variables to decode, all if None
+    status : bool
+        If True tag each report as ok, partial or rejected
+
+    Yields
+    ------
+    offset : int
+        Index of the first report of the chunk
+    batch : SynopBatch
+        Decoded chunk
+
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    max_pending = 2 * (max_workers or os.cpu_count() or 1)
+
+    #deque of (offset, future) of the submitted chunks
+    pending = deque()
+    offset = 0
+    try:
+        for chunk in iter_chunks(reports, chunksize):
+            pending.append((offset, executor.submit(decode_chunk, chunk, compact, vars, status)))
+            offset += len(chunk)
+
+            while len(pending) >= max_pending:
+                yield from _collect(pending, ordered)
+
+        while pending:
+            yield from _collect(pending, ordered)
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown()
+
+
+def _collect(pending, ordered):
+    """Return decoded chunks from the pending futures.
+
+    If ordered only the first pending chunk is returned otherwise all chunks
+    which are done.
+
+    """
+    if ordered:
+        offset, future = pending.popleft()
+        yield offset, SynopBatch(*future.result())
+        return
+
+    done, _ = wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+    for offset, future in [p for p in pending if p[1] in done]:
+        pending.remove((offset, future))
+        yield offset, SynopBatch(*future.result())
+
+
+def decode_parallel(reports, chunksize=10000, max_workers=None, compact=False, vars=None):
+    """Decode reports in parallel into a column store.
+
+    Parameters
+    ----------
+    reports : iterable of str
+        Raw SYNOP reports
+    chunksize : int
+        Number of reports decoded by a worker at once
+    max_workers : int
+        Number of worker processes, default is the number of CPUs
+    compact : bool
+        If True variables with a code table are stored as categories
+    vars : list of str
+        Variables to decode, all if None
+
+    Returns
+    -------
+    SynopBatch
+
+    """
+    batches = [batch for _, batch in iter_decode(reports, chunksize, max_workers, ordered=True,
+                                                  compact=compact, vars=vars)]
+
+    return SynopBatch.concat(batches)
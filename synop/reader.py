@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Reading SYNOP reports from files.
+
+Reports are streamed line by line so files of any size can be read with
+constant memory. Uncompressed archives can also be memory mapped and split
+into reports on the bytes (``iter_mapped_reports``), which avoids decoding
+the file to str and reads the file through the page cache.
+
+"""
+
+import io
+import os
+import re
+import gzip
+import mmap
+import logging
+from contextlib import contextmanager
+
+from .lazy import LazyPattern
+from .synop import synop
+from .batch import decode_many
+
+_logger = logging.getLogger(__name__)
+
+#start of a report (section 0)
+report_start_re = LazyPattern(r"\d{12}\s+(AAXX|BBXX|OOXX)\s")
+#line continuing a report spread over several lines (groups and section markers only)
+continuation_re = LazyPattern(r"([\d/]{3,5}\s+)*[\d/]{3,5}")
+#complete report in a bytes buffer: section 0 at the start of a line or after "=" with the rest of
+#its line followed by continuation lines. Same rules as ``ReportSplitter`` but matched in one pass.
+_group = rb"[\d/]{3,5}"
+report_bytes_re = LazyPattern(rb"(?:^|(?<==))[ \t\r]*(\d{12}[ \t]+(?:AAXX|BBXX|OOXX)\s[^=\n]*"
+                              rb"(?:(?:[ \t\r]*\n)+[ \t]*" + _group + rb"(?:[ \t]+" + _group + rb")*[ \t\r]*"
+                              rb"(?=[=\n]|\Z))*)", re.MULTILINE)
+
+
+@contextmanager
+def _open(source, encoding):
+    """Open path or file object as text file."""
+    if isinstance(source, (str, bytes, os.PathLike)):
+        opener = gzip.open if os.fspath(source)[-3:] in (".gz", b".gz") else open
+        f = opener(source, "rt", encoding=encoding, errors="replace")
+        try:
+            yield f
+        finally:
+            f.close()
+    elif isinstance(source, io.TextIOBase) or hasattr(source, "encoding"):
+        yield source
+    else:
+        #binary file object, detach the wrapper so the file object is not closed with it
+        f = io.TextIOWrapper(source, encoding=encoding, errors="replace")
+        try:
+            yield f
+        finally:
+            f.detach()
+
+
+def iter_reports(source, decode=False, encoding="ascii", where=None):
+    """Iterate over the reports in a file.
+
+    A report starts with the 12 digit timestamp followed by AAXX, BBXX or OOXX
+    and ends with "=", the start of the next report or a line which is not a
+    continuation of the report (e.g. a bulletin header). Reports may be spread
+    over several lines and several reports may be on one line. Blank lines and
+    lines outside of reports are skipped.
+
+    Parameters
+    ----------
+    source : str, path or file object
+        Path of the file (read with gzip if it ends with .gz) or file object
+        opened in text or binary mode
+    decode : bool
+        If True yield ``synop`` objects instead of raw reports. Reports which
+        can not be decoded are skipped.
+    encoding : str
+        Encoding of the file. Invalid characters are replaced.
+    where : callable
+        Filter called with each raw report (e.g. ``filters.ReportFilter``).
+        Only reports for which it returns True are returned or decoded.
+
+    Yields
+    ------
+    str or synop
+        Raw report with the lines joined by a single space and without "="
+        or decoded report
+
+    """
+    reports = _iter_raw(source, encoding)
+    if where is not None:
+        reports = filter(where, reports)
+
+    for report in reports:
+        if not decode:
+            yield report
+            continue
+
+        try:
+            yield synop(report)
+        except ValueError:
+            _logger.warning("Could not decode report %r", report)
+
+
+class ReportSplitter(object):
+    """Split lines into reports incrementally.
+
+    Lines are fed one by one and the reports completed by each line are
+    returned (see ``iter_reports`` for the rules).
+
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def feed(self, line):
+        """Add line and return the completed reports.
+
+        Parameters
+        ----------
+        line : str
+
+        Returns
+        -------
+        list of str
+
+        """
+        reports = []
+        parts = self._parts
+        #split the line once, every segment but the last is terminated by "="
+        segments = line.split("=")
+        last = len(segments) - 1
+        for j, segment in enumerate(segments):
+            segment = segment.strip()
+            if segment:
+                if report_start_re.match(segment):
+                    if parts:
+                        reports.append(" ".join(parts))
+                    parts = [segment]
+                elif parts and continuation_re.fullmatch(segment):
+                    parts.append(segment)
+                elif parts:
+                    reports.append(" ".join(parts))
+                    parts = []
+
+            if j < last and parts:
+                reports.append(" ".join(parts))
+                parts = []
+        self._parts = parts
+
+        return reports
+
+    def flush(self):
+        """Return the last report if it is not terminated yet.
+
+        Returns
+        -------
+        list of str
+
+        """
+        reports = [" ".join(self._parts)] if self._parts else []
+        self._parts = []
+
+        return reports
+
+
+def _iter_raw(source, encoding):
+    """Iterate over the raw reports in a file."""
+    splitter = ReportSplitter()
+    with _open(source, encoding) as f:
+        for line in f:
+            yield from splitter.feed(line)
+
+    yield from splitter.flush()
+
+
+def iter_mapped_reports(path, where=None):
+    """Iterate over the reports of a memory mapped file.
+
+    The file is split into reports with the rules of ``iter_reports`` directly
+    on the mapped bytes. The reports are not decoded to str, they can be
+    passed as they are to ``batch.decode_many`` or ``tokenizer.tokenize``.
+
+    Parameters
+    ----------
+    path : str or path
+        Path of an uncompressed ASCII file
+    where : callable
+        Filter called with each raw report (e.g. ``filters.ReportFilter``).
+        Only reports for which it returns True are returned.
+
+    Yields
+    ------
+    bytes
+        Raw report as in the file (lines are not joined) without "="
+
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if hasattr(buffer, "madvise"):
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+            for match in report_bytes_re.finditer(buffer):
+                report = match.group(1)
+                if where is None or where(report):
+                    yield report
+
+
+def decode_file(path, **kwargs):
+    """Decode the reports of a memory mapped file into a column store.
+
+    Parameters
+    ----------
+    path : str or path
+        Path of an uncompressed ASCII file
+    kwargs
+        Passed to ``batch.decode_many``, e.g. chunksize, max_workers, compact,
+        vars or where
+
+    Returns
+    -------
+    SynopBatch
+
+    """
+    return decode_many(iter_mapped_reports(path), **kwargs)
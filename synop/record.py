@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compact record type for decoded SYNOP reports.
+
+A ``synop`` object keeps a dict per section with an entry for every variable.
+``SynopRecord`` stores the same values as a single tuple ordered by a fixed
+schema derived from the handler tables of ``synop``, which needs a fraction
+of the memory when millions of reports are kept.
+
+"""
+
+from collections import OrderedDict
+
+from .synop import synop
+
+
+def _schema(variables):
+    """Flatten the variables of each group into (section, variable) pairs."""
+    schema = []
+    for sname, gvariables in variables.items():
+        names = OrderedDict.fromkeys(v for gv in gvariables.values() for v in gv)
+        schema.extend((sname, v) for v in names)
+
+    return tuple(schema)
+
+
+#(section, variable) of each value of a record
+SCHEMA = _schema(synop._variables)
+SECTIONS = tuple(synop.handlers)
+
+#index of the value of each variable. If a variable is in several sections
+#the last one is used like in ``synop.to_dict``.
+_INDEX = {var: i for i, (sname, var) in enumerate(SCHEMA)}
+_SECTION_SLICES = {sname: (min(i for i, s in enumerate(SCHEMA) if s[0] == sname),
+                           max(i for i, s in enumerate(SCHEMA) if s[0] == sname) + 1) for sname in SECTIONS}
+_I_WIND_UNIT = SCHEMA.index(("section_0", "wind_unit"))
+_I_WIND_SPEED = SCHEMA.index(("section_1", "wind_speed"))
+_I_WIND_SPEED_HIGH = SCHEMA.index(("section_1", "wind_speed_high"))
+
+
+class SynopRecord(object):
+    """Decoded SYNOP report with a fixed schema.
+
+    Variables which were not decoded (e.g. when the report was decoded with
+    ``vars``) are None.
+
+    Attributes
+    ----------
+    raw : str
+        Raw SYNOP report
+    values : tuple
+        Decoded values ordered as ``SCHEMA``
+
+    """
+
+    __slots__ = ("raw", "values")
+
+    def __init__(self, raw, values):
+        self.raw = raw
+        self.values = values
+
+    @classmethod
+    def from_synop(cls, report):
+        """Create record from a decoded report.
+
+        Parameters
+        ----------
+        report : synop
+            Decoded report
+
+        Returns
+        -------
+        SynopRecord
+
+        """
+        empty = {}
+        decoded = report.decoded
+        values = tuple(decoded.get(sname, empty).get(var) for sname, var in SCHEMA)
+
+        return cls(report.raw, values)
+
+    @classmethod
+    def decode(cls, report, **kwargs):
+        """Decode SYNOP report into a record.
+
+        Parameters
+        ----------
+        report : str or bytes
+            Raw SYNOP report
+        kwargs
+            Passed to ``synop``
+
+        Returns
+        -------
+        SynopRecord
+
+        """
+        return cls.from_synop(synop(report, **kwargs))
+
+    def __repr__(self):
+        return "<SynopRecord: {!r}>".format(self.raw[:40])
+
+    def __getitem__(self, var):
+        return self.values[_INDEX[var]]
+
+    @property
+    def decoded(self):
+        """Decoded sections as dict of dicts like ``synop.decoded``."""
+        decoded = {sname: {} for sname in SECTIONS}
+        for (sname, var), value in zip(SCHEMA, self.values):
+            decoded[sname][var] = value
+
+        return decoded
+
+    def section(self, sname):
+        """Return decoded section.
+
+        Parameters
+        ----------
+        sname : str
+            Section name, e.g. "section_1"
+
+        Returns
+        -------
+        dict
+
+        """
+        start, stop = _SECTION_SLICES[sname]
+
+        return dict(zip((var for _, var in SCHEMA[start:stop]), self.values[start:stop]))
+
+    def convert_units(self):
+        """Convert units (see ``synop.convert_units``)."""
+        w_unit = self.values[_I_WIND_UNIT]
+        knots_to_mps_factor = 0.51444444444444
+        if w_unit not in ["knots estimate", "knots measured"]:
+            return
+
+        if "estimate" in w_unit:
+            new_wind_unit = "meters per second estimate"
+        else:
+            new_wind_unit = "meters per second measured"
+
+        values = list(self.values)
+        values[_I_WIND_UNIT] = new_wind_unit
+        values[_I_WIND_SPEED] = values[_I_WIND_SPEED] * knots_to_mps_factor
+        if values[_I_WIND_SPEED_HIGH] is not None:
+            values[_I_WIND_SPEED_HIGH] = values[_I_WIND_SPEED_HIGH] * knots_to_mps_factor
+        self.values = tuple(values)
+
+    def to_dict(self, vars=None):
+        """Convert selected variables of report to a dict.
+
+        Parameters
+        ----------
+        vars : list of str
+            List of variables to include, default are the section names
+            like in ``synop.to_dict``
+
+        Returns
+        -------
+        dict
+
+        """
+        if vars is None:
+            vars = SECTIONS
+
+        values = self.values
+
+        return OrderedDict((var, values[_INDEX[var]] if var in _INDEX else None) for var in vars)
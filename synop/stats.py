@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Optional instrumentation of the decoders.
+
+While a ``DecoderStats`` object is active the decoders (``synop`` and the
+batch decoder) count the decoded reports, the calls and time of the
+tokenizer, the sections and the group handlers, the groups which could not
+be decoded and the missing values of each variable::
+
+    with DecoderStats() as stats:
+        batch = decode_many(reports)
+    print(stats.to_prometheus())
+
+If no object is active the decoders only check ``active`` once per report
+(section for ``synop``) and chunk, so the instrumentation costs nothing when
+not used. Only decoding in the current process is counted, not in the
+worker processes of ``decode_many``.
+
+"""
+
+import json
+from time import perf_counter
+
+#instrumentation used by the decoders, None if disabled
+active = None
+
+#reason for groups which do not match the group pattern of the regex engine
+NO_MATCH = "no_match"
+
+
+def _label(value):
+    """Escape label value of the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class DecoderStats(object):
+    """Counters and timings of the decoders.
+
+    Can be used as context manager which activates the object or by setting
+    ``stats.active``. All times are in seconds.
+
+    Attributes
+    ----------
+    reports : int
+        Number of decoded reports including the rejected reports
+    rejected : int
+        Number of reports which could not be decoded
+    seconds : float
+        Time spent decoding the reports. With lazy decoding the sections
+        decoded after the creation of the ``synop`` object are not included.
+    elapsed : float
+        Time the object was active as context manager
+    tokenizer : list
+        [calls, seconds] of the tokenizer
+    sections : dict
+        {section: [calls, seconds]}. For the batch decoder a call is the
+        decoding of the columns of the section for a chunk.
+    handlers : dict
+        {(section, group, handler): [calls, seconds, failures]}. For the batch
+        decoder group is the variable and handler the vectorized decoder.
+    failures : dict
+        {reason: count} of the rejected reports and of the groups which could
+        not be decoded (see ``tokenizer.tokenize`` and ``NO_MATCH``)
+    missing : dict
+        {(section, variable): count} of the valid reports without the group
+        of the variable
+    nan : dict
+        {(section, variable): count} of the valid reports with the group of
+        the variable but a missing value (e.g. "/" or an unknown code)
+
+    """
+
+    def __init__(self):
+        self._previous = []
+        self.elapsed = 0.0
+        self.reset()
+
+    def __enter__(self):
+        global active
+        self._previous.append((active, perf_counter()))
+        active = self
+
+        return self
+
+    def __exit__(self, *args):
+        global active
+        active, start = self._previous.pop()
+        self.elapsed += perf_counter() - start
+
+    def __repr__(self):
+        return "<DecoderStats: {} reports, {} rejected, {:.0f} reports/s>".format(self.reports, self.rejected,
+                                                                                   self.rate)
+
+    def reset(self):
+        """Reset all counters."""
+        self.reports = 0
+        self.rejected = 0
+        self.seconds = 0.0
+        self.tokenizer = [0, 0.0]
+        self.sections = {}
+        self.handlers = {}
+        self.failures = {}
+        self.missing = {}
+        self.nan = {}
+
+    @property
+    def rate(self):
+        """Decoded reports per second of decoding time."""
+        return self.reports / self.seconds if self.seconds > 0 else 0.0
+
+    def add_reports(self, n, seconds, rejected=0):
+        """Count n decoded reports."""
+        self.reports += n
+        self.rejected += rejected
+        self.seconds += seconds
+
+    def add_tokenizer(self, n, seconds):
+        """Count n calls of the tokenizer."""
+        counter = self.tokenizer
+        counter[0] += n
+        counter[1] += seconds
+
+    def add_section(self, section, seconds, calls=1):
+        """Count decoding of a section."""
+        counter = self.sections.get(section)
+        if counter is None:
+            counter = self.sections[section] = [0, 0.0]
+        counter[0] += calls
+        counter[1] += seconds
+
+    def add_handler(self, section, group, handler, seconds, calls=1, failed=0):
+        """Count calls of a group handler (failed calls are also counted as calls)."""
+        key = (section, group, handler)
+        counter = self.handlers.get(key)
+        if counter is None:
+            counter = self.handlers[key] = [0, 0.0, 0]
+        counter[0] += calls
+        counter[1] += seconds
+        counter[2] += failed
+
+    def add_failure(self, reason, n=1):
+        """Count n groups or reports which could not be decoded."""
+        self.failures[reason] = self.failures.get(reason, 0) + n
+
+    def add_values(self, section, variable, missing=0, nan=0):
+        """Count missing values of a variable."""
+        key = (section, variable)
+        if missing:
+            self.missing[key] = self.missing.get(key, 0) + missing
+        if nan:
+            self.nan[key] = self.nan.get(key, 0) + nan
+
+    def to_dict(self):
+        """Return the counters as dict of builtin types.
+
+        Sections and handlers are ordered by their time, the slowest first.
+
+        Returns
+        -------
+        dict
+
+        """
+        sections = sorted(self.sections.items(), key=lambda item: -item[1][1])
+        handlers = sorted(self.handlers.items(), key=lambda item: -item[1][1])
+        variables = sorted(set(self.missing).union(self.nan))
+
+        return {"reports": self.reports,
+                "rejected": self.rejected,
+                "seconds": self.seconds,
+                "reports_per_second": self.rate,
+                "tokenizer": {"calls": self.tokenizer[0], "seconds": self.tokenizer[1]},
+                "sections": [{"section": s, "calls": calls, "seconds": seconds}
+                             for s, (calls, seconds) in sections],
+                "handlers": [{"section": s, "group": g, "handler": h, "calls": calls, "seconds": seconds,
+                              "failures": failed} for (s, g, h), (calls, seconds, failed) in handlers],
+                "failures": dict(sorted(self.failures.items())),
+                "variables": [{"section": s, "variable": v, "missing": self.missing.get((s, v), 0),
+                               "nan": self.nan.get((s, v), 0)} for s, v in variables]}
+
+    def to_json(self, indent=None):
+        """Return the counters as JSON (see ``to_dict``)."""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix="synop"):
+        """Return the counters in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix : str
+            Prefix of the metric names
+
+        Returns
+        -------
+        str
+
+        """
+        metrics = [("reports_total", "counter", "Decoded reports", [((), self.reports)]),
+                   ("rejected_reports_total", "counter", "Reports which could not be decoded",
+                    [((), self.rejected)]),
+                   ("decode_seconds_total", "counter", "Time spent decoding reports", [((), self.seconds)]),
+                   ("reports_per_second", "gauge", "Decoded reports per second of decoding time",
+                    [((), self.rate)]),
+                   ("tokenizer_calls_total", "counter", "Calls of the tokenizer", [((), self.tokenizer[0])]),
+                   ("tokenizer_seconds_total", "counter", "Time spent in the tokenizer",
+                    [((), self.tokenizer[1])])]
+
+        sections = sorted(self.sections.items())
+        metrics.append(("section_calls_total", "counter", "Decoded sections",
+                        [((("section", s),), c[0]) for s, c in sections]))
+        metrics.append(("section_seconds_total", "counter", "Time spent decoding sections",
+                        [((("section", s),), c[1]) for s, c in sections]))
+
+        handlers = [((("section", s), ("group", g), ("handler", h)), c)
+                    for (s, g, h), c in sorted(self.handlers.items())]
+        metrics.append(("handler_calls_total", "counter", "Calls of the group handlers",
+                        [(labels, c[0]) for labels, c in handlers]))
+        metrics.append(("handler_seconds_total", "counter", "Time spent in the group handlers",
+                        [(labels, c[1]) for labels, c in handlers]))
+        metrics.append(("handler_failures_total", "counter", "Groups the handlers could not decode",
+                        [(labels, c[2]) for labels, c in handlers]))
+
+        metrics.append(("failures_total", "counter", "Rejected reports and groups which could not be decoded",
+                        [((("reason", r),), n) for r, n in sorted(self.failures.items())]))
+        for name, counts, description in (("missing_values_total", self.missing, "Values without their group"),
+                                          ("nan_values_total", self.nan, "Values missing in their group")):
+            metrics.append((name, "counter", description,
+                            [((("section", s), ("variable", v)), n) for (s, v), n in sorted(counts.items())]))
+
+        lines = []
+        for name, kind, description, samples in metrics:
+            name = "{}_{}".format(prefix, name)
+            lines.append("# HELP {} {}".format(name, description))
+            lines.append("# TYPE {} {}".format(name, kind))
+            for labels, value in samples:
+                labels = ",".join('{}="{}"'.format(k, _label(v)) for k, v in labels)
+                lines.append("{}{} {}".format(name, "{" + labels + "}" if labels else "", value))
+
+        return "\n".join(lines) + "\n"
@@ -4,15 +4,32 @@
 """synop object for decoding SYNOP reports."""
 import re
 import logging
-import numpy as np
+from math import nan
+from time import perf_counter
+from functools import partial
 from collections import OrderedDict
+from collections.abc import MutableMapping
 
 from .handlers import (default_handler, handle_MMMM, handle_wind_unit, handle_iihVV, handle_Nddff, handle_00fff,
 handle_sTTT, handle_PPPP, handle_5appp, handle_6RRRt, handle_7wwWW, handle_8NCCC, handle_9GGgg, handle_3EsTT,
 handle_4Esss, handle_55SSS, handle_553SS, handle_7RRRR, handle_8NChh)
+from . import stats as _stats
+from .lazy import LazyPattern
+from .tokenizer import (tokenize, SLOT_INDEX, RADIATION_SLOTS, RADIATION_H_SLOTS, CLOUD_LAYER_SLOTS, InvalidReport,
+INVALID_SECTION_0)
 
 _logger = logging.getLogger(__name__)
 
+#reason for groups which could not be decoded by their handler (e.g. unknown code)
+INVALID_CODE = "invalid_code"
+#errors of the handlers caught if errors are collected
+HANDLER_ERRORS = (KeyError, ValueError, TypeError, IndexError)
+#maximum number of handler results kept per group (see ``synop._decode_tokens``). The results are kept in
+#the memo dict of the group in the class level plans (see ``_plan_groups``), so they are shared by all
+#instances and threads of a process and each vars projection has its own memos. Results are never removed,
+#a full memo is not extended any more, which bounds the memory to MEMO_SIZE results per group and plan.
+MEMO_SIZE = 10000
+
 #Syntax description (see Manual on codes pdf (Reference 2) page 9 ("Section A Code Forms") or reference 3)
 #For decoding single groups see Manual on codes "Section B Specification of Symbolic Letters"
 #section 0
@@ -36,7 +53,7 @@ _logger = logging.getLogger(__name__)
 
 #regex definitions
 #split report into its sections
-sections_re = re.compile(r"""(?P<section_0>[\d]{12}\s+(AAXX|BBXX|OOXX)\s+[\d]{5}\s+[\d]{5})\s+
+sections_re = LazyPattern(r"""(?P<section_0>[\d]{12}\s+(AAXX|BBXX|OOXX)\s+[\d]{5}\s+[\d]{5})\s+
                              (?P<section_1>((\d|\/){5}\s+){0,9}){0,1}
                              ((?P<section_2>(222\d\d\s+)(\d{5}\s+){0,9})){0,1}
                              ((333\s+)(?P<section_3>(\d{5}\s+){0,9})){0,1}
@@ -47,7 +64,7 @@ sections_re = re.compile(r"""(?P<section_0>[\d]{12}\s+(AAXX|BBXX|OOXX)\s+[\d]{5}
                              re.VERBOSE)
 
 #split section 0
-section_0_re = re.compile(r"""(?P<datetime>[\d]{12})\s+
+section_0_re = LazyPattern(r"""(?P<datetime>[\d]{12})\s+
                          (?P<MMMM>AAXX|BBXX|OOXX)\s+
                          (?P<monthdayr>[\d]{2})
                          (?P<hourr>[\d]{2})
@@ -57,7 +74,7 @@ section_0_re = re.compile(r"""(?P<datetime>[\d]{12})\s+
 
 #split section 1
 #separate handling of groups because resulting dictionary can not contain double regex group names
-section_1_re = re.compile(r"""((?P<iihVV>(\d|\/){5})\s+
+section_1_re = LazyPattern(r"""((?P<iihVV>(\d|\/){5})\s+
                               (?P<Nddff>(\d|/){5})\s+
                               (00(?P<fff>\d{3})\s+)?
                               (1(?P<t_air>(\d|/){4})\s+)?
@@ -71,22 +88,22 @@ section_1_re = re.compile(r"""((?P<iihVV>(\d|\/){5})\s+
                               (9(?P<GGgg>\d{4})\s+)?)?""",
                               re.VERBOSE)
 
-s1_iihVV_re = re.compile(r"""((?P<ir>\d)(?P<ix>\d)(?P<h>(\d|\/))(?P<VV>\d\d))?""", re.VERBOSE)
-s1_Nddff_re = re.compile(r"""((?P<N>(\d|/))(?P<dd>\d\d)(?P<ff>\d\d))?""", re.VERBOSE)
-s1_00fff_re = re.compile(r"""((?P<wind_speed>\d{3}))?""", re.VERBOSE)
+s1_iihVV_re = LazyPattern(r"""((?P<ir>\d)(?P<ix>\d)(?P<h>(\d|\/))(?P<VV>\d\d))?""", re.VERBOSE)
+s1_Nddff_re = LazyPattern(r"""((?P<N>(\d|/))(?P<dd>\d\d)(?P<ff>\d\d))?""", re.VERBOSE)
+s1_00fff_re = LazyPattern(r"""((?P<wind_speed>\d{3}))?""", re.VERBOSE)
 #s1_1sTTT_re = re.compile(r"""(?P<air_t>\d{4})""", re.VERBOSE)
 #s1_2sTTT_re = re.compile(r"""(?P<dewp>\d{4})""", re.VERBOSE)
 #s1_3PPPP_re = re.compile(r"""(?P<p_baro>.*)""", re.VERBOSE)
 #s1_4PPPP_re = re.compile(r"""(?P<p_slv>.*)""", re.VERBOSE)
-s1_5appp_re = re.compile(r"""((?P<a>\d)(?P<ppp>\d{3}))?""", re.VERBOSE)
-s1_6RRRt_re = re.compile(r"""((?P<RRR>\d{3})(?P<t>(\d|/)))?""", re.VERBOSE)
-s1_7wwWW_re = re.compile(r"""((?P<ww>\d{2})(?P<W1>\d)(?P<W2>\d))?""", re.VERBOSE)
-s1_8NCCC_re = re.compile(r"""((?P<N>\d)(?P<CL>(\d|/))(?P<CM>(\d|/))(?P<CH>(\d|/)))?""", re.VERBOSE)
-s1_9GGgg_re = re.compile(r"""((?P<observation_time>.*))?""", re.VERBOSE)
+s1_5appp_re = LazyPattern(r"""((?P<a>\d)(?P<ppp>\d{3}))?""", re.VERBOSE)
+s1_6RRRt_re = LazyPattern(r"""((?P<RRR>\d{3})(?P<t>(\d|/)))?""", re.VERBOSE)
+s1_7wwWW_re = LazyPattern(r"""((?P<ww>\d{2})(?P<W1>\d)(?P<W2>\d))?""", re.VERBOSE)
+s1_8NCCC_re = LazyPattern(r"""((?P<N>\d)(?P<CL>(\d|/))(?P<CM>(\d|/))(?P<CH>(\d|/)))?""", re.VERBOSE)
+s1_9GGgg_re = LazyPattern(r"""((?P<observation_time>.*))?""", re.VERBOSE)
 
 
 #split section 2
-section_2_re = re.compile(r"""((222(?P<dv>\d{2}))\s+
+section_2_re = LazyPattern(r"""((222(?P<dv>\d{2}))\s+
                               (0(?P<t_water>(\d|/){4})\s+)?
                               (1(?P<aPPHH>\d{4})\s+)?
                               (2(?P<bPPHH>\d{4})\s+)?
@@ -99,7 +116,7 @@ section_2_re = re.compile(r"""((222(?P<dv>\d{2}))\s+
                               re.VERBOSE)
 
 #split section 3
-section_3_re = re.compile(r"""(0(?P<xxxx>\d{4}\s+))?
+section_3_re = LazyPattern(r"""(0(?P<xxxx>\d{4}\s+))?
                               (1(?P<t_max>\d{4}\s+))?
                               (2(?P<t_min>\d{4}\s+))?
                               (3(?P<EsTT>\d{4}\s+))?
@@ -112,9 +129,9 @@ section_3_re = re.compile(r"""(0(?P<xxxx>\d{4}\s+))?
                               (9(?P<SSss>\d{4}\s+){0,9})?""",
                               re.VERBOSE)
 
-s3_EsTT_re = re.compile(r"""((?P<E>\d)(?P<sTT>\d{3}))?""", re.VERBOSE)
-s3_Esss_re = re.compile(r"""((?P<E>\d)(?P<sss>\d{3}))?""", re.VERBOSE)
-s3_55SSS_re = re.compile(r"""(55(?P<rad_d_hours>\d\d\d)\s+
+s3_EsTT_re = LazyPattern(r"""((?P<E>\d)(?P<sTT>\d{3}))?""", re.VERBOSE)
+s3_Esss_re = LazyPattern(r"""((?P<E>\d)(?P<sss>\d{3}))?""", re.VERBOSE)
+s3_55SSS_re = LazyPattern(r"""(55(?P<rad_d_hours>\d\d\d)\s+
                              (0(?P<rad_d_net_pos>\d\d\d\d)\s+)?
                              (1(?P<rad_d_net_neg>\d\d\d\d)\s+)?
                              (2(?P<rad_d_global>\d\d\d\d)\s+)?
@@ -123,7 +140,7 @@ s3_55SSS_re = re.compile(r"""(55(?P<rad_d_hours>\d\d\d)\s+
                              (5(?P<rad_d_long_up>\d\d\d\d)\s+)?
                              (6(?P<rad_d_short>\d\d\d\d)\s+)?)?""",
                              re.VERBOSE)
-s3_553SS_re = re.compile(r"""(553(?P<rad_h_hours>\d\d)\s+
+s3_553SS_re = LazyPattern(r"""(553(?P<rad_h_hours>\d\d)\s+
                              (0(?P<rad_h_net_pos>\d\d\d\d)\s+)?
                              (1(?P<rad_h_net_neg>\d\d\d\d)\s+)?
                              (2(?P<rad_h_global>\d\d\d\d)\s+)?
@@ -132,13 +149,13 @@ s3_553SS_re = re.compile(r"""(553(?P<rad_h_hours>\d\d)\s+
                              (5(?P<rad_h_long_up>\d\d\d\d)\s+)?
                              (6(?P<rad_h_short>\d\d\d\d)\s+)?)?""",
                              re.VERBOSE)
-s3_8NChh_re = re.compile(r"""((8(?P<c1>\d(\d|/)\d\d)\s+)?
+s3_8NChh_re = LazyPattern(r"""((8(?P<c1>\d(\d|/)\d\d)\s+)?
                              (8(?P<c2>\d(\d|/)\d\d)\s+)?
                              (8(?P<c3>\d(\d|/)\d\d)\s+)?
                              (8(?P<c4>\d(\d|/)\d\d)\s+)?)?""",
                              re.VERBOSE)
 
-section_4_re = re.compile(r"""(?P<any>.*\s+)?""", re.VERBOSE)
+section_4_re = LazyPattern(r"""(?P<any>.*\s+)?""", re.VERBOSE)
 
 section_5_re = section_4_re
 
@@ -155,11 +172,183 @@ def _report_match(handler, match):
         _logger.debug("%s didn't match...", handler.__name__)
 
 
+def _layout(slot, start, stop):
+    """Position of a variable in the groups returned by the tokenizer."""
+    return (SLOT_INDEX[slot], start, stop)
+
+
+#variables of the radiation groups following 55SSS and 553SS
+RADIATION_VARIABLES = ("rad_d_net_pos", "rad_d_net_neg", "rad_d_global", "rad_d_diff",
+                       "rad_d_long_down", "rad_d_long_up", "rad_d_short")
+RADIATION_H_VARIABLES = tuple(v.replace("rad_d", "rad_h") for v in RADIATION_VARIABLES)
+
+
+def _missing_groups(handlers, layouts, selection=None):
+    """Decode all groups of sections 1-9 as missing.
+
+    Parameters
+    ----------
+    handlers : dict
+        Handler table of each section
+    layouts : dict
+        Group layouts of each section
+    selection : dict
+        Names of the groups to decode per section, all groups if None
+
+    Returns
+    -------
+    dict
+        {"section_x": {"group_name or variable": value}}
+
+    """
+    missing = {}
+    for sname, (pattern, ghandlers) in handlers.items():
+        if selection is not None and sname not in selection:
+            continue
+        missing[sname] = {}
+        #section 0 can not be missing
+        if sname == "section_0":
+            continue
+        for gname, (gpattern, ghandler) in ghandlers.items():
+            if selection is not None and gname not in selection[sname]:
+                continue
+            elif gpattern is None:
+                missing[sname][gname] = ghandler("")
+            else:
+                missing[sname].update(ghandler({k: "" for k in layouts[sname][gname]}))
+
+    return missing
+
+
+def _plan_groups(handlers, layouts, selection=None):
+    """Prepare the decoding of the groups found by the tokenizer.
+
+    Parameters
+    ----------
+    handlers : dict
+        Handler table of each section
+    layouts : dict
+        Group layouts of each section
+    selection : dict
+        Names of the groups to decode per section, all groups if None
+
+    Returns
+    -------
+    dict
+        {"section_x": (first slot, last slot + 1, [(group_name, handler, key slot, layout, slots, memo)])}.
+        The key slot is the group which has to be present for the group to be decoded. slots
+        are the slots of the layout if it spans more than the key slot (e.g. the radiation
+        groups), None otherwise. memo is the dict of the results of the handler by group
+        shared by all reports decoded with the plans (see ``MEMO_SIZE``).
+
+    """
+    plans = {}
+    for sname, layout in layouts.items():
+        if selection is not None and sname not in selection:
+            continue
+        plan = []
+        for gname, fields in layout.items():
+            if selection is not None and gname not in selection[sname]:
+                continue
+            handler = handlers[sname][1][gname][1]
+            key = fields[0] if type(fields) is tuple else next(iter(fields.values()))[0]
+            slots = (key,) if type(fields) is tuple else tuple(dict.fromkeys(f[0] for f in fields.values()))
+            plan.append((gname, handler, key, fields, slots if len(slots) > 1 else None, {}))
+        slots = [f[0] for p in plan for f in ([p[3]] if type(p[3]) is tuple else p[3].values())]
+        plans[sname] = (min(slots), max(slots) + 1, plan)
+
+    return plans
+
+
+def _group_variables(handlers, layouts):
+    """Variables returned by the handler of each group.
+
+    Parameters
+    ----------
+    handlers : dict
+        Handler table of each section
+    layouts : dict
+        Group layouts of each section
+
+    Returns
+    -------
+    dict
+        {"section_x": {"group_name": (variable, ...)}}
+
+    """
+    variables = {}
+    for sname, layout in layouts.items():
+        variables[sname] = {}
+        for gname, fields in layout.items():
+            if type(fields) is tuple:
+                variables[sname][gname] = (gname,)
+            else:
+                ghandler = handlers[sname][1][gname][1]
+                #handlers of the radiation groups return nothing for missing groups
+                #but the variables of the layout
+                variables[sname][gname] = tuple(ghandler({k: "" for k in fields})) or tuple(fields)
+
+    return variables
+
+
+class LazySections(MutableMapping):
+    """Sections of a report which are decoded on first access.
+
+    Behaves like the dict of decoded sections. A section is decoded when it
+    is accessed the first time and the result is kept.
+
+    Parameters
+    ----------
+    names : iterable of str
+        Names of the sections
+    decode : callable
+        Function returning the decoded section for a section name
+
+    """
+
+    def __init__(self, names, decode):
+        self._names = list(names)
+        self._decode = decode
+        self._sections = {}
+
+    def __getitem__(self, sname):
+        try:
+            return self._sections[sname]
+        except KeyError:
+            if sname not in self._names:
+                raise
+        section = self._sections[sname] = self._decode(sname)
+
+        return section
+
+    def __setitem__(self, sname, section):
+        if sname not in self._names:
+            self._names.append(sname)
+        self._sections[sname] = section
+
+    def __delitem__(self, sname):
+        self._names.remove(sname)
+        self._sections.pop(sname, None)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return "<LazySections: decoded {}>".format([s for s in self._names if s in self._sections])
+
+    def is_decoded(self, sname):
+        """Return True if section has already been decoded."""
+        return sname in self._sections
+
+
 def missing_value(f):
     """Missing value decorator."""
     def decorated(*args, **kwargs):
         if args[1] is None:
-            return np.nan
+            return nan
         else:
             return f(*args, **kwargs)
     return decorated
@@ -189,56 +378,293 @@ class synop(object):
     - add decoding of special weather conditions in 9SSss group of section 3
     """
 
-    def __init__(self, report):
+    def __init__(self, report, engine="tokenizer", lazy=False, vars=None, errors="raise"):
         """Decode SYNOP report.
 
         Parameters
         ----------
-        report : str
-            Raw SYNOP report
+        report : str or bytes
+            Raw SYNOP report, bytes (e.g. from a memory mapped archive) are
+            decoded as ASCII
+        engine : str
+            "tokenizer" splits the report into its groups in a single pass (default).
+            The time is linear in the length of the report, also for malformed reports.
+            "regex" matches the report against the section and group regex patterns.
+            Only up to 9 groups per section are decoded and the report must end with
+            whitespace.
+        lazy : bool
+            If True only split the report into its sections. The groups of a
+            section are decoded on first access of ``decoded["section_x"]``
+            (see ``LazySections``).
+        vars : list of str
+            Variables (or section names) to decode, all if None. Only the
+            groups holding these variables are decoded and ``decoded`` only
+            contains their sections.
+        errors : str
+            "raise" raises the errors of the group handlers (default), "collect"
+            decodes groups which can not be decoded as missing and appends
+            (reason, group) to ``errors``. Groups not used by the tokenizer
+            are collected as well (see ``tokenize``).
+
+        Raises
+        ------
+        InvalidReport
+            If section 0 of the report is not valid
 
         """
+        if errors not in ("raise", "collect"):
+            raise ValueError("Unknown errors {}".format(errors))
+        if isinstance(report, bytes):
+            report = report.decode("ascii", errors="replace")
         self.raw = report
+        self.errors = [] if errors == "collect" else None
         self.decoded = None
         self.type = "SYNOP"
         self.datetime = None
         self.station_id = None
+        self.vars = vars
 
+        stats = _stats.active
+        if stats is not None:
+            t_start = perf_counter()
+        plans, missing = self._projection(vars)
         #decoded is a dict of dicts in form {"section_x": {"group_name or variable": value}}
-        self.decoded = sections_re.match(self.raw).groupdict("")
-        #split raw report into its sections then split each section into
-        #its groups and handle (decode) each group
-        #use sorted to make sure report is decoded starting with section 0
-        for sname in sorted(self.decoded.keys()):
-            sraw = self.decoded[sname]
-            pattern, ghandlers = self.handlers[sname]
-            #TODO
-            #- add try except for matching and collect string when  match is empty
-            #sec_groups = patter.match(sraw).groupdict()
-            #self.decoded[sname] = pattern.match(sraw).groupdict()
-            gd = pattern.match(sraw).groupdict("")
-            #try:
-                #gd = pattern.match(sraw).groupdict("")
-            #except:
-                #print(self.raw)
-                #print(self.decoded)
-                #print(sname, sraw)
-
-            #if section is not none create dictionary for it
-            self.decoded[sname] = {}
-            for gname, graw in gd.items():
-                if gname not in ghandlers:
-                    continue
-                gpattern, ghandler = ghandlers[gname]
-                #if the group can be decoded directly without further regex pattern
-                #handle it directly otherwise match it against a group pattern
+        if engine == "regex":
+            #split raw report into its sections
+            sections = sections_re.match(self.raw)
+            if sections is None:
+                if stats is not None:
+                    stats.add_failure(INVALID_SECTION_0)
+                    stats.add_reports(1, perf_counter() - t_start, rejected=1)
+                raise InvalidReport("Invalid section 0 in report: {!r}".format(self.raw[:40]), INVALID_SECTION_0, "")
+            decode = partial(self._decode_regex, sections.groupdict(""), plans, self.errors)
+        elif engine == "tokenizer":
+            if stats is None:
+                groups = tokenize(self.raw, self.errors)
+            else:
+                groups = self._tokenize_counted(stats, t_start)
+            decode = partial(self._decode_tokens, groups, plans, missing, self.errors)
+        else:
+            raise ValueError("Unknown engine {}".format(engine))
+
+        if lazy:
+            self.decoded = LazySections(plans, decode)
+        else:
+            #decode starting with section 0
+            self.decoded = {sname: decode(sname) for sname in plans}
+
+        if stats is not None:
+            stats.add_reports(1, perf_counter() - t_start)
+
+    def _tokenize_counted(self, stats, t_start):
+        """Tokenize the report and count the groups and reports the tokenizer rejects."""
+        #the rejected groups are only reported if they are collected
+        errors = [] if self.errors is None else self.errors
+        t = perf_counter()
+        try:
+            groups = tokenize(self.raw, errors)
+        except InvalidReport as e:
+            stats.add_tokenizer(1, perf_counter() - t)
+            stats.add_failure(e.reason)
+            stats.add_reports(1, perf_counter() - t_start, rejected=1)
+            raise
+        stats.add_tokenizer(1, perf_counter() - t)
+        for reason, group in errors:
+            stats.add_failure(reason)
+
+        return groups
+
+    @classmethod
+    def _count_values(cls, stats, sname, section, reported):
+        """Count the missing values of a decoded section.
+
+        reported are the names of the groups present in the report.
+
+        """
+        variables = cls._variables[sname]
+        reported = {v for gname in reported for v in variables.get(gname, (gname,))}
+        for name, value in section.items():
+            if value is None or value != value or value == "":
+                if name in reported:
+                    stats.add_values(sname, name, nan=1)
+                else:
+                    stats.add_values(sname, name, missing=1)
+
+    @classmethod
+    def _projection(cls, vars):
+        """Plans and missing sections for decoding the given variables only.
+
+        Parameters
+        ----------
+        vars : list of str
+            Variables or section names, all if None
+
+        Returns
+        -------
+        plans : dict
+            Group plans of the sections to decode (see ``_plan_groups``)
+        missing : dict
+            Result of the handlers of these groups if missing (see ``_missing_groups``)
+
+        """
+        if vars is None:
+            return cls._plans, cls._missing
+
+        key = tuple(vars)
+        if key not in cls._projections:
+            wanted = set(key)
+            #wind speeds are converted with the wind unit of section 0 (see convert_units)
+            if wanted.intersection(("wind_speed", "wind_speed_high")):
+                wanted.add("wind_unit")
+            selection = {}
+            for sname, gvariables in cls._variables.items():
+                groups = {g for g, v in gvariables.items() if sname in wanted or wanted.intersection(v)}
+                if groups:
+                    selection[sname] = groups
+            unknown = wanted.difference(cls._variables, *(v for gv in cls._variables.values() for v in gv.values()))
+            if unknown:
+                raise ValueError("Unknown variables {}".format(sorted(unknown)))
+            cls._projections[key] = (_plan_groups(cls.handlers, cls.layouts, selection),
+                                     _missing_groups(cls.handlers, cls.layouts, selection))
+
+        return cls._projections[key]
+
+    @classmethod
+    def _decode_regex(cls, sections, plans, errors, sname):
+        """Decode section by matching it against the section and group regex patterns.
+
+        Parameters
+        ----------
+        sections : dict
+            Raw sections of the report
+        plans : dict
+            Group plans of the sections to decode, only the groups in the plan
+            of the section are decoded
+        errors : list
+            List to collect the errors of the handlers, None to raise them
+        sname : str
+            Name of the section to decode
+
+        """
+        stats = _stats.active
+        if stats is not None:
+            t_start = perf_counter()
+            reported = []
+        #split section into its groups and handle (decode) each group
+        pattern, ghandlers = cls.handlers[sname]
+        gnames = {p[0] for p in plans[sname][2]}
+        #TODO
+        #- add try except for matching and collect string when  match is empty
+        gd = pattern.match(sections[sname]).groupdict("")
+
+        section = {}
+        for gname, graw in gd.items():
+            if gname not in gnames:
+                continue
+            gpattern, ghandler = ghandlers[gname]
+            if stats is not None:
+                t = perf_counter()
+                if graw.strip():
+                    reported.append(gname)
+            #if the group can be decoded directly without further regex pattern
+            #handle it directly otherwise match it against a group pattern
+            try:
                 if gpattern is None:
-                    self.decoded[sname][gname] = ghandler(graw)
+                    section[gname] = ghandler(graw)
                 else:
                     group = gpattern.match(graw)
                     #_report_match(ghandler, group.group())
-                    #self.decoded[sname][gname] = ghandler(self, group.groupdict())
-                    self.decoded[sname].update(ghandler(group.groupdict("")))
+                    if group is None and stats is not None:
+                        stats.add_failure(_stats.NO_MATCH)
+                    section.update(ghandler(group.groupdict("")))
+            except HANDLER_ERRORS:
+                if stats is not None:
+                    stats.add_handler(sname, gname, ghandler.__name__, perf_counter() - t, failed=1)
+                    stats.add_failure(INVALID_CODE)
+                if errors is None:
+                    raise
+                errors.append((INVALID_CODE, graw.strip()))
+            else:
+                if stats is not None:
+                    stats.add_handler(sname, gname, ghandler.__name__, perf_counter() - t)
+
+        if stats is not None:
+            stats.add_section(sname, perf_counter() - t_start)
+            cls._count_values(stats, sname, section, reported)
+
+        return section
+
+    @classmethod
+    def _decode_tokens(cls, groups, plans, missing, errors, sname):
+        """Decode section from the groups found by the tokenizer.
+
+        The groups are cut into the variables given by ``layouts`` so the
+        handlers get the same input as from the regex patterns. Missing groups
+        are not decoded, the cached result of the handlers for a section
+        without any groups is used instead.
+
+        Parameters
+        ----------
+        groups : list of str
+            Groups of the report returned by ``tokenize``
+        plans : dict
+            Group plans of the sections to decode (see ``_plan_groups``)
+        missing : dict
+            Result of the handlers for missing groups (see ``_missing_groups``)
+        errors : list
+            List to collect the errors of the handlers, None to raise them
+        sname : str
+            Name of the section to decode
+
+        """
+        stats = _stats.active
+        if stats is not None:
+            t_start = perf_counter()
+            reported = []
+        first, last, plan = plans[sname]
+        #start with all groups missing and decode the groups present in the report
+        section = missing[sname].copy()
+        if any(groups[first:last]):
+            for gname, ghandler, key, fields, slots, memo in plan:
+                code = groups[key]
+                if not code:
+                    continue
+                if stats is not None:
+                    t = perf_counter()
+                    reported.append(gname)
+                if slots is not None:
+                    code = tuple([groups[i] for i in slots])
+                #the handlers only depend on the groups, so their results are kept per group
+                value = memo.get(code, memo)
+                if value is memo:
+                    try:
+                        if type(fields) is tuple:
+                            i, start, stop = fields
+                            value = ghandler(groups[i][start:stop])
+                        else:
+                            value = ghandler({k: groups[i][start:stop] for k, (i, start, stop) in fields.items()})
+                    except HANDLER_ERRORS:
+                        if stats is not None:
+                            stats.add_handler(sname, gname, ghandler.__name__, perf_counter() - t, failed=1)
+                            stats.add_failure(INVALID_CODE)
+                        if errors is None:
+                            raise
+                        errors.append((INVALID_CODE, groups[key]))
+                        continue
+                    if len(memo) < MEMO_SIZE:
+                        memo[code] = value
+                if type(fields) is tuple:
+                    section[gname] = value
+                else:
+                    section.update(value)
+                if stats is not None:
+                    stats.add_handler(sname, gname, ghandler.__name__, perf_counter() - t)
+
+        if stats is not None:
+            stats.add_section(sname, perf_counter() - t_start)
+            cls._count_values(stats, sname, section, reported)
+
+        return section
 
     #format of the handlers is (group_regex_pattern, handler)
     #if group regex pattern is None the group can be directly decoded e.g. a single variable in a group
@@ -320,6 +746,103 @@ class synop(object):
                 "section_9": sec9_handlers
                 }
 
+    #format of the group layouts is {group_name: (slot, start, stop)} for groups decoded directly
+    #or {group_name: {variable: (slot, start, stop)}} for groups which are handed to the handler
+    #as dictionary. slot is the index of the group returned by the tokenizer and start/stop
+    #the part of the group holding the variable.
+    sec0_layout = {"datetime": _layout("s0_datetime", 0, 12),
+                   "MMMM": _layout("s0_MMMM", 0, 4),
+                   "monthdayr": _layout("s0_YYGGi", 0, 2),
+                   "hourr": _layout("s0_YYGGi", 2, 4),
+                   "wind_unit": _layout("s0_YYGGi", 4, 5),
+                   "station_id": _layout("s0_IIiii", 0, 5),
+                   }
+
+    sec1_layout = {"iihVV": {"ir": _layout("s1_iihVV", 0, 1),
+                             "ix": _layout("s1_iihVV", 1, 2),
+                             "h": _layout("s1_iihVV", 2, 3),
+                             "VV": _layout("s1_iihVV", 3, 5)},
+                   "Nddff": {"N": _layout("s1_Nddff", 0, 1),
+                             "dd": _layout("s1_Nddff", 1, 3),
+                             "ff": _layout("s1_Nddff", 3, 5)},
+                   "fff": {"wind_speed": _layout("s1_00fff", 2, 5)},
+                   "t_air": _layout("s1_1sTTT", 1, 5),
+                   "dewp": _layout("s1_2sTTT", 1, 5),
+                   "p_baro": _layout("s1_3PPPP", 1, 5),
+                   "p_slv": _layout("s1_4PPPP", 1, 5),
+                   "appp": {"a": _layout("s1_5appp", 1, 2),
+                            "ppp": _layout("s1_5appp", 2, 5)},
+                   "RRRt": {"RRR": _layout("s1_6RRRt", 1, 4),
+                            "t": _layout("s1_6RRRt", 4, 5)},
+                   "wwWW": {"ww": _layout("s1_7wwWW", 1, 3),
+                            "W1": _layout("s1_7wwWW", 3, 4),
+                            "W2": _layout("s1_7wwWW", 4, 5)},
+                   "NCCC": {"N": _layout("s1_8NCCC", 1, 2),
+                            "CL": _layout("s1_8NCCC", 2, 3),
+                            "CM": _layout("s1_8NCCC", 3, 4),
+                            "CH": _layout("s1_8NCCC", 4, 5)},
+                   "GGgg": {"observation_time": _layout("s1_9GGgg", 1, 5)},
+                   }
+
+    sec2_layout = {"t_water": _layout("s2_0sTTT", 1, 5),
+                   "aPPHH": _layout("s2_1PPHH", 1, 5),
+                   "bPPHH": _layout("s2_2PPHH", 1, 5),
+                   "dddd": _layout("s2_3dddd", 1, 5),
+                   "cPPHH": _layout("s2_4PPHH", 1, 5),
+                   "dPPHH": _layout("s2_5PPHH", 1, 5),
+                   "IEER": _layout("s2_6IEER", 1, 5),
+                   "HHH": _layout("s2_70HHH", 2, 5),
+                   "bsTTT": _layout("s2_8sTTT", 1, 5),
+                   }
+
+    sec3_layout = {"xxxx": _layout("s3_0xxxx", 1, 5),
+                   "t_max": _layout("s3_1sTTT", 1, 5),
+                   "t_min": _layout("s3_2sTTT", 1, 5),
+                   "EsTT": {"E": _layout("s3_3EsTT", 1, 2),
+                            "sTT": _layout("s3_3EsTT", 2, 5)},
+                   "Esss": {"E": _layout("s3_4Esss", 1, 2),
+                            "sss": _layout("s3_4Esss", 2, 5)},
+                   "SSS": dict([("rad_d_hours", _layout("s3_55SSS", 2, 5))]
+                               + [(v, _layout(s, 1, 5)) for v, s in zip(RADIATION_VARIABLES, RADIATION_SLOTS)]),
+                   "SS": dict([("rad_h_hours", _layout("s3_553SS", 3, 5))]
+                              + [(v, _layout(s, 1, 5)) for v, s in zip(RADIATION_H_VARIABLES, RADIATION_H_SLOTS)]),
+                   "RRRt": {"RRR": _layout("s3_6RRRt", 1, 4),
+                            "t": _layout("s3_6RRRt", 4, 5)},
+                   "precip": _layout("s3_7RRRR", 1, 5),
+                   "NChh": {"c{}".format(i): _layout(s, 1, 5) for i, s in enumerate(CLOUD_LAYER_SLOTS, 1)},
+                   "SSss": _layout("s3_9SSss", 1, 5),
+                   }
+
+    layouts = {"section_0": sec0_layout,
+               "section_1": sec1_layout,
+               "section_2": sec2_layout,
+               "section_3": sec3_layout,
+               "section_4": {"any": _layout("s4_any", 0, None)},
+               "section_5": {"any": _layout("s5_any", 0, None)},
+               "section_6": {"any": _layout("s6_any", 0, None)},
+               "section_9": {"any": _layout("s9_any", 0, None)},
+               }
+
+    #result of the handlers for missing groups (section 0 can not be missing)
+    _missing = _missing_groups(handlers, layouts)
+    _plans = _plan_groups(handlers, layouts)
+    _variables = _group_variables(handlers, layouts)
+    #plans and missing groups of the variables passed as vars
+    _projections = {}
+
+    @property
+    def status(self):
+        """Decoding status, "ok" or "partial" if groups could not be decoded.
+
+        Only available if errors are collected. With lazy decoding only the
+        sections decoded so far are taken into account.
+
+        """
+        if self.errors is None:
+            raise AttributeError("Status is only available with errors='collect'")
+
+        return "partial" if self.errors else "ok"
+
     def __str__(self):
         def prettydict(d, indent=0):
             """Print dict (of dict) pretty with indent.
@@ -347,11 +870,19 @@ class synop(object):
         return
 
     def convert_units(self):
-        """Convert units."""
+        """Convert units.
+
+        Wind speeds in knots are converted to m/s. Nothing is converted if the
+        report was decoded with vars without wind speeds.
+
+        """
+        if "section_1" not in self.decoded or "wind_speed" not in self.decoded["section_1"]:
+            return
         #convert units if necessary
         #use unit indicator of section_0
         w_unit = self.decoded["section_0"]["wind_unit"]
         wind_speed = self.decoded["section_1"]["wind_speed"]
+        wind_speed_high = self.decoded["section_1"].get("wind_speed_high")
         knots_to_mps_factor = 0.51444444444444
         if w_unit in ["knots estimate", "knots measured"]:
             wind_speed = wind_speed * knots_to_mps_factor
@@ -365,6 +896,8 @@ class synop(object):
 
         self.decoded["section_0"]["wind_unit"] = new_wind_unit
         self.decoded["section_1"]["wind_speed"] = wind_speed
+        if wind_speed_high is not None:
+            self.decoded["section_1"]["wind_speed_high"] = wind_speed_high * knots_to_mps_factor
 
     def to_dict(self, vars=None):
         """Convert selected variables of report to a pandas dataframe.
@@ -372,7 +905,8 @@ class synop(object):
         Parameters
         ----------
         vars : list of str
-            List of variables to include
+            List of variables to include, default are the variables passed
+            to the constructor
 
         Returns
         -------
@@ -380,14 +914,14 @@ class synop(object):
 
         """
         if vars is None:
-            vars = self.decoded.keys()
+            vars = self.vars if self.vars is not None else self.decoded.keys()
 
         vardict = OrderedDict.fromkeys(vars)
+        wanted = set(vardict)
 
         # self.decoded is dict of dicts with sections as keys
         for i in self.decoded.values():
             if i is not None:
-                tmp = {k:v for k, v in i.items() if k in vars}
-                vardict.update(tmp)
+                vardict.update((k, v) for k, v in i.items() if k in wanted)
 
         return vardict
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Single pass tokenizer for SYNOP reports.
+
+The tokenizer splits a report into its 5 character groups once and assigns
+every group to a fixed slot depending on the current section (switched by the
+``222``, ``333``, ``444``, ``555``, ``666`` and ``999`` markers) and the
+indicator digit of the group. The result is a flat list of raw groups which
+can be handed to the group handlers or collected column wise for batches.
+
+Every token is looked at once with constant work (patterns are only matched
+against single groups) so the time is linear in the length of the report
+even for malformed reports from noisy feeds.
+
+"""
+
+import re
+
+from .lazy import LazyPatterns
+
+
+#slots are named after the section and the symbolic form of the group (see synop.py)
+#repeated groups (radiation groups after 55SSS/553SS, cloud layers 8NChh) get
+#one slot per repetition
+RADIATION_SLOTS = tuple("s3_55SSS_{}".format(j) for j in range(7))
+RADIATION_H_SLOTS = tuple("s3_553SS_{}".format(j) for j in range(7))
+CLOUD_LAYER_SLOTS = tuple("s3_8NChh_{}".format(j) for j in range(1, 5))
+
+SLOTS = (("s0_datetime", "s0_MMMM", "s0_YYGGi", "s0_IIiii",
+          "s1_iihVV", "s1_Nddff", "s1_00fff", "s1_1sTTT", "s1_2sTTT", "s1_3PPPP", "s1_4PPPP",
+          "s1_5appp", "s1_6RRRt", "s1_7wwWW", "s1_8NCCC", "s1_9GGgg",
+          "s2_222Dv", "s2_0sTTT", "s2_1PPHH", "s2_2PPHH", "s2_3dddd", "s2_4PPHH", "s2_5PPHH",
+          "s2_6IEER", "s2_70HHH", "s2_8sTTT",
+          "s3_0xxxx", "s3_1sTTT", "s3_2sTTT", "s3_3EsTT", "s3_4Esss", "s3_55SSS")
+         + RADIATION_SLOTS
+         + ("s3_553SS",)
+         + RADIATION_H_SLOTS
+         + ("s3_6RRRt", "s3_7RRRR")
+         + CLOUD_LAYER_SLOTS
+         + ("s3_9SSss", "s4_any", "s5_any", "s6_any", "s9_any"))
+
+SLOT_INDEX = {name: i for i, name in enumerate(SLOTS)}
+
+#valid form of each group. Groups which do not match are treated as missing.
+GROUP_PATTERNS = {"s0_datetime": r"\d{12}",
+                  "s0_MMMM": r"AAXX|BBXX|OOXX",
+                  "s0_YYGGi": r"\d{5}",
+                  "s0_IIiii": r"\d{5}",
+                  "s1_iihVV": r"\d\d[\d/]\d\d",
+                  "s1_Nddff": r"[\d/]\d{4}",
+                  "s1_00fff": r"00\d{3}",
+                  "s1_1sTTT": r"1[\d/]{4}",
+                  "s1_2sTTT": r"2[\d/]{4}",
+                  "s1_3PPPP": r"3(\d{4}|\d{3}/)",
+                  "s1_4PPPP": r"4(\d{4}|\d{3}/)",
+                  "s1_5appp": r"5\d{4}",
+                  "s1_6RRRt": r"6\d{4}",
+                  "s1_7wwWW": r"7\d{4}",
+                  "s1_8NCCC": r"8\d[\d/]{3}",
+                  "s1_9GGgg": r"9\d{4}",
+                  "s2_222Dv": r"222\d\d",
+                  "s2_0sTTT": r"0[\d/]{4}",
+                  "s2_1PPHH": r"1\d{4}",
+                  "s2_2PPHH": r"2\d{4}",
+                  "s2_3dddd": r"3\d{4}",
+                  "s2_4PPHH": r"4\d{4}",
+                  "s2_5PPHH": r"5\d{4}",
+                  "s2_6IEER": r"6\d{4}",
+                  "s2_70HHH": r"70\d{3}",
+                  "s2_8sTTT": r"8\d{4}",
+                  "s3_0xxxx": r"0\d{4}",
+                  "s3_1sTTT": r"1\d{4}",
+                  "s3_2sTTT": r"2\d{4}",
+                  "s3_3EsTT": r"3\d{4}",
+                  "s3_4Esss": r"4\d{4}",
+                  "s3_55SSS": r"55\d{3}",
+                  "s3_553SS": r"553\d\d",
+                  "s3_6RRRt": r"6\d{4}",
+                  "s3_7RRRR": r"7\d{4}",
+                  "s3_9SSss": r"9\d{4}",
+                  }
+GROUP_PATTERNS.update({s: r"{}\d{{4}}".format(s[-1]) for s in RADIATION_SLOTS + RADIATION_H_SLOTS})
+GROUP_PATTERNS.update({s: r"8\d[\d/]\d\d" for s in CLOUD_LAYER_SLOTS})
+
+_I_70HHH = SLOT_INDEX["s2_70HHH"]
+
+#section markers and the section they open
+SECTION_MARKERS = {"222": 2, "333": 3, "444": 4, "555": 5, "666": 6, "999": 9}
+
+#indicator digit to slot for each section. Negative entries need further checks in the tokenizer.
+_S_ZERO = -1
+_S_TWO = -2
+_S_FIVE = -3
+_S_EIGHT = -4
+_S_NINE = -5
+
+
+def _dispatch(section, pairs):
+    return {c: (SLOT_INDEX["s{}_{}".format(section, g)] if isinstance(g, str) else g) for c, g in pairs}
+
+
+_DISPATCH = {1: _dispatch(1, (("0", _S_ZERO), ("1", "1sTTT"), ("2", _S_TWO), ("3", "3PPPP"),
+                              ("4", "4PPPP"), ("5", "5appp"), ("6", "6RRRt"), ("7", "7wwWW"),
+                              ("8", "8NCCC"), ("9", "9GGgg"))),
+             2: _dispatch(2, (("0", "0sTTT"), ("1", "1PPHH"), ("2", "2PPHH"), ("3", "3dddd"),
+                              ("4", "4PPHH"), ("5", "5PPHH"), ("6", "6IEER"), ("7", "70HHH"),
+                              ("8", "8sTTT"))),
+             3: _dispatch(3, (("0", "0xxxx"), ("1", "1sTTT"), ("2", "2sTTT"), ("3", "3EsTT"),
+                              ("4", "4Esss"), ("5", _S_FIVE), ("6", "6RRRt"), ("7", "7RRRR"),
+                              ("8", _S_EIGHT), ("9", _S_NINE))),
+             4: {}, 5: {}, 6: {}, 9: {}}
+_ANY_SLOT = {4: SLOT_INDEX["s4_any"], 5: SLOT_INDEX["s5_any"], 6: SLOT_INDEX["s6_any"], 9: SLOT_INDEX["s9_any"]}
+
+_I_IIHVV = SLOT_INDEX["s1_iihVV"]
+_I_NDDFF = SLOT_INDEX["s1_Nddff"]
+_I_00FFF = SLOT_INDEX["s1_00fff"]
+_I_222DV = SLOT_INDEX["s2_222Dv"]
+_I_55SSS = SLOT_INDEX["s3_55SSS"]
+_I_553SS = SLOT_INDEX["s3_553SS"]
+_I_9SSSS = SLOT_INDEX["s3_9SSss"]
+_I_RAD = SLOT_INDEX[RADIATION_SLOTS[0]]
+_I_RAD_H = SLOT_INDEX[RADIATION_H_SLOTS[0]]
+_I_NCHH = [SLOT_INDEX[s] for s in CLOUD_LAYER_SLOTS]
+#slots where a group of digits only is valid without checking the pattern
+#(00fff and 70HHH need a second indicator digit)
+_DIGITS_VALID = frozenset(range(len(SLOTS))) - {_I_00FFF, _I_70HHH}
+
+EMPTY = ("",) * len(SLOTS)
+
+
+class _Tables(object):
+    """Markers, dispatch tables, patterns and constants for str or bytes reports."""
+
+    def __init__(self, encode):
+        self.markers = {encode(k): v for k, v in SECTION_MARKERS.items()}
+        self.dispatch = {section: {encode(c): slot for c, slot in d.items()} for section, d in _DISPATCH.items()}
+        self.valid = LazyPatterns({SLOT_INDEX[name]: encode(p) for name, p in GROUP_PATTERNS.items()}, re.ASCII,
+                                  "fullmatch")
+        self.empty = tuple(encode(g) for g in EMPTY)
+        self.sep, self.end, self.s2, self.zero, self.three, self.five, self.six, self.slash = (
+            encode(c) for c in (" ", "=", "222", "0", "3", "5", "6", "/"))
+
+
+#bytes reports (e.g. from memory mapped archives) are tokenized without decoding them to str
+_STR_TABLES = _Tables(str)
+_BYTES_TABLES = _Tables(lambda s: s.encode("ascii"))
+
+#reasons for groups which are not used
+INVALID_GROUP = "invalid_group"
+UNEXPECTED_GROUP = "unexpected_group"
+INVALID_SECTION_0 = "invalid_section_0"
+
+
+class InvalidReport(ValueError):
+    """Report can not be decoded.
+
+    Attributes
+    ----------
+    reason : str
+        Machine readable reason, e.g. "invalid_section_0"
+    group : str
+        Offending group, "" if the group is missing
+
+    """
+
+    def __init__(self, message, reason, group):
+        super().__init__(message)
+        self.reason = reason
+        self.group = group
+
+
+def tokenize(report, errors=None):
+    """Split a SYNOP report into its groups.
+
+    Parameters
+    ----------
+    report : str or bytes
+        Raw SYNOP report starting with the 12 digit timestamp followed by
+        MMMM, YYGGi and IIiii. Groups are separated by any whitespace and the
+        report may be terminated by "=". ASCII bytes are tokenized without
+        decoding them.
+
+    Returns
+    -------
+    list of str or bytes
+        Raw groups ordered as in ``SLOTS`` of the type of the report. Missing
+        or invalid groups are empty.
+        The slots of sections 4, 5, 6 and 9 hold the groups of the section
+        joined by a single space.
+
+    Other Parameters
+    ----------------
+    errors : list
+        If given (reason, group) is appended for each group which is not
+        used because it is invalid (``INVALID_GROUP``) or not expected at its
+        position (``UNEXPECTED_GROUP``).
+
+    Raises
+    ------
+    InvalidReport
+        If section 0 of the report is not valid.
+
+    """
+    t = _BYTES_TABLES if isinstance(report, bytes) else _STR_TABLES
+    valid = t.valid
+    tokens = report.split()
+    if tokens and tokens[-1].endswith(t.end):
+        tokens[-1] = tokens[-1].rstrip(t.end)
+    if len(tokens) < 4 or not (valid[0](tokens[0]) and valid[1](tokens[1])
+                               and valid[2](tokens[2]) and valid[3](tokens[3])):
+        group = next((tok for i, tok in enumerate(tokens[:4]) if not valid[i](tok)), t.empty[0])
+        raise InvalidReport("Invalid section 0 in report: {!r}".format(report[:40]), INVALID_SECTION_0, group)
+
+    groups = list(t.empty)
+    groups[0:4] = tokens[0:4]
+
+    return _tokenize_sections(t, tokens, 4, groups, report.isascii(), errors)
+
+
+def tokenize_block(block, section_0, errors=None):
+    """Split a station block of a bulletin into its groups.
+
+    Parameters
+    ----------
+    block : str or bytes
+        Station block starting with IIiii followed by sections 1-9 as in a
+        bulletin where section 0 is shared by all stations
+    section_0 : tuple of str or bytes
+        Shared timestamp, MMMM and YYGGi of the bulletin (already validated)
+
+    Returns
+    -------
+    list of str or bytes
+        Raw groups ordered as in ``SLOTS`` (see ``tokenize``)
+
+    Other Parameters
+    ----------------
+    errors : list
+        See ``tokenize``
+
+    Raises
+    ------
+    InvalidReport
+        If the station id is not valid.
+
+    """
+    t = _BYTES_TABLES if isinstance(block, bytes) else _STR_TABLES
+    tokens = block.split()
+    if tokens and tokens[-1].endswith(t.end):
+        tokens[-1] = tokens[-1].rstrip(t.end)
+    if not tokens or not t.valid[3](tokens[0]):
+        raise InvalidReport("Invalid station id in block: {!r}".format(block[:40]), INVALID_SECTION_0,
+                            tokens[0] if tokens else t.empty[0])
+
+    groups = list(t.empty)
+    groups[0:3] = section_0
+    groups[3] = tokens[0]
+
+    return _tokenize_sections(t, tokens, 1, groups, block.isascii(), errors)
+
+
+def _tokenize_sections(t, tokens, start, groups, ascii, errors):
+    """Assign the tokens of sections 1-9 starting at tokens[start] to the groups.
+
+    ascii is True if the tokens are ASCII (str.isdigit is also true for non
+    ASCII digits).
+
+    """
+    valid = t.valid
+    section = 1
+    markers = t.markers
+    dispatch = t.dispatch[1]
+    s2, zero, three, five, six, slash = t.s2, t.zero, t.three, t.five, t.six, t.slash
+    #iihVV and Nddff are identified by their position in section 1
+    positional = [_I_NDDFF, _I_IIHVV]
+    #first slot of the current radiation block and last radiation indicator in section 3
+    rad = None
+    rad_last = slash
+    nlayers = 0
+    rest = []
+
+    for tok in tokens[start:]:
+        if len(tok) != 5:
+            marker = markers.get(tok)
+            if marker is not None and marker > section:
+                if rest:
+                    groups[_ANY_SLOT[section]] = t.sep.join(rest)
+                    rest = []
+                section = marker
+                dispatch = t.dispatch[marker]
+                rad = None
+            elif errors is not None:
+                errors.append((UNEXPECTED_GROUP, tok))
+            continue
+
+        #slice instead of index so bytes give bytes and not int
+        c = tok[:1]
+        if rad is not None:
+            #radiation groups follow 55SSS/553SS with increasing indicator 0-6
+            if zero <= c <= six and c > rad_last:
+                rad_last = c
+                slot = rad + int(c)
+                if (ascii and tok.isdigit()) or valid[slot](tok):
+                    groups[slot] = tok
+                elif errors is not None:
+                    errors.append((INVALID_GROUP, tok))
+                continue
+            rad = None
+
+        #the first two groups are iihVV and Nddff even if they start with 222
+        if positional and section == 1:
+            slot = positional.pop()
+            if valid[slot](tok):
+                groups[slot] = tok
+            elif errors is not None:
+                errors.append((INVALID_GROUP, tok))
+            continue
+
+        slot = dispatch.get(c)
+        if slot is None:
+            if section > 3:
+                rest.append(tok)
+            elif errors is not None:
+                errors.append((UNEXPECTED_GROUP, tok))
+            continue
+        if slot < 0:
+            if slot == _S_ZERO:
+                slot = _I_00FFF
+            elif slot == _S_TWO:
+                if tok.startswith(s2):
+                    section = 2
+                    dispatch = t.dispatch[2]
+                    slot = _I_222DV
+                else:
+                    slot = SLOT_INDEX["s1_2sTTT"]
+            elif slot == _S_FIVE:
+                #the first 55 group is taken as 55SSS
+                if tok[1:2] == five and not groups[_I_55SSS]:
+                    slot = _I_55SSS
+                    rad = _I_RAD
+                elif tok[1:3] == five + three and not groups[_I_553SS]:
+                    slot = _I_553SS
+                    rad = _I_RAD_H
+                else:
+                    if errors is not None:
+                        errors.append((UNEXPECTED_GROUP, tok))
+                    continue
+                rad_last = slash
+            elif slot == _S_EIGHT:
+                if nlayers == 4:
+                    if errors is not None:
+                        errors.append((UNEXPECTED_GROUP, tok))
+                    continue
+                slot = _I_NCHH[nlayers]
+                if (ascii and tok.isdigit()) or valid[slot](tok):
+                    groups[slot] = tok
+                    nlayers += 1
+                elif errors is not None:
+                    errors.append((INVALID_GROUP, tok))
+                continue
+            else:
+                #only the first special phenomena group is kept
+                if groups[_I_9SSSS]:
+                    continue
+                slot = _I_9SSSS
+
+        if (ascii and slot in _DIGITS_VALID and tok.isdigit()) or valid[slot](tok):
+            groups[slot] = tok
+        else:
+            if slot == _I_55SSS or slot == _I_553SS:
+                rad = None
+            if errors is not None:
+                errors.append((INVALID_GROUP, tok))
+
+    if rest:
+        groups[_ANY_SLOT[section]] = t.sep.join(rest)
+
+    return groups
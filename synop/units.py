@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Unit conversion of decoded batches.
+
+All columns of a ``SynopBatch`` are converted at once with array operations.
+The wind speeds are converted to m/s using the wind unit indicator (iw of
+YYGGi). Temperatures, pressures and lengths can optionally be converted to
+SI units.
+
+The dew point is not converted to K, the column holds the relative humidity
+in % for sTTT groups with sign 9 and the batch does not keep the sign.
+
+"""
+
+import numpy as np
+
+from .batch import SynopBatch, CODE_TABLES
+
+KNOTS_TO_MPS = 0.51444444444444
+#wind unit codes in knots and the code of the same estimate/measured kind in m/s
+KNOTS_CODES = {"3": "0", "4": "1"}
+WIND_SPEEDS = ("wind_speed", "wind_speed_high")
+
+#optional conversions: {option: {variable: (factor, offset)}}
+CONVERSIONS = {"kelvin": {name: (1.0, 273.15) for name in ("t_air", "t_water", "t_max", "t_min")},
+               "pascal": {name: (100.0, 0.0) for name in ("p_baro", "p_slv", "p_diff")},
+               #cloud heights (c1_height - c4_height) are decoded in m already
+               "meters": {"vis": (1000.0, 0.0), "snow_height": (0.01, 0.0)}}
+#codes which are no values (e.g. snow cover not continuous) and are missing after a conversion
+SPECIAL_CODES = {"snow_height": (997, 998, 999)}
+
+
+def _convert_wind(columns, categories):
+    """Convert the wind speeds in knots to m/s."""
+    unit = columns["wind_unit"]
+    if "wind_unit" in categories:
+        codes = categories["wind_unit"]
+        old = np.array([codes.index(c) for c in KNOTS_CODES], dtype=unit.dtype)
+        new = np.array([codes.index(c) for c in KNOTS_CODES.values()], dtype=unit.dtype)
+    else:
+        table = CODE_TABLES["wind_unit"]
+        old = np.array([table[c] for c in KNOTS_CODES], dtype=object)
+        new = np.array([table[c] for c in KNOTS_CODES.values()], dtype=object)
+
+    converted = unit.copy()
+    knots = np.zeros(len(unit), dtype=bool)
+    for o, n in zip(old, new):
+        selection = unit == o
+        converted[selection] = n
+        knots |= selection
+    columns["wind_unit"] = converted
+
+    for name in WIND_SPEEDS:
+        if name in columns:
+            columns[name] = np.where(knots, columns[name] * KNOTS_TO_MPS, columns[name])
+
+
+def convert_units(batch, kelvin=False, pascal=False, meters=False):
+    """Convert the units of a batch.
+
+    Wind speeds reported in knots are converted to m/s and their wind unit is
+    changed to the m/s code of the same kind (estimate or measured).
+
+    Parameters
+    ----------
+    batch : SynopBatch
+        Decoded reports (compact or not)
+    kelvin : bool
+        Convert temperatures except the dew point from °C to K
+    pascal : bool
+        Convert pressures from hPa to Pa
+    meters : bool
+        Convert visibility from km and snow height from cm to m. The special
+        snow heights 997 - 999 are missing then.
+
+    Returns
+    -------
+    SynopBatch
+        New batch with the converted columns. The other columns are shared
+        with the input batch.
+
+    Raises
+    ------
+    ValueError
+        If the batch has wind speeds but no wind unit
+
+    """
+    columns = dict(batch.columns)
+    if "wind_unit" in columns:
+        _convert_wind(columns, batch.categories)
+    elif any(name in columns for name in WIND_SPEEDS):
+        raise ValueError("Wind speeds can not be converted without the wind_unit column")
+
+    options = {"kelvin": kelvin, "pascal": pascal, "meters": meters}
+    for option, conversions in CONVERSIONS.items():
+        if not options[option]:
+            continue
+        for name, (factor, offset) in conversions.items():
+            if name not in columns:
+                continue
+            col = columns[name]
+            if name in SPECIAL_CODES:
+                col = np.where(np.isin(col, SPECIAL_CODES[name]), np.nan, col)
+            columns[name] = col * factor + offset
+
+    issues = None
+    if batch.status is not None:
+        issues = {"status": batch.status, "reason": batch.reason, "group": batch.group, "rejected": batch.rejected}
+
+    return SynopBatch(columns, batch.valid, batch.categories, issues)
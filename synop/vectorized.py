@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Vectorized decoding handlers.
+
+Array versions of the numeric handlers in ``handlers.py``. The decoders take
+fixed width byte arrays (e.g. an ``S4`` array with the sTTT part of all 1sTTT
+groups of a batch) and return float arrays with NaN for missing or invalid
+values. Empty codes ("") are missing.
+
+"""
+
+import numpy as np
+
+from .handlers import STTT_TABLE, PPPP_TABLE, VIS_TABLE, RRR_TABLE, WIND_DIR_TABLE, CHEIGHT_TABLE
+
+
+_SLASH = ord("/")
+_ZERO = ord("0")
+
+
+def _chars(codes):
+    """View fixed width codes as 2d array of characters.
+
+    Parameters
+    ----------
+    codes : array_like of bytes or str
+        Fixed width codes
+
+    Returns
+    -------
+    numpy.ndarray of uint8
+        Array of shape (n, width)
+
+    """
+    codes = np.asarray(codes)
+    if codes.dtype.kind == "U":
+        codes = codes.astype("S{}".format(codes.dtype.itemsize // 4))
+    elif codes.dtype.kind != "S":
+        raise TypeError("Codes must be a bytes or str array, got {}".format(codes.dtype))
+    codes = np.ascontiguousarray(codes.ravel())
+    width = codes.dtype.itemsize
+
+    return codes.view(np.uint8).reshape(len(codes), width)
+
+
+def _number(chars):
+    """Integer value of digit characters and mask of valid rows.
+
+    Parameters
+    ----------
+    chars : numpy.ndarray of uint8
+        Array of shape (n, width)
+
+    Returns
+    -------
+    value : numpy.ndarray of int64
+    valid : numpy.ndarray of bool
+        True where all characters are digits
+
+    """
+    digits = chars.astype(np.int64) - _ZERO
+    valid = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    value = np.zeros(len(chars), dtype=np.int64)
+    for j in range(chars.shape[1]):
+        value = value * 10 + digits[:, j]
+
+    return value, valid
+
+
+def _lookup(codes, table, ndigits, item=None):
+    """Decode codes by an index into the lookup table of the handler."""
+    chars = _chars(codes)
+    if chars.shape[1] != ndigits:
+        raise ValueError("Codes must have {} characters".format(ndigits))
+    value, valid = _number(chars)
+
+    return np.where(valid, table.array(ndigits, item=item)[np.where(valid, value, 0)], np.nan)
+
+
+def decode_int(codes):
+    """Decode plain integer codes.
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        Integer codes
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Values, NaN if code is not a number
+
+    """
+    value, valid = _number(_chars(codes))
+
+    return np.where(valid, value, np.nan)
+
+
+def decode_okta(codes):
+    """Decode cloud cover (see ``handle_okta``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        Cloud cover in okta (S1)
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Cloud cover in okta, NaN if not observed
+
+    """
+    return decode_int(codes)
+
+
+def decode_sTTT(codes):
+    """Decode temperatures (see ``handle_sTTT``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        Temperatures (S4) with first character defining the sign or
+        type of unit (°C or relative humidity in % for dewpoint)
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Temperature in degree Celsius or relative humidity if sign is 9
+
+    """
+    return _lookup(codes, STTT_TABLE, 4)
+
+
+def decode_PPPP(codes):
+    """Decode pressure (see ``handle_PPPP``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        Pressure codes without thousands in 1/10 Hectopascal (S4, S3 for ppp).
+        If last character of code is "/" pressure is given as full Hectopascal.
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Pressure in Hectopascal
+
+    """
+    chars = _chars(codes)
+    ndigits = chars.shape[1]
+    #codes ending with "/" are looked up by the digits before
+    full_hpa = chars[:, -1] == _SLASH
+    value, valid = _number(chars)
+    value_hpa, valid_hpa = _number(chars[:, :-1])
+    table = PPPP_TABLE.array(ndigits)
+    table_hpa = PPPP_TABLE.array(ndigits - 1, "/")
+
+    pressure = np.where(full_hpa, table_hpa[np.where(valid_hpa, value_hpa, 0)], table[np.where(valid, value, 0)])
+
+    return np.where(np.where(full_hpa, valid_hpa, valid), pressure, np.nan)
+
+
+def decode_vis(codes):
+    """Decode visibility (see ``handle_vis``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        VV part of iihVV group (S2)
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Visibility in km
+
+    """
+    return _lookup(codes, VIS_TABLE, 2)
+
+
+def decode_wind_dir(codes):
+    """Decode wind direction (see ``handle_wind_dir``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        dd part of Nddff group (S2)
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Wind direction in degree, -99 for circular wind or NaN for calm
+
+    """
+    return _lookup(codes, WIND_DIR_TABLE, 2)
+
+
+def decode_RRR(codes):
+    """Decode precipitation amount of 6RRRt group (see ``handle_RRR``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        RRR part of 6RRRt group (S3)
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Precipitation in mm, 0.05 for traces
+
+    """
+    return _lookup(codes, RRR_TABLE, 3)
+
+
+def decode_7RRRR(codes):
+    """Decode 24 hour precipitation of 7RRRR group (see ``handle_7RRRR``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        RRRR part of 7RRRR group (S4)
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Precipitation in 1/10 mm, 999 for traces
+
+    """
+    value, valid = _number(_chars(codes))
+    precip = np.where(value >= 9998, 999, value)
+
+    return np.where(valid, precip, np.nan)
+
+
+def decode_cheight(codes):
+    """Decode height of cloud layers (see ``cheight``).
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        hh part of 8NChh group (S2)
+
+    Returns
+    -------
+    numpy.ndarray of float
+        Cloud height in m. Heights given as classes are decoded as the
+        upper limit of the class.
+
+    """
+    return _lookup(codes, CHEIGHT_TABLE, 2, item=0)
+
+
+def decode_code(codes, table):
+    """Decode codes with a code table.
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        Codes
+    table : dict
+        Code table, e.g. from ``code_descriptions``
+
+    Returns
+    -------
+    numpy.ndarray of object
+        Descriptions, NaN for codes missing in the table
+
+    """
+    codes = np.asarray(codes)
+    unique, inverse = np.unique(codes, return_inverse=True)
+    values = np.empty(len(unique), dtype=object)
+    for i, code in enumerate(unique):
+        if isinstance(code, bytes):
+            code = code.decode("ascii")
+        values[i] = table.get(code, np.nan)
+
+    return values[inverse.ravel()]
+
+
+def category_codes(codes, categories):
+    """Encode codes as index into the categories.
+
+    Parameters
+    ----------
+    codes : array_like of bytes
+        Codes
+    categories : sequence of str
+        Valid codes, e.g. the codes with a description in a code table
+
+    Returns
+    -------
+    numpy.ndarray of int8
+        Index of the code in categories, -1 for codes not in categories
+
+    """
+    codes = np.asarray(codes)
+    index = {code: i for i, code in enumerate(categories)}
+    unique, inverse = np.unique(codes, return_inverse=True)
+    values = np.empty(len(unique), dtype=np.int8)
+    for i, code in enumerate(unique):
+        if isinstance(code, bytes):
+            code = code.decode("ascii")
+        values[i] = index.get(code, -1)
+
+    return values[inverse.ravel()]
+
+
+def decode_datetime(codes):
+    """Decode the timestamp of reports.
+
+    Parameters
+    ----------
+    codes : array_like of bytes or str
+        Timestamps YYYYmmddHHMM (S12)
+
+    Returns
+    -------
+    numpy.ndarray of datetime64[s]
+        Time of the reports, NaT if not valid
+
+    """
+    chars = _chars(codes)
+    if chars.shape[1] != 12:
+        raise ValueError("Codes must have 12 characters")
+    year, valid = _number(chars[:, 0:4])
+    month, valid_month = _number(chars[:, 4:6])
+    day, valid_day = _number(chars[:, 6:8])
+    hour, valid_hour = _number(chars[:, 8:10])
+    minute, valid_minute = _number(chars[:, 10:12])
+    valid &= (valid_month & valid_day & valid_hour & valid_minute
+              & (month >= 1) & (month <= 12) & (day >= 1) & (hour <= 23) & (minute <= 59))
+
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1)
+    #day must be in the month
+    valid &= days < (months + 1).astype("datetime64[D]")
+    time = days.astype("datetime64[s]") + hour * 3600 + minute * 60
+
+    return np.where(valid, time, np.datetime64("NaT"))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test asyncio decoding pipeline."""
+import asyncio
+import numpy as np
+from synop.aio import decode_stream, iter_stream
+
+treport = "201809051400 AAXX 05141 {:05d} 42680 50704 10230 20139 30174 40180 58010 81101="
+
+
+async def _serve(nreports, pause):
+    """Send reports from a local socket and decode them."""
+    async def send(reader, writer):
+        for i in range(nreports):
+            writer.write((treport.format(i) + "\n").encode("ascii"))
+            if i % 100 == 0:
+                await writer.drain()
+                await asyncio.sleep(pause)
+        writer.close()
+
+    server = await asyncio.start_server(send, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        batches = []
+        async for batch in decode_stream(iter_stream(reader), batch_size=50, max_queue=100, max_pending=2,
+                                         compact=True):
+            batches.append(batch)
+        writer.close()
+
+    return batches
+
+
+def test_decode_stream():
+    """Test decoding of reports from a socket."""
+    batches = asyncio.run(_serve(1000, 0.001))
+    assert max(len(b) for b in batches) <= 50
+    stations = np.concatenate([b["station_id"] for b in batches])
+    np.testing.assert_array_equal(stations, ["{:05d}".format(i) for i in range(1000)])
+    assert all(b["t_air"][0] == 23.0 for b in batches)
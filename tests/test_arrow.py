@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test Arrow and Parquet export."""
+import os
+import pytest
+import pyarrow.parquet as pq
+from synop.batch import decode_many
+from synop.arrow import batch_to_table, write_parquet
+
+reports = ["201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101 "
+           "333 55309 22094 30345 81845 85080 91007 90710",
+           "invalid report",
+           "201809061200 AAXX 06121 10384 11460 82820 11012 21034",
+           "201809061200 OOXX 06121 10385 11460 82820 11012 21034"]
+
+
+def test_batch_to_table():
+    """Test conversion of batches to tables."""
+    batch = decode_many(reports, compact=True)
+    table = batch_to_table(batch)
+    assert table.num_rows == 3
+    assert table.column("t_air").to_pylist() == pytest.approx([23.0, -1.2, -1.2])
+    assert table.column("c_nlayers").to_pylist() == [2, 0, 0]
+    assert table.column("cloud_type_low").to_pylist()[0] == batch.describe("cloud_type_low")[0]
+    assert table.column("datetime").to_pylist()[0].hour == 14
+    assert table.schema == batch_to_table(decode_many(reports)).schema
+
+
+def test_write_parquet(tmp_path):
+    """Test writing of partitioned datasets."""
+    assert write_parquet(reports, tmp_path, chunksize=2) == 3
+    assert sorted(os.listdir(tmp_path)) == ["date=2018-09-05", "date=2018-09-06"]
+    assert sorted(os.listdir(tmp_path / "date=2018-09-06")) == ["MMMM=AAXX", "MMMM=OOXX"]
+
+    table = pq.read_table(tmp_path / "date=2018-09-06" / "MMMM=AAXX" / "part-0.parquet")
+    assert table.column("station_id").to_pylist() == ["10384"]
+    assert "MMMM" not in table.column_names
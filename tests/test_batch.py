@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test batch decoding."""
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from synop import batch as batch_module
+from synop.synop import synop
+from synop.batch import decode_many, decode_chunk, SMALL_CHUNK
+
+treport = """201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101
+333 55309 22094 30345 81845 85080 91007 90710"""
+
+
+def test_decode_many():
+    """Test batch decoding against single report decoding."""
+    batch = decode_many([treport, "invalid report", treport], chunksize=2)
+    assert len(batch) == 3
+    np.testing.assert_array_equal(batch.valid, [True, False, True])
+
+    report = synop(treport).decoded
+    for name in ["t_air", "dewp", "p_baro", "p_slv", "wind_speed", "wind_dir", "vis"]:
+        assert batch[name][0] == report["section_1"][name]
+    assert batch["c2_height"][2] == report["section_3"]["c2_height"]
+    assert batch["c_nlayers"][0] == 2
+    assert batch["station_id"][0] == "10224"
+    assert batch["cloud_type_low"][0] == report["section_1"]["cloud_type_low"]
+
+    np.testing.assert_array_equal(batch.mask("t_air"), [True, False, True])
+    assert not batch.mask("precip").any()
+
+
+def test_compact():
+    """Test categorical columns of compact batches."""
+    reports = [treport, "invalid report", treport]
+    batch = decode_many(reports, compact=True)
+    full = decode_many(reports)
+
+    assert batch["current_weather"].dtype == np.int8
+    assert list(batch.codes("cloud_type_low")[[0, 2]]) == ["1", "1"]
+    for name in batch.categories:
+        np.testing.assert_array_equal(batch.mask(name), full.mask(name))
+        np.testing.assert_array_equal(batch.describe(name)[batch.mask(name)], full[name][full.mask(name)])
+
+
+def test_vars():
+    """Test batch decoding of selected variables only."""
+    batch = decode_many([treport, treport], vars=["t_air", "c_nlayers"])
+    assert list(batch.keys()) == ["t_air", "c_nlayers"]
+    assert batch["c_nlayers"][0] == 2
+
+
+def test_status():
+    """Test tagging of reports and quarantine of rejected reports."""
+    reports = [treport, "201809051400 AAXX 05141 10224 42680 50704 1023 20139", "invalid report", treport]
+    quarantine = []
+    batch = decode_many(reports, chunksize=3, quarantine=quarantine)
+    np.testing.assert_array_equal(batch.status, [0, 1, 2, 0])
+    assert list(batch.reason[1:3]) == ["unexpected_group", "invalid_section_0"]
+    assert batch.group[1] == "1023"
+    assert quarantine == [(2, "invalid report", "invalid_section_0", "invalid")]
+    assert batch["dewp"][1] == 13.9
+
+
+def test_small_chunks():
+    """Test small chunks decoded code by code give the same columns as large chunks."""
+    reports = [treport, treport.replace("10230", "1////"), "invalid report", treport.encode("ascii"),
+               treport.replace("10224", "10384").replace("20139", "29085")]
+    for compact in [False, True]:
+        small = decode_chunk(reports, compact=compact)[0]
+        large = decode_chunk(reports * (SMALL_CHUNK // len(reports) + 1), compact=compact)[0]
+        for name, col in small.items():
+            assert col.dtype == large[name].dtype
+            #str also compares NaN in object columns
+            assert [str(v) for v in col] == [str(v) for v in large[name][:len(reports)]]
+
+
+def test_small_chunks_threads(monkeypatch):
+    """Test decoding small chunks in several threads while the decoded codes are dropped."""
+    monkeypatch.setattr(batch_module, "CODE_CACHE_SIZE", 50)
+    monkeypatch.setattr(batch_module, "_CODE_VALUES", {})
+
+    def decode(first):
+        for i in range(first, first + 2000, 20):
+            stations = ["{:05d}".format(j) for j in range(i, i + 20)]
+            columns = decode_chunk([treport.replace("10224", station) for station in stations])[0]
+            assert list(columns["station_id"]) == stations
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(decode, range(0, 80000, 10000)))
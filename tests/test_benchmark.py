@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Decoding benchmarks.
+
+Run with ``pytest -s tests/test_benchmark.py`` to see the timings. The tail
+latency tests are marked ``latency`` and deselected by default as their
+tail is hit by other processes, run them on an otherwise idle machine with
+``pytest -s -m latency tests/test_benchmark.py``.
+
+"""
+import io
+import sys
+import time
+import random
+import asyncio
+import timeit
+import tracemalloc
+import subprocess
+import pytest
+import numpy as np
+from synop.synop import synop
+from synop.record import SynopRecord
+from synop.reader import iter_reports
+from synop.aio import decode_stream
+from synop.batch import decode_many
+
+reports = ["201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101 "
+           "333 55309 22094 30345 81845 85080 91007 90710 ",
+           "201801010000 AAXX 01001 06260 21965 72407 10050 20037 30065 40171 52008 70282 886// "
+           "22200 00111 20301 333 87812 88633 ",
+           "201801011200 OOXX 01124 10010 41/97 83103 00120 11050 21080 39900 49970 58002 "
+           "333 20012 31008 41000 81808 84620 86659 555 10071 20121 ",
+           "201801010600 AAXX 01061 10384 11460 82820 11012 21034 39990 40134 57022 60071 76162 ",
+           ]
+
+
+def _time(func, number=300, repeat=5):
+    """Best time per report in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number / len(reports) * 1e6
+
+
+def _varied(n, seed=0):
+    """n reports of different stations with random temperatures and pressures."""
+    rnd = random.Random(seed)
+    varied = []
+    for i in range(n):
+        tokens = reports[i % len(reports)].split()
+        tokens[3] = "{:05d}".format(rnd.randrange(1000, 100000))
+        for j, tok in enumerate(tokens[4:], 4):
+            if tok[0] in "12" and tok[1:].isdigit():
+                tokens[j] = "{}{}{:03d}".format(tok[0], rnd.randrange(2), rnd.randrange(400))
+            elif tok[0] in "34" and tok[1:].isdigit():
+                tokens[j] = "{}{:04d}".format(tok[0], rnd.randrange(9800, 10400) % 10000)
+        varied.append(" ".join(tokens) + " ")
+
+    return varied
+
+
+def test_engine_speedup():
+    """Benchmark tokenizer engine against the regex engine."""
+    #different groups so the results kept per group are not reused for every report
+    varied = _varied(1000)
+    #alternate the engines so both see the same load of the machine
+    t_regex = t_tokenizer = float("inf")
+    for _ in range(7):
+        t_regex = min(t_regex, timeit.timeit(lambda: [synop(r, engine="regex") for r in varied], number=1))
+        t_tokenizer = min(t_tokenizer, timeit.timeit(lambda: [synop(r) for r in varied], number=1))
+    t_regex, t_tokenizer = t_regex / len(varied) * 1e6, t_tokenizer / len(varied) * 1e6
+    print("\nregex: {:.1f} us/report, tokenizer: {:.1f} us/report, speedup: {:.1f}x".format(
+        t_regex, t_tokenizer, t_regex / t_tokenizer))
+
+    assert t_regex / t_tokenizer > 2.5
+
+
+def _memory(func):
+    """Memory in bytes allocated by func and still in use."""
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return size
+
+
+def test_record_memory():
+    """Benchmark memory of records against synop objects."""
+    #copy reports so the raw strings are not shared with the list above
+    raw = [(r + " ")[:-1] for r in reports] * 250
+    m_synop = _memory(lambda: [synop(r) for r in raw])
+    m_record = _memory(lambda: [SynopRecord.decode(r) for r in raw])
+    print("\nsynop: {:.0f} bytes/report, record: {:.0f} bytes/report, ratio: {:.1f}x".format(
+        m_synop / len(raw), m_record / len(raw), m_synop / m_record))
+
+    assert m_record < m_synop
+
+
+#adversarial inputs with n repetitions of malformed parts
+head = "201809051400 AAXX 05141 10224 42680 50704 "
+adversarial = {"groups": lambda n: head + "10230 " * n,
+               "truncated": lambda n: head + "1023 2013 " * (n // 2),
+               "markers": lambda n: head + "333 " * n,
+               "junk": lambda n: head + "1#$%& \u00fc1234 " * (n // 2),
+               "whitespace": lambda n: head + "10230" + " " * n + "20139",
+               "sections": lambda n: head + "333 55309 22094 30345 81845 85080 91007 9071 " * (n // 7),
+               }
+
+
+def _latency(func, number=10, repeat=3):
+    """Best time of one call in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def test_adversarial():
+    """Benchmark linear time decoding of adversarial reports."""
+    #latency ceiling for a report with 10000 groups in seconds
+    ceiling = 0.1
+    for name, make in adversarial.items():
+        t_small = _latency(lambda: synop(make(1000)))
+        t_large = _latency(lambda: synop(make(10000)))
+        print("\n{}: {:.2f} ms for 1k groups, {:.2f} ms for 10k groups".format(name, t_small * 1e3, t_large * 1e3))
+
+        assert t_large < ceiling
+        #ten times the groups should take about ten times as long
+        assert t_large < 30 * t_small + 1e-3
+
+    lines = {n: "201809051400 AAXX 05141 10224 42680 50704 10230=" * n for n in (1000, 10000)}
+    t_small, t_large = (_latency(lambda: list(iter_reports(io.StringIO(lines[n]))), number=3)
+                        for n in (1000, 10000))
+    assert t_large < 30 * t_small
+
+
+async def _stream_latency(nreports, burst, pause):
+    """Latency of each report from entering the pipeline to its decoded batch."""
+    sent = []
+
+    async def feed():
+        for i in range(nreports):
+            sent.append(time.perf_counter())
+            yield reports[i % len(reports)]
+            if i % burst == burst - 1:
+                await asyncio.sleep(pause)
+
+    latency = []
+    async for batch in decode_stream(feed(), batch_size=burst, latency=0.001):
+        now = time.perf_counter()
+        latency.extend(now - t for t in sent[len(latency):len(latency) + len(batch)])
+
+    return np.array(latency)
+
+
+@pytest.mark.latency
+def test_stream_latency():
+    """Benchmark decode latency of the asyncio pipeline."""
+    #warm up lookup tables and the threads of the executor
+    decode_many(reports)
+    asyncio.run(_stream_latency(500, 50, 0.005))
+    #bursts of bulletins with 50 reports every 5 ms (10000 reports/s), latency of all reports of 5 runs
+    latency = np.concatenate([asyncio.run(_stream_latency(2000, 50, 0.005)) for _ in range(5)])
+    p50, p99 = np.percentile(latency, [50, 99]) * 1e3
+    print("\nstream latency p50: {:.2f} ms, p99: {:.2f} ms".format(p50, p99))
+
+    assert p99 < 5
+
+
+def _import_time(module, repeat=5):
+    """Best cumulative import time of module in a new interpreter in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+                             capture_output=True, text=True, check=True).stderr
+        #the last line is the module itself: "import time: self | cumulative | name"
+        times.append(int(out.strip().splitlines()[-1].split("|")[1]) / 1e3)
+
+    return min(times)
+
+
+def test_import_time():
+    """Benchmark the cold start import of the single report decoder."""
+    t_import = _import_time("synop.synop")
+    print("\nimport synop.synop: {:.1f} ms".format(t_import))
+
+    out = subprocess.run([sys.executable, "-c", "import sys, synop.synop; print(sorted(sys.modules))"],
+                         capture_output=True, text=True, check=True).stdout
+    assert "numpy" not in out and "pkg_resources" not in out
+    assert t_import < 100
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test decoding of GTS bulletins."""
+import io
+from datetime import datetime
+from synop.tokenizer import tokenize
+from synop.batch import STATUS_OK, STATUS_REJECTED
+from synop.bulletin import Bulletin, iter_bulletins, decode_bulletins
+
+bulletins = """ZCZC 123
+SMDL01 EDZW 051400
+AAXX 05141
+10224 42680 50704 10230 20139 30174 40180 58010 81101
+      333 55309 22094 30345 81845 85080 91007 90710=
+10384 11460 82820 11012=
+10385 NIL=
+NNNN
+ZCZC 124
+SMDL02 EDZW 051400 CCA
+AAXX 05141 1038X 11460 82820 11012=
+10386 11460 82820 11052=
+NNNN
+ZCZC 125
+SIDL01 EDZW 051400
+BBXX
+NNNN
+"""
+
+
+def test_bulletin():
+    """Test parsing the envelope of a bulletin."""
+    b = Bulletin.parse(bulletins.split("NNNN")[0], reference=datetime(2018, 9, 20))
+    assert (b.heading, b.centre, b.time, b.bbb) == ("SMDL01", "EDZW", "051400", "")
+    assert b.section_0 == ("201809051400", "AAXX", "05141")
+    assert len(b) == 2
+
+    #station blocks decode like complete reports
+    report = "201809051400 AAXX 05141 " + b.blocks[0]
+    assert next(b.tokenize()) == tokenize(report)
+
+    assert Bulletin.parse(bulletins.split("NNNN")[0], reference=datetime(2018, 10, 1)).datetime == "201809051400"
+    assert Bulletin.parse(bulletins.split("NNNN")[0], reference=datetime(2019, 1, 3)).datetime == "201812051400"
+
+
+def test_decode_bulletins():
+    """Test decoding bulletins of a file."""
+    parsed = list(iter_bulletins(io.StringIO(bulletins), reference=datetime(2018, 9, 20)))
+    assert [b.heading for b in parsed] == ["SMDL01", "SMDL02"]
+
+    batch = decode_bulletins(parsed, chunksize=2, status=True)
+    assert len(batch) == 4
+    assert list(batch["station_id"]) == ["10224", "10384", "", "10386"]
+    assert batch["t_air"][0] == 23.0
+    assert batch["t_air"][3] == -5.2
+    assert list(batch["bulletin_heading"]) == ["SMDL01", "SMDL01", "SMDL02", "SMDL02"]
+    assert list(batch["bulletin_bbb"]) == ["", "", "CCA", "CCA"]
+    assert list(batch.status) == [STATUS_OK, STATUS_OK, STATUS_REJECTED, STATUS_OK]
+
+    df = batch.to_dataframe()
+    assert list(df["bulletin_centre"]) == ["EDZW"] * 3
+    assert len(decode_bulletins([])["bulletin_heading"]) == 0
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the cache of decoded files."""
+import os
+import time
+import pytest
+import numpy as np
+from unittest import mock
+from synop import cache as cache_module
+from synop.cache import DecodedCache
+from synop.reader import decode_file
+
+archive = """201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101
+333 55309 22094 30345 81845 85080 91007 90710=
+201809051400 AAXX 05141 10384 11460 82820 11012=
+invalid report=
+"""
+
+
+def test_cache(tmp_path):
+    """Test storing, loading and invalidation of entries."""
+    path = tmp_path / "synop.txt"
+    path.write_text(archive)
+    cache = DecodedCache(tmp_path / "cache")
+    assert cache.get(path) is None
+
+    batch = cache.decode(path)
+    assert isinstance(batch["t_air"], np.memmap)
+    expected = decode_file(path, compact=True)
+    for name in expected.keys():
+        np.testing.assert_array_equal(batch[name], expected[name])
+    assert batch.categories == expected.categories
+    assert batch.describe("MMMM")[0] == expected.describe("MMMM")[0]
+
+    assert cache.get(path) is not None
+    assert cache.get(path, vars=["t_air"]) is None
+    assert list(cache.decode(path, vars=["t_air"]).keys()) == ["t_air"]
+    assert len(cache.entries()) == 2
+
+    #a changed file gets a new entry
+    path.write_text(archive.replace("10230", "10240"))
+    assert cache.get(path) is None
+    assert cache.decode(path)["t_air"][0] == 24.0
+
+
+def test_evict(tmp_path):
+    """Test eviction by size and age."""
+    paths = []
+    for i in range(3):
+        path = tmp_path / "synop{}.txt".format(i)
+        path.write_text(archive.replace("10224", "1022{}".format(i)))
+        paths.append(path)
+
+    cache = DecodedCache(tmp_path / "cache")
+    now = time.time()
+    for path, used in zip(paths, [now - 10, now - 30, now - 20]):
+        cache.decode(path)
+        os.utime(os.path.join(cache.root, cache.key(path), "manifest.json"), (used, used))
+    sizes = [size for key, size, last_used in cache.entries()]
+
+    cache.max_size = sum(sizes) - 1
+    assert cache.evict() == [cache.key(paths[1])]
+    assert cache.get(paths[1]) is None
+
+    cache.max_age = 60
+    os.utime(os.path.join(cache.root, cache.key(paths[2]), "manifest.json"), (0, time.time() - 120))
+    assert cache.evict() == [cache.key(paths[2])]
+    assert [key for key, size, last_used in cache.entries()] == [cache.key(paths[0])]
+
+
+def test_key(tmp_path):
+    """Test the key does not depend on the package version and options changing the batch are refused."""
+    path = tmp_path / "synop.txt"
+    path.write_text(archive)
+    cache = DecodedCache(tmp_path / "cache")
+    key = cache.key(path)
+    with mock.patch.object(cache_module, "DECODER_VERSION", cache_module.DECODER_VERSION + 1):
+        assert cache.key(path) != key
+
+    with pytest.raises(TypeError):
+        cache.decode(path, status=True)
+    with pytest.raises(TypeError):
+        cache.decode(path, where=lambda report: False)
+    assert cache.entries() == []
+    assert len(cache.decode(path, chunksize=1)) == len(decode_file(path))
+
+
+def test_file_hash(tmp_path):
+    """Test the content of unchanged files is hashed once."""
+    path = tmp_path / "synop.txt"
+    path.write_text(archive)
+    with mock.patch.object(cache_module, "file_hash", wraps=cache_module.file_hash) as file_hash:
+        cache = DecodedCache(tmp_path / "cache")
+        key = cache.key(path)
+        assert cache.get(path) is None
+        cache.decode(path)
+        assert DecodedCache(tmp_path / "cache").get(path) is not None
+        assert file_hash.call_count == 1
+
+        path.write_text(archive.replace("10230", "10240"))
+        assert cache.key(path) != key
+        assert file_hash.call_count == 2
+
+    #hashes not used for max_age are removed
+    cache.max_age = 60
+    for entry in os.scandir(os.path.join(cache.root, ".hashes")):
+        os.utime(entry.path, (0, time.time() - 120))
+    cache.evict()
+    assert os.listdir(os.path.join(cache.root, ".hashes")) == []
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the command line decoder."""
+import io
+import json
+import sys
+import pytest
+import numpy as np
+import pandas as pd
+from synop.cli import main
+
+archive = """201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101=
+201809051400 AAXX 05141 10384 11460 82820 11012=
+201809051400 AAXX 0514X 10385=
+201809051500 AAXX 05151 10224 42680 50704 10250 20139=
+"""
+
+
+def test_cli(tmp_path, capsys):
+    """Test the output formats and filters."""
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(archive)
+
+    assert main([str(tmp_path / "*.txt"), "-o", str(tmp_path / "out.csv"), "--vars", "station_id,t_air"]) == 0
+    df = pd.read_csv(tmp_path / "out.csv", dtype={"station_id": str})
+    assert list(df.columns) == ["station_id", "t_air"]
+    assert list(df["t_air"]) == pytest.approx([23.0, -1.2, 25.0] * 2)
+    assert "8 reports decoded, 2 rejected" in capsys.readouterr().err
+
+    main([str(tmp_path / "a.txt"), "-f", "ndjson", "--stations", "10224", "--start", "2018090515", "-q"])
+    captured = capsys.readouterr()
+    rows = [json.loads(line) for line in captured.out.splitlines()]
+    assert len(rows) == 1 and rows[0]["t_air"] == 25.0
+    assert captured.err == ""
+
+    main([str(tmp_path / "a.txt"), "-o", str(tmp_path / "parquet"), "-f", "parquet", "-j", "2", "--chunksize", "1"])
+    assert len(pd.read_parquet(tmp_path / "parquet")) == 3
+
+    main([str(tmp_path / "a.txt"), "-o", str(tmp_path / "npy"), "-f", "npy"])
+    np.testing.assert_allclose(np.load(tmp_path / "npy" / "t_air.npy"), [23.0, -1.2, 25.0])
+
+    assert main([str(tmp_path / "missing*.txt")]) == 1
+
+
+def test_cli_stdin(monkeypatch, capsys):
+    """Test reading stdin and counting rejected reports."""
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(archive.encode("ascii"))))
+    main(["--vars", "station_id"])
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == ["station_id", "10224", "10384", "10224"]
+    assert "4 reports decoded, 1 rejected" in captured.err
+
+
+def test_cli_partitions(tmp_path, capsys):
+    """Test the variables of the partition keys are decoded and the npy output of several batches."""
+    (tmp_path / "a.txt").write_text(archive)
+    out = tmp_path / "parquet"
+    assert main([str(tmp_path / "a.txt"), "-o", str(out), "-f", "parquet", "--partition-by", "date,MMMM",
+                 "--vars", "t_air", "-q"]) == 0
+    df = pd.read_parquet(out / "date=2018-09-05" / "MMMM=AAXX")
+    assert list(df["t_air"]) == pytest.approx([23.0, -1.2, 25.0])
+
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "a.txt"), "-o", str(out), "-f", "parquet", "--partition-by", "day"])
+    assert "unknown partition keys: day" in capsys.readouterr().err
+
+    main([str(tmp_path / "a.txt"), "-o", str(tmp_path / "npy"), "-f", "npy", "--chunksize", "1", "-q"])
+    np.testing.assert_allclose(np.load(tmp_path / "npy" / "t_air.npy"), [23.0, -1.2, 25.0])
+    np.testing.assert_array_equal(np.load(tmp_path / "npy" / "station_id.npy"), ["10224", "10384", "10224"])
+    assert list((tmp_path / "npy").glob("*.part")) == []
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test deduplication of reports."""
+import io
+import sys
+import subprocess
+import pytest
+from datetime import datetime, timedelta
+from synop.batch import decode_many
+from synop.bulletin import iter_bulletins, decode_bulletins
+from synop.dedup import Deduplicator, resolve, correction_rank, _digest, NEW, DUPLICATE, CORRECTION, STALE
+
+report = "201809051400 AAXX 05141 10224 42680 50704 10230 20139"
+corrected = "201809051400 AAXX 05141 10224 42680 50704 10240 20139"
+
+
+def test_deduplicator():
+    """Test duplicates, corrections and eviction."""
+    dedup = Deduplicator(window=timedelta(hours=6))
+    assert dedup.add(report) == NEW
+    assert dedup.add(report.replace(" 10224", "\n10224") + "=") == DUPLICATE
+    assert dedup.add(corrected, "CCA") == CORRECTION
+    assert dedup.add(report, "RRA") == DUPLICATE
+    assert dedup.add(report.replace("20139", "20138"), "RRA") == STALE
+    assert dedup.add(report.encode("ascii")) == DUPLICATE
+    assert dedup.add("invalid") == NEW
+    assert dedup.counts == {NEW: 2, DUPLICATE: 3, CORRECTION: 1, STALE: 1}
+    assert correction_rank("CCB") == 2 and correction_rank("RRA") == 0
+
+    #reports older than the window are forgotten
+    assert dedup.add(report.replace("201809051400", "201809052100")) == NEW
+    assert len(dedup) == 1
+    assert dedup.add(report) == NEW
+
+    #digests do not depend on the process (str hashes are salted)
+    script = "from synop.dedup import _digest; print(_digest({!r}.split()).hex())".format(report)
+    digests = {subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+               for i in range(2)}
+    assert digests == {_digest(report.split()).hex() + "\n"}
+
+    dedup = Deduplicator()
+    batch = decode_many([report, report, corrected, report], where=dedup)
+    assert list(batch["t_air"]) == [23.0, 24.0]
+
+
+def test_resolve():
+    """Test resolving the latest version of reports."""
+    later = report.replace("201809051400", "201809061500")
+    resolved = list(resolve([(report, ""), (corrected, "CCB"), ("invalid", ""), (report, "CCA"), later, later],
+                            window=timedelta(hours=12)))
+    assert resolved == ["invalid", corrected, later]
+
+
+def test_bulletins():
+    """Test skipping duplicated and stale station blocks of bulletins."""
+    bulletin = "SMDL01 EDZW 051400{}\nAAXX 05141\n10224 42680 50704 {} 20139=\n10384 11460 82820 11012=\nNNNN\n"
+    text = bulletin.format("", "10230") + bulletin.format(" CCA", "10240") + bulletin.format(" RRA", "10230")
+    bulletins = list(iter_bulletins(io.StringIO(text), reference=datetime(2018, 9, 20)))
+
+    batch = decode_bulletins(bulletins, dedup=Deduplicator())
+    assert list(batch["station_id"]) == ["10224", "10384", "10224"]
+    assert list(batch["t_air"]) == pytest.approx([23.0, -1.2, 24.0])
+    assert list(batch["bulletin_bbb"]) == ["", "", "CCA"]
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test filtering of reports by section 0."""
+from datetime import datetime
+from synop.filters import ReportFilter
+from synop.batch import decode_many
+
+reports = ["201809051400 AAXX 05141 10224 42680 50704 10230 20139",
+           "201809051200 AAXX 05121 10384 11460 82820 11012",
+           "201809061200 BBXX 06121 10385 11460 82820 11012 21034",
+           "invalid"]
+
+
+def test_filter():
+    """Test selection of reports."""
+    assert list(ReportFilter().filter(reports)) == reports[:3]
+    assert list(ReportFilter(stations=[10224, "10385"]).filter(reports)) == [reports[0], reports[2]]
+    assert list(ReportFilter(start="20180906").filter(reports)) == [reports[2]]
+    assert list(ReportFilter(end=datetime(2018, 9, 5, 14)).filter(reports)) == [reports[1]]
+    assert list(ReportFilter(types=["AAXX"], hours=[12]).filter(reports)) == [reports[1]]
+
+    batch = decode_many(reports, where=ReportFilter(stations=["10384"]))
+    assert list(batch["station_id"]) == ["10384"]
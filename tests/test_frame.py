@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test DataFrames of decoded reports."""
+import pandas as pd
+from synop.batch import decode_many
+from synop.frame import to_dataframe, schema
+
+treport = """201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101
+333 55309 22094 30345 81845 85080 91007 90710"""
+
+
+def test_to_dataframe():
+    """Test schema of the DataFrame is the same for every batch."""
+    df = to_dataframe([treport, "invalid report", treport])
+    empty = to_dataframe(["201809051400 AAXX 05141 10384 /////"], float_dtype="float32")
+    assert len(df) == 2
+    assert list(df.columns) == list(empty.columns) == list(schema())
+    assert df["datetime"][0] == pd.Timestamp("2018-09-05 14:00")
+    assert df["t_air"].dtype == "float64" and empty["t_air"].dtype == "float32"
+    assert df["c_nlayers"].dtype == "Int8" and df["c_nlayers"][0] == 2
+    assert df["cloud_type_low"].dtype == empty["cloud_type_low"].dtype
+    assert empty["cloud_type_low"].isna().all()
+
+    expected = decode_many([treport]).to_dataframe()
+    pd.testing.assert_frame_equal(df.iloc[:1], expected)
@@ -5,7 +5,7 @@
 
 #import pytest
 import numpy as np
-from synop.handlers import handle_sTTT
+from synop.handlers import handle_sTTT, handle_PPPP, PPPP_TABLE, _decode_PPPP
 
 
 def test_sTTT():
@@ -25,3 +25,11 @@ def test_sTTT():
     code = "1154"
     res = handle_sTTT(code)
     assert res == -15.4
+
+
+def test_lookup_table():
+    """Test lookup table gives the same values as the decoding function."""
+    for code in ["0123", "9987", "012/", "987", "", None]:
+        assert str(handle_PPPP(code)) == str(_decode_PPPP(code))
+    assert len(PPPP_TABLE) == 10 ** 4 + 2 * 10 ** 3
+    assert PPPP_TABLE.array(3, "/")[12] == handle_PPPP("012/")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the station and time index."""
+from datetime import datetime
+import pytest
+import numpy as np
+from synop.index import ArchiveIndex, FileChangedError
+from synop.cache import DecodedCache
+
+archive = """ZCZC 123
+SMDL01 EDZW 051400
+201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101=
+201809051500 AAXX 05151 10384 11460 82820 11012=
+201809051500 AAXX 05151 10224 42680 50704 10250 20139=
+invalid report=
+NNNN
+"""
+
+archive_2 = """201809061400 AAXX 06141 10224 42680 50704 10260 20139=
+"""
+
+
+def test_index(tmp_path):
+    """Test queries and incremental updates."""
+    path = tmp_path / "synop.txt"
+    path.write_text(archive)
+    index = ArchiveIndex()
+    assert index.add(path) == 3
+    assert index.add(path) == 0
+
+    assert len(index.query(10224)) == 2
+    assert len(index.query("10224", start="2018090515")) == 1
+    assert len(index.query(start=datetime(2018, 9, 5, 15))) == 2
+    assert [r.split()[3] for r in index.iter_reports(end="2018090515")] == [b"10224"]
+
+    batch = index.decode("10224")
+    np.testing.assert_array_equal(batch["t_air"], [23.0, 25.0])
+
+    #new and changed files
+    path_2 = tmp_path / "synop_2.txt"
+    path_2.write_text(archive_2)
+    assert index.update([path, path_2]) == 1
+    path.write_text(archive.replace("10384", "10385"))
+    assert index.add(path) == 3
+    assert len(index) == 4
+    assert len(index.query("10384")) == 0
+
+    cache = DecodedCache(tmp_path / "cache")
+    batch = index.decode("10224", start="201809", cache=cache)
+    np.testing.assert_array_equal(batch["t_air"], [23.0, 25.0, 26.0])
+    np.testing.assert_array_equal(batch["t_air"], index.decode("10224", start="201809")["t_air"])
+
+    index.save(tmp_path / "index.npz")
+    loaded = ArchiveIndex.load(tmp_path / "index.npz")
+    assert loaded.paths == index.paths
+    assert loaded.add(path_2) == 0
+    np.testing.assert_array_equal(loaded.query(10224), index.query(10224))
+
+
+def test_checks(tmp_path):
+    """Test changed files and options which can not be used with a cache are refused."""
+    path = tmp_path / "synop.txt"
+    path.write_text(archive)
+    index = ArchiveIndex()
+    index.add(path)
+    cache = DecodedCache(tmp_path / "cache")
+
+    with pytest.raises(TypeError):
+        index.decode("10224", cache=cache, where=lambda report: True)
+    with pytest.raises(TypeError):
+        index.decode("10224", cache=cache, compact=False)
+    batch = index.decode("10224", cache=cache, compact=True, vars=["t_air"])
+    np.testing.assert_array_equal(batch["t_air"], [23.0, 25.0])
+
+    path.write_text(archive.replace("10230", "10240"))
+    with pytest.raises(FileChangedError):
+        list(index.iter_reports("10224"))
+    with pytest.raises(FileChangedError):
+        index.decode("10224", cache=cache)
+    index.add(path)
+    np.testing.assert_array_equal(index.decode("10224", cache=cache)["t_air"], [24.0, 25.0])
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test parallel decoding."""
+import numpy as np
+from synop.batch import decode_many
+from synop.parallel import iter_decode
+
+treport = """201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101
+333 55309 22094 30345 81845 85080 91007 90710"""
+
+reports = [treport.replace("10230", "1{:04d}".format(i)) for i in range(50)] + ["invalid"]
+
+
+def test_parallel():
+    """Test parallel decoding gives the same result as serial decoding."""
+    expected = decode_many(reports)
+    batch = decode_many(reports, chunksize=7, max_workers=2)
+    assert len(batch) == len(reports)
+    np.testing.assert_array_equal(batch["t_air"], expected["t_air"])
+    np.testing.assert_array_equal(batch.valid, expected.valid)
+
+
+def test_unordered():
+    """Test unordered parallel decoding."""
+    t_air = np.full(len(reports), -999.0)
+    for offset, batch in iter_decode(reports, chunksize=5, max_workers=2, ordered=False):
+        t_air[offset:offset + len(batch)] = batch["t_air"]
+    np.testing.assert_array_equal(t_air, decode_many(reports)["t_air"])
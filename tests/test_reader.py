@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test reading reports from files."""
+import io
+import gzip
+from synop.reader import iter_reports, iter_mapped_reports, decode_file
+from synop.filters import ReportFilter
+from synop.batch import STATUS_OK
+
+archive = """ZCZC 123
+SMDL01 EDZW 051400
+
+201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101
+333 55309 22094 30345 81845 85080 91007 90710=
+201809051400 AAXX 05141 10384 11460 82820 11012=201809051400 AAXX 05141 10385 11460 82820
+  11012 21034=
+NNNN
+201809051400 AAXX 05141 10386 11460 82820
+201809051400 AAXX 05141 10387 11460 82820
+"""
+
+
+def test_iter_reports():
+    """Test splitting of file into reports."""
+    reports = list(iter_reports(io.StringIO(archive)))
+    assert len(reports) == 5
+    assert reports[0].startswith("201809051400 AAXX 05141 10224 42680")
+    assert reports[0].endswith("81101 333 55309 22094 30345 81845 85080 91007 90710")
+    assert reports[1] == "201809051400 AAXX 05141 10384 11460 82820 11012"
+    assert reports[2] == "201809051400 AAXX 05141 10385 11460 82820 11012 21034"
+    assert reports[4] == "201809051400 AAXX 05141 10387 11460 82820"
+
+
+def test_iter_reports_file(tmp_path):
+    """Test reading reports from (compressed) files."""
+    path = tmp_path / "synop.txt.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(archive)
+
+    decoded = list(iter_reports(path, decode=True))
+    assert [s.decoded["section_0"]["station_id"] for s in decoded] == ["10224", "10384", "10385", "10386", "10387"]
+    assert decoded[0].decoded["section_1"]["t_air"] == 23.0
+
+    raw = list(iter_reports(io.BytesIO(archive.encode("ascii"))))
+    assert len(raw) == 5
+
+
+def test_iter_mapped_reports(tmp_path):
+    """Test splitting and decoding memory mapped files."""
+    path = tmp_path / "synop.txt"
+    path.write_text(archive + "junk 201809051400 AAXX 05141 10388 11460\n")
+
+    reports = list(iter_mapped_reports(path))
+    assert all(isinstance(r, bytes) for r in reports)
+    assert [b" ".join(r.split()).decode() for r in reports] == list(iter_reports(path))
+
+    batch = decode_file(path, where=ReportFilter(stations=["10224", "10385"]), status=True)
+    assert list(batch["station_id"]) == ["10224", "10385"]
+    assert batch["t_air"][0] == 23.0
+    assert list(batch.status) == [STATUS_OK, STATUS_OK]
+
+    (tmp_path / "empty.txt").write_text("")
+    assert list(iter_mapped_reports(tmp_path / "empty.txt")) == []
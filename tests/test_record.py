@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test compact records of decoded reports."""
+import numpy as np
+from synop.synop import synop
+from synop.record import SynopRecord
+
+treport = """201809051400 AAXX 05143 10224 42680 50704 10230 20139 30174 40180 58010 81101
+333 55309 22094 30345 81845 85080 91007 90710"""
+
+
+def test_record():
+    """Test record gives the same values as the synop object."""
+    report = synop(treport)
+    record = SynopRecord.from_synop(report)
+    assert record.to_dict() == report.to_dict()
+
+    vars = ["station_id", "wind_speed", "t_air", "c2_height", "rad_d_hours", "precip", "unknown"]
+    expected = report.to_dict(vars)
+    for k, v in record.to_dict(vars).items():
+        assert v == expected[k] or (np.isnan(v) and np.isnan(expected[k]))
+    assert record.section("section_3")["c2_height"] == report.decoded["section_3"]["c2_height"]
+    assert list(record.decoded) == list(report.decoded)
+
+    report.convert_units()
+    record.convert_units()
+    assert record["wind_speed"] == report.decoded["section_1"]["wind_speed"]
+    assert record["wind_unit"] == report.decoded["section_0"]["wind_unit"]
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test instrumentation of the decoders."""
+import json
+import pytest
+from synop import stats
+from synop.batch import decode_chunk
+from synop.stats import DecoderStats
+from synop.synop import synop
+from synop.tokenizer import InvalidReport, INVALID_GROUP, INVALID_SECTION_0
+
+report = "201809051200 AAXX 05121 10224 42680 50704 1//// 20139 30174 40180 58010 333 55300 20980 81633 83650"
+
+
+def test_synop_stats():
+    """Test counters of the single report decoder."""
+    with DecoderStats() as s:
+        assert stats.active is s
+        synop(report)
+        synop(report.replace("20139", "2013x"))
+        with pytest.raises(InvalidReport):
+            synop("invalid")
+    assert stats.active is None
+
+    assert (s.reports, s.rejected, s.tokenizer[0]) == (3, 1, 3)
+    assert s.failures == {INVALID_GROUP: 1, INVALID_SECTION_0: 1}
+    assert s.sections["section_3"][0] == 2
+    assert s.handlers[("section_3", "NChh", "handle_8NChh")][0] == 2
+    assert s.handlers[("section_1", "dewp", "handle_sTTT")][0] == 1
+    #temperature reported as "////", no section 2
+    assert s.nan[("section_1", "t_air")] == 2
+    assert s.missing[("section_2", "t_water")] == 2
+    assert s.seconds > 0 and s.rate > 0
+
+    #nothing is counted if not active
+    synop(report)
+    assert s.reports == 3
+
+
+def test_batch_stats():
+    """Test counters of the batch decoder and the export."""
+    with DecoderStats() as s:
+        decode_chunk([report, report.replace("20139", "2013x"), "invalid"], compact=True)
+
+    assert (s.reports, s.rejected, s.tokenizer[0]) == (3, 1, 3)
+    assert s.failures == {INVALID_GROUP: 1, INVALID_SECTION_0: 1}
+    assert s.handlers[("section_1", "dewp", "decode_sTTT")][0] == 3
+    assert s.nan[("section_1", "t_air")] == 2
+    assert s.missing[("section_1", "dewp")] == 1
+    assert ("section_1", "t_air") not in s.missing
+
+    data = json.loads(s.to_json())
+    assert data["reports"] == 3
+    assert data["handlers"][0]["seconds"] >= data["handlers"][-1]["seconds"]
+    text = s.to_prometheus()
+    assert "synop_reports_total 3\n" in text
+    assert 'synop_failures_total{reason="invalid_group"} 1\n' in text
+    assert 'synop_handler_calls_total{section="section_1",group="dewp",handler="decode_sTTT"} 3\n' in text
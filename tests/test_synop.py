@@ -3,14 +3,136 @@
 
 """Test synop report decoding."""
 #import pytest
+import random
+import numpy as np
 from synop.synop import synop
 
 treport = """201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101
 333 55309 22094 30345 81845 85080 91007 90710"""
 
+reports = [treport,
+           "201801010000 AAXX 01001 06260 21965 72407 10050 20037 30065 40171 52008 70282 886// "
+           "22200 00111 20301 333 87812 88633",
+           "201801011200 OOXX 01124 10010 41/97 83103 00120 11050 21080 39900 49970 58002 "
+           "333 20012 31008 41000 81808 84620 86659 555 10071 20121",
+           ]
+
 
 def test_class():
     """Test synop decoding."""
     report = synop(treport)
     print(report.to_dict())
     #print(report)
+
+
+def _digits(rng, n):
+    return "".join(rng.choice("0123456789") for _ in range(n))
+
+
+def _random_report(rng):
+    """Random land station report with sections 1 and 3.
+
+    Nddff often starts with 222. Section 1 has at most 9 groups, the most the
+    regex engine takes.
+
+    """
+    groups = [rng.choice("134") + rng.choice("1234") + rng.choice("0123456789/") + _digits(rng, 2),
+              rng.choice(["222", _digits(rng, 3)]) + _digits(rng, 2)]
+    for first in "12345678":
+        if rng.random() < 0.6 and len(groups) < 9:
+            groups.append(first + (rng.choice("019") + _digits(rng, 3) if first in "12" else _digits(rng, 4)))
+    if rng.random() < 0.5:
+        groups.append("333")
+        for first in "128":
+            if rng.random() < 0.6:
+                groups.append(first + (rng.choice("01") + _digits(rng, 3) if first in "12" else _digits(rng, 4)))
+
+    return "201809051400 AAXX 0514{} {} {}".format(rng.choice("0134"), _digits(rng, 5), " ".join(groups))
+
+
+def test_engines():
+    """Test tokenizer and regex engine give the same decoded report."""
+    rng = random.Random(0)
+    for raw in reports + [_random_report(rng) for i in range(1000)]:
+        #the regex engine needs whitespace after the last group and keeps it in raw values
+        expected = synop(raw + " ", engine="regex").decoded
+        decoded = synop(raw).decoded
+        assert list(decoded) == list(expected)
+        for sname, section in expected.items():
+            assert sorted(decoded[sname]) == sorted(section)
+            for k, v in section.items():
+                if isinstance(v, str):
+                    assert decoded[sname][k] == v.strip()
+                elif isinstance(v, float) and np.isnan(v):
+                    assert np.isnan(decoded[sname][k])
+                else:
+                    assert decoded[sname][k] == v
+
+
+def test_positional():
+    """Test Nddff starting with 222 is not taken as section 2."""
+    decoded = synop("201809051400 AAXX 05141 10224 42980 22205 10230 20139").decoded["section_1"]
+    assert (decoded["cloud_cover_tot"], decoded["wind_dir"], decoded["wind_speed"]) == (2, 219, 5)
+    assert (decoded["t_air"], decoded["dewp"]) == (23.0, 13.9)
+
+
+def test_bytes():
+    """Test bytes reports are decoded like str reports."""
+    for engine in ["tokenizer", "regex"]:
+        report = synop(treport.encode("ascii") + b" ", engine=engine)
+        assert report.raw == treport + " "
+        assert str(report.to_dict()) == str(synop(treport + " ", engine=engine).to_dict())
+
+
+def test_memo():
+    """Test results kept per group do not change later reports."""
+    first = synop(treport)
+    first.decoded["section_3"]["rad_d_global"] = None
+    first.decoded["section_1"]["t_air"] = None
+    second = synop(treport)
+    assert second.decoded["section_3"]["rad_d_global"] == 2094
+    assert second.decoded["section_1"]["t_air"] == 23.0
+
+
+def test_lazy():
+    """Test sections are decoded on first access."""
+    for engine in ["tokenizer", "regex"]:
+        for raw in reports:
+            expected = synop(raw + " ", engine=engine).decoded
+            report = synop(raw + " ", engine=engine, lazy=True)
+            assert not report.decoded.is_decoded("section_1")
+            assert report.decoded["section_1"] is report.decoded["section_1"]
+            assert not report.decoded.is_decoded("section_3")
+            assert list(report.decoded) == list(expected)
+            assert str(report.decoded["section_3"]) == str(expected["section_3"])
+
+
+def test_vars():
+    """Test decoding of selected variables only."""
+    vars = ["t_air", "p_slv", "wind_speed", "c2_height", "rad_d_global"]
+    for engine in ["tokenizer", "regex"]:
+        for raw in reports:
+            expected = synop(raw + " ", engine=engine).to_dict(vars)
+            report = synop(raw + " ", engine=engine, vars=vars)
+            #the wind unit is decoded for converting the wind speed
+            assert list(report.decoded) == ["section_0", "section_1", "section_3"]
+            assert list(report.decoded["section_0"]) == ["wind_unit"]
+            assert "cloud_type_low" not in report.decoded["section_1"]
+            assert str(report.to_dict()) == str(expected)
+
+
+def test_errors():
+    """Test collecting of errors instead of raising them."""
+    report = synop("201809051400 AAXX 05141 10224 42680 50704 1023 20139", errors="collect")
+    assert report.status == "partial"
+    assert report.errors == [("unexpected_group", "1023")]
+    assert report.decoded["section_1"]["dewp"] == 13.9
+    assert synop(treport, errors="collect").status == "ok"
+
+    for engine in ["tokenizer", "regex"]:
+        try:
+            synop("invalid report", engine=engine)
+        except ValueError as e:
+            assert e.reason == "invalid_section_0"
+        else:
+            assert False
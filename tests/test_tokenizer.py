@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test report tokenizer."""
+import pytest
+from synop.tokenizer import tokenize, SLOT_INDEX
+
+treport = """201809051400 AAXX 05141 10224 42680 50704 10230 20139 30174 40180 58010 81101
+333 55309 22094 30345 81845 85080 91007 90710"""
+
+
+def _slots(groups):
+    return {name: groups[i] for name, i in SLOT_INDEX.items() if groups[i]}
+
+
+def test_tokenize():
+    """Test assignment of groups to slots."""
+    groups = _slots(tokenize(treport))
+    assert groups["s0_IIiii"] == "10224"
+    assert groups["s1_iihVV"] == "42680"
+    assert groups["s1_Nddff"] == "50704"
+    assert groups["s1_1sTTT"] == "10230"
+    assert groups["s1_8NCCC"] == "81101"
+    assert groups["s3_55SSS"] == "55309"
+    assert groups["s3_55SSS_2"] == "22094"
+    assert groups["s3_55SSS_3"] == "30345"
+    assert groups["s3_8NChh_1"] == "81845"
+    assert groups["s3_8NChh_2"] == "85080"
+    assert groups["s3_9SSss"] == "91007"
+    assert "s3_2sTTT" not in groups
+
+
+def test_tokenize_positional():
+    """Test iihVV and Nddff starting with 222 are not taken as section 2."""
+    groups = _slots(tokenize("201809051400 AAXX 05141 10224 22280 22205 10230 20139 22200 00111"))
+    assert groups["s1_iihVV"] == "22280"
+    assert groups["s1_Nddff"] == "22205"
+    assert groups["s1_1sTTT"] == "10230"
+    assert groups["s2_222Dv"] == "22200"
+    assert groups["s2_0sTTT"] == "00111"
+
+
+def test_tokenize_invalid():
+    """Test handling of invalid groups and reports."""
+    groups = _slots(tokenize("201809051400 AAXX 05141 10224 42680 5070/ 1//// 3017x 40180 555 10001="))
+    assert "s1_Nddff" not in groups
+    assert "s1_3PPPP" not in groups
+    assert groups["s1_1sTTT"] == "1////"
+    assert groups["s1_4PPPP"] == "40180"
+    assert groups["s5_any"] == "10001"
+
+    with pytest.raises(ValueError):
+        tokenize("10224 42680 50704")
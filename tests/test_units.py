@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test unit conversion of batches."""
+import pytest
+import numpy as np
+from synop.synop import synop
+from synop.batch import decode_many
+from synop.units import KNOTS_TO_MPS
+
+reports = ["201809051400 AAXX 05141 10224 42680 50704 10230 30174 58010",
+           "201809051400 AAXX 05144 10225 42680 52799 00120 10230 30174 58010 333 41015",
+           "201809051400 AAXX 05143 10226 42680 50710 11012"]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_convert_units(compact):
+    """Test conversion of wind speeds and optional units."""
+    batch = decode_many(reports, compact=compact, status=True)
+    converted = batch.convert_units(kelvin=True, pascal=True, meters=True)
+
+    np.testing.assert_allclose(converted["wind_speed"], [4.0, 99 * KNOTS_TO_MPS, 10 * KNOTS_TO_MPS])
+    np.testing.assert_allclose(converted["wind_speed_high"], [np.nan, 120 * KNOTS_TO_MPS, np.nan])
+    assert list(converted.describe("wind_unit")) == ["meters per second measured", "meters per second measured",
+                                                     "meters per second estimate"]
+    np.testing.assert_allclose(converted["t_air"], [296.15, 296.15, 271.95])
+    np.testing.assert_allclose(converted["p_baro"], [101740.0, 101740.0, np.nan])
+    np.testing.assert_allclose(converted["vis"], [30000.0, 30000.0, 30000.0])
+    np.testing.assert_allclose(converted["snow_height"], [np.nan, 0.15, np.nan])
+    assert converted.status is batch.status
+
+    #the input batch is not changed
+    assert batch["wind_speed"][1] == 99
+    assert batch.convert_units()["t_air"][0] == 23.0
+
+    with pytest.raises(ValueError):
+        decode_many(reports, vars=["wind_speed"]).convert_units()
+
+
+def test_synop_convert_units():
+    """Test conversion of the wind speeds of a single report."""
+    s = synop(reports[1])
+    s.convert_units()
+    assert s.decoded["section_1"]["wind_speed"] == pytest.approx(99 * KNOTS_TO_MPS)
+    assert s.decoded["section_1"]["wind_speed_high"] == pytest.approx(120 * KNOTS_TO_MPS)
+    assert s.decoded["section_0"]["wind_unit"] == "meters per second measured"
+
+    #reports decoded with vars
+    s = synop(reports[1], vars=["t_air"])
+    s.convert_units()
+    assert s.to_dict() == {"t_air": 23.0}
+    s = synop(reports[1], vars=["wind_speed"])
+    s.convert_units()
+    assert s.to_dict() == {"wind_speed": pytest.approx(99 * KNOTS_TO_MPS)}
+
+
+def test_convert_special_codes():
+    """Test relative humidity in the dew point column and special snow heights are not converted."""
+    batch = decode_many(["201809051400 AAXX 05141 10224 42680 50704 10230 29085 333 41997",
+                         "201809051400 AAXX 05141 10224 42680 50704 10230 21012 333 41998",
+                         "201809051400 AAXX 05141 10224 42680 50704 10230 20120 333 41012"])
+    converted = batch.convert_units(kelvin=True, meters=True)
+    np.testing.assert_allclose(converted["dewp"], [85.0, -1.2, 12.0])
+    np.testing.assert_allclose(converted["snow_height"], [np.nan, np.nan, 0.12])
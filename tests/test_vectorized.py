@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test vectorized decoding handlers."""
+import numpy as np
+from synop.handlers import handle_sTTT, handle_PPPP, handle_vis, handle_RRR, handle_7RRRR, cheight
+from synop.vectorized import (decode_sTTT, decode_PPPP, decode_vis, decode_RRR, decode_7RRRR, decode_cheight,
+decode_datetime)
+
+
+def _codes(ndigits):
+    return ["{:0{}d}".format(i, ndigits) for i in range(10 ** ndigits)]
+
+
+def test_against_handlers():
+    """Test vectorized decoders give the same result as the handlers for all codes."""
+    cases = [(decode_sTTT, handle_sTTT, _codes(4) + ["////", "0/12", ""]),
+             (decode_PPPP, handle_PPPP, _codes(4) + [c[:3] + "/" for c in _codes(4)[::10]] + [""]),
+             (decode_PPPP, handle_PPPP, _codes(3)),
+             (decode_vis, handle_vis, _codes(2) + ["//", ""]),
+             (decode_RRR, handle_RRR, _codes(3) + [""]),
+             (decode_7RRRR, handle_7RRRR, _codes(4) + [""]),
+             (decode_cheight, lambda c: cheight(c)[0], _codes(2))]
+    for decoder, handler, codes in cases:
+        expected = np.array([handler(c) for c in codes], dtype=float)
+        res = decoder(np.array(codes, dtype="S{}".format(max(len(c) for c in codes))))
+        np.testing.assert_array_equal(res, expected)
+
+
+def test_sTTT():
+    """Test temperature decoding."""
+    res = decode_sTTT(np.array([b"////", b"0/12", b"0123", b"1154", b"9085", b""]))
+    np.testing.assert_array_equal(res, [np.nan, np.nan, 12.3, -15.4, 85, np.nan])
+
+
+def test_PPPP():
+    """Test pressure decoding."""
+    res = decode_PPPP(np.array(["0174", "9985", "017/", "////"]))
+    np.testing.assert_array_equal(res, [1017.4, 998.5, 1017, np.nan])
+
+
+def test_datetime():
+    """Test decoding of report timestamps."""
+    times = decode_datetime(["201809051400", "201802300000", "", "2018x9051400"])
+    assert times[0] == np.datetime64("2018-09-05T14:00")
+    assert np.isnat(times[1:]).all()